@@ -2,13 +2,22 @@
 AI-powered endpoints (Question Suggestions, etc.)
 """
 
+import json
 import logging
 import sys
+from contextlib import aclosing
 from pathlib import Path
 from typing import List, Optional, Literal
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.analysis import AnalysisUnavailable, analysis_service
+from app.core.config import settings
+from app.core.load_monitor import load_monitor, INFLIGHT_LLM
+from app.core.repositories import interviews_repo, segments_repo
+from app.core.transcript_store import transcript_store, ROLE_CANDIDATE
 
 logger = logging.getLogger(__name__)
 
@@ -25,26 +34,49 @@ except ImportError as e:
     async def generate_question_suggestions(transcript: str, language: str = "tr") -> List[str]:
         return ["[Gemini Questions import hatası - GEMINI_API_KEY kontrol edin]"]
 
-try:
-    from services.gemini_report import generate_interview_report
-except ImportError as e:
-    logger.warning(f"[AI] Gemini report import edilemedi: {e}")
-    # Fallback: dummy fonksiyon
-    def generate_interview_report(transcript: str, language: str = "tr"):
-        return {
-            "overall_score": 0,
-            "overall_comment": "[Gemini Report import hatası - GEMINI_API_KEY kontrol edin]",
-            "sentiment": {"positive": 0, "neutral": 0, "negative": 0},
-            "key_topics": [],
-            "strengths": [],
-            "improvements": [],
-        }
+async def reject_when_saturated():
+    """Instance doygunsa yeni LLM işini 503 ile reddet (load balancer başka instance'a yönlendirir)"""
+    reason = load_monitor.saturation_reason(INFLIGHT_LLM)
+    if reason:
+        logger.warning(f"[AI] İstek reddedildi, instance doygun: {reason}")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service saturated: {reason}",
+            headers={"Retry-After": "5"},
+        )
+
+
+router = APIRouter(dependencies=[Depends(reject_when_saturated)])
 
-router = APIRouter()
+
+async def resolve_transcript(transcript: Optional[str], session_id: Optional[str]) -> str:
+    """
+    İstekteki transcript'i veya session_id verildiyse server tarafında
+    tutulan adayın transkriptini döndür
+    
+    Bellekteki log yoksa (restart veya LRU'dan düşmüş session) veritabanına
+    yazılmış parçalar kullanılır; orada da yoksa istekteki transcript.
+    """
+    if not session_id:
+        return transcript or ""
+    
+    session_transcript = transcript_store.get(session_id)
+    if session_transcript is not None:
+        return session_transcript.text(role=ROLE_CANDIDATE)
+    
+    interview = await interviews_repo.get_by_session(session_id)
+    if interview is not None:
+        stored_text = await segments_repo.transcript_text(interview["id"], role=ROLE_CANDIDATE)
+        if stored_text:
+            return stored_text
+    if transcript:
+        return transcript
+    raise HTTPException(status_code=404, detail="No transcript recorded for this session")
 
 
 class QuestionSuggestionsRequest(BaseModel):
-    transcript: str
+    transcript: Optional[str] = None
+    session_id: Optional[str] = None  # verilirse transcript server'daki log'dan alınır
     language: Optional[str] = "tr"
 
 
@@ -58,28 +90,31 @@ async def generate_questions(payload: QuestionSuggestionsRequest):
     Aday transkriptine göre takip soruları üretir (Gemini AI)
     
     Args:
-        payload: Transcript ve dil bilgisi
+        payload: Transcript (veya session_id) ve dil bilgisi
     
     Returns:
         Soru önerileri listesi
     """
+    transcript = await resolve_transcript(payload.transcript, payload.session_id)
     logger.info(
-        "[AI] Soru önerisi isteği alındı (transcript_length=%d karakter, language=%s)",
-        len(payload.transcript) if payload.transcript else 0,
+        "[AI] Soru önerisi isteği alındı (transcript_length=%d karakter, session_id=%s, language=%s)",
+        len(transcript),
+        payload.session_id,
         payload.language,
     )
     
     # Transcript boş ise boş liste döndür
-    if not payload.transcript or not payload.transcript.strip():
+    if not transcript.strip():
         logger.info("[AI] Boş transcript, boş liste döndürülüyor")
         return QuestionSuggestionsResponse(questions=[])
     
     try:
         # Gemini ile soru önerileri üret
-        questions = await generate_question_suggestions(
-            transcript=payload.transcript,
-            language=payload.language or "tr",
-        )
+        async with load_monitor.track(INFLIGHT_LLM):
+            questions = await generate_question_suggestions(
+                transcript=transcript,
+                language=payload.language or "tr",
+            )
         
         logger.info(
             "[AI] %d soru önerisi üretildi",
@@ -115,7 +150,8 @@ async def generate_questions(payload: QuestionSuggestionsRequest):
 # ============================================================================
 
 class InterviewReportRequest(BaseModel):
-    transcript: str
+    transcript: Optional[str] = None
+    session_id: Optional[str] = None  # verilirse transcript server'daki log'dan alınır
     language: Literal["tr", "en"] = "tr"
 
 
@@ -134,82 +170,131 @@ class InterviewReportResponse(BaseModel):
     improvements: List[str]
 
 
+EMPTY_REPORT = InterviewReportResponse(
+    overall_score=0,
+    overall_comment="",
+    sentiment=SentimentSchema(positive=0, neutral=0, negative=0),
+    key_topics=[],
+    strengths=[],
+    improvements=[],
+)
+
+
 @router.post("/report", response_model=InterviewReportResponse)
 async def generate_report(payload: InterviewReportRequest):
     """
     Mülakat transkriptine göre detaylı rapor üretir (Gemini AI)
     
+    Üretim ``analysis_service`` üzerinden yapılır: çağrı worker thread'de
+    çalışır, ortak GEMINI_REPORT_RPM kotasını bekler ve aynı transkript
+    için sonuç tekrar kullanılır.
+    
     Args:
-        payload: Transcript ve dil bilgisi
+        payload: Transcript (veya session_id) ve dil bilgisi
     
     Returns:
         Detaylı mülakat raporu
     """
+    transcript = await resolve_transcript(payload.transcript, payload.session_id)
     logger.info(
-        "[AI] Rapor isteği alındı (transcript_length=%d karakter, language=%s)",
-        len(payload.transcript) if payload.transcript else 0,
+        "[AI] Rapor isteği alındı (transcript_length=%d karakter, session_id=%s, language=%s)",
+        len(transcript),
+        payload.session_id,
         payload.language,
     )
     
     # Transcript boş ise boş rapor döndür
-    if not payload.transcript or not payload.transcript.strip():
+    if not transcript.strip():
         logger.info("[AI] Boş transcript, boş rapor döndürülüyor")
-        empty_report = {
-            "overall_score": 0,
-            "overall_comment": "",
-            "sentiment": {"positive": 0, "neutral": 0, "negative": 0},
-            "key_topics": [],
-            "strengths": [],
-            "improvements": [],
-        }
-        return InterviewReportResponse(
-            overall_score=empty_report["overall_score"],
-            overall_comment=empty_report["overall_comment"],
-            sentiment=SentimentSchema(**empty_report["sentiment"]),
-            key_topics=empty_report["key_topics"],
-            strengths=empty_report["strengths"],
-            improvements=empty_report["improvements"],
-        )
+        return EMPTY_REPORT
     
     try:
-        # Gemini ile rapor üret
-        report_dict = generate_interview_report(
-            transcript=payload.transcript,
-            language=payload.language or "tr",
-        )
-        
-        logger.info(
-            "[AI] Rapor başarıyla oluşturuldu (score=%d)",
-            report_dict.get("overall_score", 0),
-        )
-        
-        return InterviewReportResponse(
-            overall_score=report_dict["overall_score"],
-            overall_comment=report_dict["overall_comment"],
-            sentiment=SentimentSchema(**report_dict["sentiment"]),
-            key_topics=report_dict["key_topics"],
-            strengths=report_dict["strengths"],
-            improvements=report_dict["improvements"],
-        )
-        
-    except ValueError as e:
-        # GEMINI_API_KEY eksik
-        logger.error(f"[AI] Gemini API yapılandırma hatası: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Gemini API is not configured. Please check GEMINI_API_KEY environment variable.",
-        )
-    except ImportError as e:
-        # google-generativeai paketi yüklü değil
-        logger.error(f"[AI] Gemini paket import hatası: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail="Gemini API package is not installed. Please install google-generativeai>=0.8.0",
-        )
+        report_dict, generated = await analysis_service.analyze_transcript(transcript, payload.language)
+    except AnalysisUnavailable as e:
+        # Kısa transkript, kota veya servis hatası: önceki gibi boş rapor
+        logger.info(f"[AI] Rapor üretilemedi, boş rapor döndürülüyor: {e}")
+        return EMPTY_REPORT
     except Exception as e:
         logger.exception("[AI] Rapor üretme hatası")
         raise HTTPException(
             status_code=500,
             detail=f"Error generating interview report: {str(e)}",
         )
+    
+    logger.info(
+        "[AI] Rapor %s (score=%d)",
+        "oluşturuldu" if generated else "önbellekten döndü",
+        report_dict.get("overall_score", 0),
+    )
+    
+    return InterviewReportResponse(
+        overall_score=report_dict["overall_score"],
+        overall_comment=report_dict["overall_comment"],
+        sentiment=SentimentSchema(**report_dict["sentiment"]),
+        key_topics=report_dict["key_topics"],
+        strengths=report_dict["strengths"],
+        improvements=report_dict["improvements"],
+    )
+
+
+class ReportBatchItem(BaseModel):
+    interview_id: Optional[int] = None  # saklanan transkript ve rapor kullanılır
+    transcript: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if (self.interview_id is None) == (self.transcript is None):
+            raise ValueError("Provide exactly one of interview_id or transcript")
+        return self
 
+
+class ReportBatchRequest(BaseModel):
+    items: List[ReportBatchItem] = Field(..., min_length=1, max_length=settings.REPORT_BATCH_MAX_ITEMS)
+    language: Literal["tr", "en"] = "tr"
+    concurrency: Optional[int] = Field(None, ge=1, le=16)  # verilmezse REPORT_BATCH_CONCURRENCY
+
+
+@router.post("/report/batch")
+async def generate_report_batch(payload: ReportBatchRequest):
+    """
+    Birden çok mülakat / transkript için rapor üretir; sonuçlar bittikçe
+    NDJSON olarak akar (her satır bir öğe, son satır özet)
+    
+    Raporu aynı transkript için zaten üretilmiş öğeler Gemini'ye gitmeden
+    "cached" olarak hemen döner. Üretimler ``concurrency`` ile sınırlanır ve
+    Gemini kotasına (GEMINI_REPORT_RPM, 429 Retry-After) göre beklenir.
+    
+    Öğe durumları: generated, cached, unavailable, not_found, error
+    """
+    interview_ids = [item.interview_id for item in payload.items if item.interview_id is not None]
+    known = await interviews_repo.existing_ids(list(set(interview_ids)))
+    logger.info(
+        "[AI] Toplu rapor isteği alındı (items=%d, interviews=%d, language=%s)",
+        len(payload.items),
+        len(interview_ids),
+        payload.language,
+    )
+    
+    async def stream():
+        counts = {"generated": 0, "cached": 0, "unavailable": 0, "not_found": 0, "error": 0}
+        work = []
+        positions = []
+        for index, item in enumerate(payload.items):
+            if item.interview_id is not None and item.interview_id not in known:
+                counts["not_found"] += 1
+                line = {"index": index, "interview_id": item.interview_id, "status": "not_found"}
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+                continue
+            work.append((item.interview_id, item.transcript))
+            positions.append(index)
+        
+        async with aclosing(analysis_service.batch(work, payload.language, payload.concurrency)) as results:
+            async for result in results:
+                # batch() indeksleri sadece çalışan öğeler üzerindendir; istekteki sıraya çevir
+                result["index"] = positions[result["index"]]
+                counts[result["status"]] += 1
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        
+        yield json.dumps({"done": True, "total": len(payload.items), **counts}) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,42 +1,200 @@
 """
 Candidate management endpoints
 """
-from fastapi import APIRouter
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from app.core.bulk_io import format_from_content_type, parse_records
+from app.core.database import ConstraintError
+from app.core.repositories import CANDIDATE_INSERT_CHUNK, MAX_PAGE_SIZE, candidates_repo, reports_repo
+from services.candidate_ranking import CandidateScores, rank_candidates
 
 router = APIRouter(prefix="/candidates", tags=["candidates"])
 
+# Tek karşılaştırmada en fazla aday
+MAX_COMPARE_CANDIDATES = 1000
+
+# Toplu içe aktarma yanıtında listelenen en fazla satır hatası
+MAX_REPORTED_ERRORS = 100
+
+
+class CandidateCreate(BaseModel):
+    full_name: str = Field(..., min_length=1, max_length=200)
+    email: Optional[str] = Field(None, max_length=320)
+    phone: Optional[str] = Field(None, max_length=50)
+    position: Optional[str] = Field(None, max_length=200)
+    notes: Optional[str] = None
+
+
+class CandidateUpdate(BaseModel):
+    full_name: Optional[str] = Field(None, min_length=1, max_length=200)
+    email: Optional[str] = Field(None, max_length=320)
+    phone: Optional[str] = Field(None, max_length=50)
+    position: Optional[str] = Field(None, max_length=200)
+    notes: Optional[str] = None
+
 
 @router.get("/")
-async def list_candidates():
-    """List all candidates"""
-    # TODO: Implement candidate listing
-    pass
+async def list_candidates(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Önceki sayfanın next_cursor değeri"),
+    position: Optional[str] = Query(None, description="Pozisyona göre filtre"),
+):
+    """List all candidates (newest first, keyset pagination)"""
+    return await candidates_repo.list(limit=limit, cursor=cursor, position=position)
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+
+@router.post("/bulk")
+async def bulk_create_candidates(request: Request):
+    """
+    Import candidates from a streamed NDJSON (application/x-ndjson) or CSV
+    (text/csv, header row required) body.
+
+    Rows are validated one by one and inserted in batches as the body arrives;
+    rows with an already registered email are skipped as duplicates. Batches
+    are committed independently, so the summary reflects what was stored.
+    """
+    fmt = format_from_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Content-Type must be application/x-ndjson or text/csv")
+
+    summary: Dict[str, Any] = {"format": fmt, "received": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+    errors: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    def report(line: int, error: str) -> None:
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "error": error})
+
+    async def flush() -> None:
+        results = await candidates_repo.create_many([row for _, row in batch])
+        for (line, row), inserted in zip(batch, results):
+            if inserted:
+                summary["inserted"] += 1
+            else:
+                summary["duplicates"] += 1
+                report(line, f"Duplicate email: {row['email']}")
+        batch.clear()
+
+    async for line, record in parse_records(fmt, request.stream()):
+        summary["received"] += 1
+        if isinstance(record, str):
+            summary["invalid"] += 1
+            report(line, record)
+            continue
+        try:
+            candidate = CandidateCreate.model_validate(record)
+        except ValidationError as e:
+            summary["invalid"] += 1
+            report(line, _validation_message(e))
+            continue
+        batch.append((line, candidate.model_dump()))
+        if len(batch) >= CANDIDATE_INSERT_CHUNK:
+            await flush()
+    if batch:
+        await flush()
+
+    summary["errors"] = errors
+    summary["errors_truncated"] = summary["invalid"] + summary["duplicates"] > len(errors)
+    return summary
+
+
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids is required")
+    if len(parsed) > MAX_COMPARE_CANDIDATES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_CANDIDATES} candidates can be compared")
+    return parsed
+
+
+def _columns(rows: List[Dict[str, Any]]) -> CandidateScores:
+    data = CandidateScores()
+    for row in rows:
+        data.add(row)
+    return data
+
+
+@router.get("/compare")
+async def compare_candidates(
+    ids: str = Query(..., description="Virgülle ayrılmış aday ID'leri, örn. 1,2,3"),
+    max_topics: int = Query(50, ge=1, le=200),
+    language: Literal["tr", "en"] = "tr",
+):
+    """
+    Compare candidates by their latest interview report: ranking, percentiles,
+    score distribution and a topic x candidate coverage matrix
+    """
+    candidate_ids = _parse_ids(ids)
+    rows = await reports_repo.latest_for_candidates(candidate_ids=candidate_ids, language=language)
+    result = rank_candidates(_columns(rows), include_matrix=True, max_topics=max_topics)
+    found = {row["candidate_id"] for row in rows}
+    # Raporu olmayan (veya bulunamayan) adaylar sıralamaya girmez
+    result["missing"] = [candidate_id for candidate_id in candidate_ids if candidate_id not in found]
+    # Sonuç zaten düz JSON tipleri; jsonable_encoder'ın büyük matris üzerindeki turu atlanır
+    return JSONResponse(result)
+
+
+@router.get("/leaderboard")
+async def candidate_leaderboard(
+    position: str = Query(..., min_length=1, description="Adayın başvurduğu pozisyon"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    max_topics: int = Query(20, ge=1, le=200),
+    language: Literal["tr", "en"] = "tr",
+):
+    """Rank every candidate for a position (stats and distribution cover all of them)"""
+    rows = await reports_repo.latest_for_candidates(position=position, language=language)
+    result = rank_candidates(_columns(rows), include_matrix=False, limit=limit, max_topics=max_topics)
+    result["position"] = position
+    return JSONResponse(result)
 
 
 @router.get("/{candidate_id}")
 async def get_candidate(candidate_id: int):
     """Get candidate by ID"""
-    # TODO: Implement candidate retrieval
-    pass
+    candidate = await candidates_repo.get(candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return candidate
 
 
-@router.post("/")
-async def create_candidate():
+@router.post("/", status_code=201)
+async def create_candidate(payload: CandidateCreate):
     """Create a new candidate"""
-    # TODO: Implement candidate creation
-    pass
+    try:
+        return await candidates_repo.create(payload.model_dump())
+    except ConstraintError:
+        raise HTTPException(status_code=409, detail="A candidate with this email already exists")
 
 
 @router.put("/{candidate_id}")
-async def update_candidate(candidate_id: int):
+async def update_candidate(candidate_id: int, payload: CandidateUpdate):
     """Update candidate information"""
-    # TODO: Implement candidate update
-    pass
+    try:
+        candidate = await candidates_repo.update(candidate_id, payload.model_dump(exclude_unset=True))
+    except ConstraintError:
+        raise HTTPException(status_code=409, detail="A candidate with this email already exists")
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return candidate
 
 
-@router.delete("/{candidate_id}")
+@router.delete("/{candidate_id}", status_code=204)
 async def delete_candidate(candidate_id: int):
     """Delete a candidate"""
-    # TODO: Implement candidate deletion
-    pass
-
+    if not await candidates_repo.delete(candidate_id):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return Response(status_code=204)
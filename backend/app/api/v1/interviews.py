@@ -1,49 +1,317 @@
 """
 Interview management and analysis endpoints
 """
-from fastapi import APIRouter
+from contextlib import aclosing
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Literal, Optional
+import asyncio
+import json
+import uuid
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from app.api.v1 import stt
+from app.core.analysis import AnalysisUnavailable, analysis_service
+from app.core.audio_store import list_session_segments, parse_segment_name
+from app.core.bulk_io import MEDIA_TYPES, encode_rows
+from app.core.config import settings
+from app.core.database import ConstraintError
+from app.core.repositories import MAX_PAGE_SIZE, interviews_repo, search_repo, segments_repo
+from app.core.transcript_store import transcript_store
+from app.core.transcript_writer import transcript_writer
+from services.final_transcription import RecordingFile, transcribe_recordings
+from services.instrumentation import current_session_id
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
+EXPORT_COLUMNS = (
+    "interview_id",
+    "session_id",
+    "status",
+    "position",
+    "created_at",
+    "started_at",
+    "ended_at",
+    "candidate_id",
+    "candidate_name",
+    "candidate_email",
+    "report_language",
+    "overall_score",
+    "overall_comment",
+    "sentiment_positive",
+    "sentiment_neutral",
+    "sentiment_negative",
+    "key_topics",
+    "strengths",
+    "improvements",
+)
+
+# Aynı anda çalışan export sayısı: her biri akış boyunca bir DB bağlantısı tutar,
+# havuzun yarısından fazlası export'lara gitmesin
+MAX_CONCURRENT_EXPORTS = max(1, settings.DATABASE_POOL_SIZE // 2)
+_export_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPORTS)
+
+
+class _ExportSlot:
+    """
+    Handler'da ayrılan export yeri. Akış bittiğinde (generator finally) veya
+    istemci akış başlamadan ayrıldığında (response background) bırakılır;
+    hangisi önce gelirse, bir kez.
+    """
+
+    def __init__(self, slots: asyncio.Semaphore):
+        self._slots = slots
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._slots.release()
+
+
+class InterviewCreate(BaseModel):
+    candidate_id: Optional[int] = None
+    position: Optional[str] = Field(None, max_length=200)
+    session_id: Optional[str] = Field(None, max_length=128, description="Canlı STT session ID'si (verilmezse üretilir)")
+
 
 @router.get("/")
-async def list_interviews():
-    """List all interviews"""
-    # TODO: Implement interview listing
-    pass
+async def list_interviews(
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Önceki sayfanın next_cursor değeri"),
+    candidate_id: Optional[int] = Query(None, description="Adayın mülakat geçmişi"),
+    status: Optional[Literal["scheduled", "in_progress", "ended"]] = None,
+    position: Optional[str] = None,
+):
+    """List all interviews (newest first, keyset pagination)"""
+    return await interviews_repo.list(
+        limit=limit,
+        cursor=cursor,
+        candidate_id=candidate_id,
+        status=status,
+        position=position,
+    )
+
+
+@router.get("/search")
+async def search_interviews(
+    q: str = Query(..., min_length=1, max_length=200, description="Aranacak kelimeler (ör. kubernetes)"),
+    role: Optional[Literal["candidate", "interviewer"]] = Query(
+        None, description="Sadece bu rolün konuşmalarında ara (rapor konuları hariç tutulur)"
+    ),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Önceki sayfanın next_cursor değeri"),
+):
+    """
+    Search interviews by transcript content and report key topics
+    
+    Arama Türkçe'ye duyarlıdır: büyük/küçük harf, noktalı/noktasız i ve
+    aksanlar fark etmez. Sonuçlar en iyi eşleşen parçaya göre sıralanır.
+    """
+    try:
+        return await search_repo.search(q, role=role, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _export_rows(candidate_id, status, position, language, slot: _ExportSlot) -> AsyncIterator[Dict[str, Any]]:
+    """Mülakat satırlarını rapor alanları düzleştirilmiş halde üret"""
+    try:
+        async with aclosing(interviews_repo.iter_export(candidate_id, status, position, language)) as rows:
+            async for row in rows:
+                report = json.loads(row.pop("report_json")) if row.get("report_json") else {}
+                sentiment = report.get("sentiment") or {}
+                row.update(
+                    overall_score=report.get("overall_score"),
+                    overall_comment=report.get("overall_comment"),
+                    sentiment_positive=sentiment.get("positive"),
+                    sentiment_neutral=sentiment.get("neutral"),
+                    sentiment_negative=sentiment.get("negative"),
+                    key_topics=report.get("key_topics"),
+                    strengths=report.get("strengths"),
+                    improvements=report.get("improvements"),
+                )
+                yield row
+    finally:
+        slot.release()
+
+
+@router.get("/export")
+async def export_interviews(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Çıktı biçimi"),
+    candidate_id: Optional[int] = None,
+    status: Optional[Literal["scheduled", "in_progress", "ended"]] = None,
+    position: Optional[str] = None,
+    language: Literal["tr", "en"] = Query("tr", description="Dışa aktarılan raporun dili"),
+):
+    """
+    Export interviews with candidate details and report results (for ATS import)
+    
+    Satırlar veritabanı cursor'ından parça parça okunup akış halinde
+    gönderilir; bellek kullanımı veri boyutundan bağımsızdır.
+    """
+    # Yer akış başlamadan burada ayrılır; doluysa beklemeden reddedilir
+    # (locked() değilse acquire() askıya alınmadan döner)
+    if _export_slots.locked():
+        raise HTTPException(status_code=429, detail="Too many exports in progress, try again later")
+    await _export_slots.acquire()
+    slot = _ExportSlot(_export_slots)
+    return StreamingResponse(
+        encode_rows(fmt, _export_rows(candidate_id, status, position, language, slot), EXPORT_COLUMNS),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="interviews.{fmt}"'},
+        background=BackgroundTask(slot.release),
+    )
 
 
 @router.get("/{interview_id}")
 async def get_interview(interview_id: int):
     """Get interview by ID"""
-    # TODO: Implement interview retrieval
-    pass
+    interview = await interviews_repo.get(interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return interview
 
 
-@router.post("/")
-async def create_interview():
+@router.post("/", status_code=201)
+async def create_interview(payload: InterviewCreate):
     """Create a new interview session"""
-    # TODO: Implement interview creation
-    pass
+    try:
+        return await interviews_repo.create(
+            session_id=payload.session_id or uuid.uuid4().hex,
+            candidate_id=payload.candidate_id,
+            position=payload.position,
+        )
+    except ConstraintError:
+        raise HTTPException(status_code=409, detail="Session already exists or candidate not found")
 
 
 @router.get("/{interview_id}/analysis")
-async def get_interview_analysis(interview_id: int):
-    """Get analysis results for an interview"""
-    # TODO: Implement analysis retrieval
-    pass
+async def get_interview_analysis(interview_id: int, language: Literal["tr", "en"] = "tr"):
+    """
+    Get analysis results for an interview
+    
+    Rapor mülakat bitiminde bir kez üretilip saklanır ve buradan okunur.
+    Sadece transkript, prompt sürümü veya model değiştiyse yeniden üretilir.
+    """
+    if await interviews_repo.get(interview_id) is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    try:
+        return await analysis_service.get(interview_id, language)
+    except AnalysisUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 @router.post("/{interview_id}/start")
 async def start_interview(interview_id: int):
     """Start an interview session"""
-    # TODO: Implement interview start logic
-    pass
+    interview = await interviews_repo.set_status(interview_id, "in_progress")
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return interview
+
+
+async def _final_pass_done(interview_id: int, session_id: str) -> bool:
+    transcript = transcript_store.get(session_id)
+    if transcript is not None and transcript.has_committed:
+        return True
+    # Bellekteki transkript düşmüş olabilir (eviction / restart): saklanan parçalara bak
+    await transcript_writer.flush()
+    return await segments_repo.has_committed(interview_id)
+
+
+async def _run_final_pass(interview_id: int, session_id: str) -> Optional[dict]:
+    """
+    Kaydedilmiş audio üzerinde final-pass transkripsiyon.
+    
+    Kayıt yoksa veya final-pass daha önce tamamlandıysa (tekrarlanan ``/end``) None döner.
+    """
+    if await _final_pass_done(interview_id, session_id):
+        return None
+    
+    # Hâlâ açık STT bağlantısı varsa RAM'deki kuyruğu diske yaz
+    live_buffer = stt.SESSION_BUFFERS.get(session_id)
+    if live_buffer is not None:
+        await live_buffer.flush()
+    
+    paths = list_session_segments(session_id)
+    if not paths:
+        return None
+    
+    # Segment dosyalarının başlangıç zamanları mülakat başına göre hizalanır
+    parsed = [(path, *parse_segment_name(path)) for path in paths]
+    first_started_ns = min(started_ns for _, _, started_ns in parsed)
+    recordings = [
+        RecordingFile(path=path, role=role, offset_seconds=(started_ns - first_started_ns) / 1e9)
+        for path, role, started_ns in parsed
+    ]
+    
+    current_session_id.set(session_id)
+    final_transcript = await transcribe_recordings(recordings, partial(stt.transcribe_batch, session_id))
+    
+    # Final-pass parçalarını session transkriptine committed olarak ekle
+    # (zamanlar transkriptin başlangıcına göre kaydırılır)
+    transcript = transcript_store.get_or_create(session_id)
+    if not transcript.has_committed:
+        shift = first_started_ns / 1e9 - transcript.started_at
+        for segment in final_transcript["segments"]:
+            appended = transcript.append(
+                segment["role"],
+                segment["text"],
+                start=max(0.0, segment["start"] + shift),
+                end=max(0.0, segment["end"] + shift),
+                committed=True,
+            )
+            transcript_writer.enqueue(session_id, transcript, appended)
+    return final_transcript
+
+
+async def _end_interview(interview: dict, language: str) -> dict:
+    """Mülakatı bitir, final-pass çalıştır ve raporu arka planda üret"""
+    session_id = interview["session_id"]
+    await interviews_repo.set_status(interview["id"], "ended")
+    
+    final_transcript = await _run_final_pass(interview["id"], session_id)
+    
+    # Analiz saklanan transkriptten üretilir: önce bekleyen parçaları yaz
+    await transcript_writer.flush()
+    analysis_service.materialize_in_background(interview["id"], language)
+    
+    return {
+        "id": interview["id"],
+        "session_id": session_id,
+        "status": "ended",
+        "final_transcript": final_transcript,
+    }
 
 
 @router.post("/{interview_id}/end")
-async def end_interview(interview_id: int):
-    """End an interview session"""
-    # TODO: Implement interview end logic
-    pass
+async def end_interview(interview_id: int, language: Literal["tr", "en"] = "tr"):
+    """
+    End an interview session
+    
+    Kaydedilmiş session audio'su üzerinde final-pass transkripsiyon çalıştırır:
+    kayıt duraklama noktalarından parçalara bölünür, parçalar sınırlı
+    paralellikle transcribe edilir ve zaman damgalarıyla birleştirilir
+    (tekrarlanan ``/end`` final-pass'i yeniden çalıştırmaz).
+    Ardından mülakat raporu arka planda bir kez üretilip saklanır
+    (``GET /interviews/{id}/analysis``).
+    """
+    interview = await interviews_repo.get(interview_id)
+    if interview is None:
+        raise HTTPException(status_code=404, detail="Interview not found")
+    return await _end_interview(interview, language)
+
 
+@router.post("/sessions/{session_id}/end")
+async def end_interview_by_session(session_id: str, language: Literal["tr", "en"] = "tr"):
+    """
+    End an interview by its live STT session_id
+    
+    Önceden oluşturulmamış canlı session'lar için mülakat kaydı oluşturulur.
+    """
+    interview_id = await interviews_repo.ensure_session(session_id)
+    return await _end_interview(await interviews_repo.get(interview_id), language)
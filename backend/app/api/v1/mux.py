@@ -0,0 +1,244 @@
+"""
+Multiplexed WebSocket endpoint
+Signaling, transcript ve STT trafiğini katılımcı başına tek bir soket üzerinden taşır
+"""
+
+from contextlib import suppress
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from typing import Any, Optional, Set
+import asyncio
+import json
+import logging
+import time
+
+from app.api.v1 import signaling, stt
+from app.core.admission import (
+    admission,
+    CapacityExceeded,
+    KIND_SIGNALING,
+    KIND_STT,
+    KIND_TRANSCRIPT,
+)
+from app.core.metrics import registry, OPEN_WEBSOCKETS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/mux", tags=["mux"])
+
+# Kanal isimleri
+CHANNEL_SIGNALING = "signaling"
+CHANNEL_TRANSCRIPT = "transcript"
+CHANNEL_STT = "stt"
+CHANNEL_CONTROL = "mux"
+
+# STT worker kuyruğunda bekleyebilecek maksimum chunk sayısı
+MAX_PENDING_AUDIO_CHUNKS = 16
+
+# Aktif bağlantıların STT kuyrukları (queue depth metriği için)
+_audio_queues: Set[asyncio.Queue] = set()
+
+_OPEN_MUX_SOCKETS = OPEN_WEBSOCKETS.labels("mux")
+
+registry.gauge(
+    "stt_queue_depth",
+    "Audio chunks waiting for the STT worker across mux connections",
+    callback=lambda: sum(q.qsize() for q in _audio_queues),
+)
+
+
+class ChannelSocket:
+    """
+    Mux WebSocket üzerinde tek bir kanala yazan adaptör.
+
+    Mevcut signaling/transcript handler'ları bu nesneyi normal bir
+    WebSocket gibi kullanır; giden her mesaj ``{"channel", "data"}``
+    zarfına sarılır.
+    """
+
+    def __init__(self, ws: WebSocket, channel: str):
+        self.ws = ws
+        self.channel = channel
+        # Zarfın sabit kısmı bir kez hazırlanır
+        self._prefix = '{"channel": %s, "data": ' % json.dumps(channel)
+
+    async def send_text(self, text: str) -> None:
+        # Signaling handler'ları her zaman JSON string gönderir, tekrar parse etmeye gerek yok
+        await self.ws.send_text(self._prefix + text + "}")
+
+    async def send_json(self, data: Any) -> None:
+        await self.send_text(json.dumps(data))
+
+
+async def _stt_worker(ws: WebSocket, queue: asyncio.Queue, session_id: str, role: str) -> None:
+    """
+    Audio chunk'larını sırayla işler.
+
+    Whisper çağrısı saniyeler sürebildiği için receive döngüsünden ayrı
+    çalışır; böylece STT beklerken signaling mesajları gecikmez.
+    """
+    chunk_count = 0
+    while True:
+        audio_bytes, received_at = await queue.get()
+        chunk_count += 1
+        try:
+            await stt.process_audio_chunk(session_id, role, audio_bytes, chunk_count, received_at)
+        except CapacityExceeded as e:
+            # Tek kanal yerine tüm soketi kapat; client'ın yeniden bağlanma mantığı tek yerde kalır
+            await ws.close(code=e.code, reason=e.reason)
+            return
+        except Exception:
+            logger.exception("[Mux] STT chunk işleme hatası (session_id=%s)", session_id)
+
+
+@router.websocket("/ws")
+async def mux_ws(
+    ws: WebSocket,
+    session_id: Optional[str] = Query(None, description="Mülakat oturum ID'si (transcript/STT kanalları için)"),
+    room_id: Optional[str] = Query(None, description="Signaling oda ID'si"),
+    role: str = Query("candidate", description="Konuşmacı rolü: candidate veya interviewer"),
+    channels: str = Query(
+        "signaling,transcript,stt",
+        description="Açılacak kanallar (virgülle ayrılmış): signaling, transcript, stt",
+    ),
+    ice_batch: bool = Query(False, description="Client 'ice-candidates' batch frame'ini destekliyor mu"),
+    since: Optional[int] = Query(None, ge=0, description="Transcript kanalında son alınan mesajın seq'i"),
+):
+    """
+    Multiplexed WebSocket endpoint
+
+    Frame formatı:
+        - Text frame: ``{"channel": "signaling" | "transcript", "data": {...}}``
+        - Binary frame: STT kanalı için WebM audio chunk
+
+    Kanallar mevcut ``/signaling/ws/{room_id}``, ``/stt/ws/transcript`` ve
+    ``/stt/ws/stt`` endpoint'leriyle aynı handler mantığını kullanır.
+
+    Query Params:
+        session_id: Mülakat oturum ID'si
+        room_id: Signaling oda ID'si (verilmezse session_id kullanılır)
+        role: "candidate" (Aday) veya "interviewer" (Görüşmeci)
+        channels: Açılacak kanallar
+        ice_batch: "ice-candidates" batch frame desteği
+        since: Transcript kanalı yeniden bağlanınca kaçırılan mesajlar bu seq'ten itibaren replay edilir
+    """
+    enabled = {c.strip() for c in channels.split(",") if c.strip()}
+    room_id = room_id or session_id
+    
+    if (CHANNEL_SIGNALING in enabled and not room_id) or (
+        enabled & {CHANNEL_TRANSCRIPT, CHANNEL_STT} and not session_id
+    ):
+        await ws.accept()
+        await ws.close(code=1008, reason="session_id/room_id required for requested channels")
+        return
+    
+    slots = []
+    if CHANNEL_SIGNALING in enabled:
+        slots.append((KIND_SIGNALING, room_id))
+    if CHANNEL_TRANSCRIPT in enabled:
+        slots.append((KIND_TRANSCRIPT, session_id))
+    if CHANNEL_STT in enabled:
+        slots.append((KIND_STT, session_id))
+    
+    if not await admission.admit(ws, slots):
+        return
+    _OPEN_MUX_SOCKETS.inc()
+    
+    try:
+        await ws.accept()
+    except Exception:
+        admission.release(slots)
+        _OPEN_MUX_SOCKETS.dec()
+        raise
+    
+    logger.info(
+        "[Mux] WebSocket connected: session_id=%s, room_id=%s, role=%s, channels=%s",
+        session_id,
+        room_id,
+        role,
+        ",".join(sorted(enabled)),
+    )
+    
+    signaling_socket = ChannelSocket(ws, CHANNEL_SIGNALING)
+    transcript_socket = ChannelSocket(ws, CHANNEL_TRANSCRIPT)
+    
+    ice_batcher = None
+    signaling_joined = False
+    transcript_joined = False
+    stt_task: Optional[asyncio.Task] = None
+    audio_queue: Optional[asyncio.Queue] = None
+    
+    # Tek keep-alive: üç ayrı soket yerine bağlantı başına bir ping
+    ping_task = asyncio.create_task(signaling.send_ping(ChannelSocket(ws, CHANNEL_CONTROL)))
+    
+    try:
+        if CHANNEL_SIGNALING in enabled:
+            signaling_joined = True
+            ice_batcher = await signaling.join_room(room_id, signaling_socket, ice_batch=ice_batch)
+        
+        if CHANNEL_TRANSCRIPT in enabled:
+            transcript_joined = True
+            await stt.attach_transcript_client(session_id, transcript_socket, since)
+        
+        if CHANNEL_STT in enabled:
+            audio_queue = asyncio.Queue(maxsize=MAX_PENDING_AUDIO_CHUNKS)
+            _audio_queues.add(audio_queue)
+            stt_task = asyncio.create_task(_stt_worker(ws, audio_queue, session_id, role))
+        
+        while True:
+            frame = await ws.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            
+            # Binary frame -> STT audio
+            audio_bytes = frame.get("bytes")
+            if audio_bytes is not None:
+                if audio_queue is None:
+                    logger.debug("[Mux] STT kanalı kapalı, audio frame yok sayıldı")
+                    continue
+                # Backpressure: kuyruk doluysa receive döngüsü bekler
+                await audio_queue.put((audio_bytes, time.perf_counter()))
+                continue
+            
+            text = frame.get("text")
+            if text is None:
+                continue
+            
+            envelope = json.loads(text)
+            channel = envelope.get("channel")
+            data = envelope.get("data") or {}
+            
+            if channel == CHANNEL_SIGNALING and signaling_joined:
+                await signaling.handle_signaling_message(room_id, signaling_socket, data, ice_batcher)
+            elif channel == CHANNEL_TRANSCRIPT:
+                # Transcript kanalı sadece yayın içindir, ping'e cevap ver
+                if data.get("type") == "ping":
+                    await transcript_socket.send_json({"type": "pong"})
+            elif channel == CHANNEL_CONTROL:
+                if data.get("type") == "ping":
+                    await ws.send_text(json.dumps({"channel": CHANNEL_CONTROL, "data": {"type": "pong"}}))
+            else:
+                logger.debug("[Mux] Bilinmeyen veya kapalı kanal: %s", channel)
+    
+    except WebSocketDisconnect:
+        logger.info("[Mux] WebSocket disconnected: session_id=%s, room_id=%s", session_id, room_id)
+    except Exception:
+        logger.exception("[Mux] Unexpected error in mux websocket")
+    finally:
+        ping_task.cancel()
+        
+        if stt_task is not None:
+            stt_task.cancel()
+            # Worker'ın yarıda kalan chunk'ı bitmeden session state'i silinmesin
+            with suppress(asyncio.CancelledError):
+                await stt_task
+            _audio_queues.discard(audio_queue)
+            await stt.cleanup_stt_session(session_id)
+        
+        if transcript_joined:
+            stt.remove_transcript_client(session_id, transcript_socket)
+        
+        if signaling_joined:
+            await signaling.leave_room(room_id, signaling_socket, ice_batcher)
+        
+        admission.release(slots)
+        _OPEN_MUX_SOCKETS.dec()
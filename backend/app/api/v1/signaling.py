@@ -1,12 +1,16 @@
 """
 WebRTC signaling endpoints for peer connection establishment
 """
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+from typing import Any, Dict, List, Optional, Set
 import json
 import logging
 import asyncio
 
+from app.core.admission import admission, KIND_SIGNALING
+from app.core.config import settings
+from app.core.metrics import OPEN_WEBSOCKETS
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/signaling", tags=["signaling"])
@@ -14,6 +18,102 @@ router = APIRouter(prefix="/signaling", tags=["signaling"])
 # Store active WebSocket connections by room ID
 active_connections: Dict[str, Set[WebSocket]] = {}
 
+_OPEN_SIGNALING_SOCKETS = OPEN_WEBSOCKETS.labels("signaling")
+
+# "ice-candidates" batch frame'ini destekleyen client'lar
+ice_batch_clients: Set[WebSocket] = set()
+
+
+class IceCandidateBatcher:
+    """
+    Aynı göndericiden gelen trickle ICE candidate'larını kısa bir pencere
+    boyunca biriktirip odaya tek seferde iletir.
+
+    Batch destekleyen peer'lar tek bir "ice-candidates" frame'i alır,
+    diğerleri eskisi gibi tek tek "ice-candidate" mesajları alır.
+
+    Gönderimler kilit altında yapılır: zamanlayıcının başlattığı flush hâlâ
+    gönderirken gelen offer/answer, ``flush()`` o gönderim bitene kadar
+    beklediği için candidate'ların önüne geçemez.
+    """
+
+    def __init__(self, room_id: str, sender: WebSocket, window_ms: int):
+        self.room_id = room_id
+        self.sender = sender
+        self.window = window_ms / 1000.0
+        self.pending: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._send_lock = asyncio.Lock()
+
+    def add(self, message: Dict[str, Any]) -> None:
+        """Candidate'ı kuyruğa ekle, gerekirse flush zamanlayıcısını başlat"""
+        self.pending.append(message)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            return
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Bekleyen candidate'ları odadaki diğer peer'lara gönder.
+
+        Devam eden bir gönderim varsa önce onun bitmesini bekler; döndüğünde
+        bu göndericinin tüm candidate'ları iletilmiş olur.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        async with self._send_lock:
+            await self._send_pending()
+
+    async def _send_pending(self) -> None:
+        if not self.pending:
+            return
+
+        messages, self.pending = self.pending, []
+        batch_frame: Dict[str, Any] = {
+            "type": "ice-candidates",
+            "data": [m.get("data") for m in messages],
+        }
+        if "from" in messages[0]:
+            batch_frame["from"] = messages[0]["from"]
+
+        batch_text = json.dumps(batch_frame)
+        single_texts: Optional[List[str]] = None
+
+        sent_count = 0
+        for connection in list(active_connections.get(self.room_id, set())):
+            if connection == self.sender:
+                continue
+            try:
+                if connection in ice_batch_clients:
+                    await connection.send_text(batch_text)
+                else:
+                    if single_texts is None:
+                        single_texts = [json.dumps(m) for m in messages]
+                    for text in single_texts:
+                        await connection.send_text(text)
+                sent_count += 1
+            except Exception as e:
+                logger.error(f"Error sending ICE candidates: {e}")
+
+        logger.debug(
+            f"Room {self.room_id}: {len(messages)} ICE candidate iletildi ({sent_count} peer)"
+        )
+
+    def close(self) -> None:
+        """Bekleyen flush'ı iptal et (bağlantı kapanırken)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.pending = []
+
 
 async def send_ping(websocket: WebSocket):
     """Send periodic ping to keep connection alive"""
@@ -29,13 +129,23 @@ async def send_ping(websocket: WebSocket):
         pass
 
 
-@router.websocket("/ws/{room_id}")
-async def websocket_endpoint(websocket: WebSocket, room_id: str):
+async def join_room(room_id: str, websocket, ice_batch: bool = False) -> Optional[IceCandidateBatcher]:
     """
-    WebSocket endpoint for WebRTC signaling
-    Handles offer, answer, and ICE candidate exchange between peers
+    Bağlantıyı odaya ekle, diğer peer'lara ve yeni kullanıcıya bildir.
+
+    ``websocket`` ``send_text`` metodu olan herhangi bir nesne olabilir
+    (ör. multiplexed endpoint'in kanal adaptörü).
+
+    Returns:
+        Bu göndericinin ICE batcher'ı (pencere 0 ise None)
     """
-    await websocket.accept()
+    if ice_batch:
+        ice_batch_clients.add(websocket)
+    
+    # Bu göndericinin ICE candidate'larını birleştiren batcher (pencere 0 ise kapalı)
+    ice_batcher: Optional[IceCandidateBatcher] = None
+    if settings.SIGNALING_ICE_BATCH_WINDOW_MS > 0:
+        ice_batcher = IceCandidateBatcher(room_id, websocket, settings.SIGNALING_ICE_BATCH_WINDOW_MS)
     
     # Add connection to room
     if room_id not in active_connections:
@@ -63,38 +173,111 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         "data": {"room_id": room_id, "user_count": connection_count}
     }))
     
-    # Ping task'ı başlat (Render free tier için keep-alive)
-    ping_task = asyncio.create_task(send_ping(websocket))
+    return ice_batcher
+
+
+async def handle_signaling_message(
+    room_id: str,
+    websocket,
+    message: Dict[str, Any],
+    ice_batcher: Optional[IceCandidateBatcher] = None,
+) -> None:
+    """Tek bir signaling mesajını işle: ping/pong cevapla, diğerlerini odaya ilet"""
+    # Ping/pong mesajlarını işle
+    if message.get("type") == "ping":
+        await websocket.send_text(json.dumps({"type": "pong"}))
+        return
+    elif message.get("type") == "pong":
+        return  # Pong aldık, devam et
+    
+    # Trickle ICE candidate'larını kısa pencerede birleştir
+    if ice_batcher is not None:
+        if message.get("type") == "ice-candidate":
+            ice_batcher.add(message)
+            return
+        # Sıralamayı korumak için bekleyen candidate'ları önce gönder
+        await ice_batcher.flush()
+    
+    current_connections = active_connections.get(room_id, set())
+    logger.info(f"Room {room_id}: Mesaj alındı - Tip: {message.get('type')}, Bağlantı sayısı: {len(current_connections)}")
+    
+    # Broadcast message to all other clients in the room
+    # Set'in kopyasını al (iteration sırasında değişiklik hatası önlemek için)
+    sent_count = 0
+    for connection in list(current_connections):
+        if connection != websocket:
+            try:
+                await connection.send_text(json.dumps(message))
+                sent_count += 1
+                logger.info(f"Room {room_id}: Mesaj gönderildi (tip: {message.get('type')})")
+            except Exception as e:
+                logger.error(f"Error sending message: {e}")
+    
+    if sent_count == 0:
+        logger.warning(f"Room {room_id}: Mesaj gönderilemedi - diğer kullanıcı yok")
+
+
+async def leave_room(room_id: str, websocket, ice_batcher: Optional[IceCandidateBatcher] = None) -> None:
+    """Bağlantıyı odadan çıkar ve kalan peer'lara bildir"""
+    if ice_batcher is not None:
+        ice_batcher.close()
+    ice_batch_clients.discard(websocket)
+    
+    # Remove connection from room
+    if room_id in active_connections:
+        active_connections[room_id].discard(websocket)
+        
+        # Diğer kullanıcılara kullanıcının ayrıldığını bildir
+        # Set'in kopyasını al (iteration sırasında değişiklik hatası önlemek için)
+        remaining_connections = list(active_connections.get(room_id, set()))
+        remaining_count = len(remaining_connections)
+        
+        for connection in remaining_connections:
+            try:
+                await connection.send_text(json.dumps({
+                    "type": "user-left",
+                    "data": {"room_id": room_id, "user_count": remaining_count}
+                }))
+            except Exception:
+                pass
+        
+        # Odada kimse kalmadıysa odayı sil
+        if room_id in active_connections and not active_connections[room_id]:
+            del active_connections[room_id]
+
+
+@router.websocket("/ws/{room_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    room_id: str,
+    ice_batch: bool = Query(False, description="Client 'ice-candidates' batch frame'ini destekliyor mu"),
+):
+    """
+    WebSocket endpoint for WebRTC signaling
+    Handles offer, answer, and ICE candidate exchange between peers
+    """
+    slots = [(KIND_SIGNALING, room_id)]
+    if not await admission.admit(websocket, slots):
+        return
+    _OPEN_SIGNALING_SOCKETS.inc()
+    
+    joined = False
+    ice_batcher: Optional[IceCandidateBatcher] = None
+    ping_task: Optional[asyncio.Task] = None
     
     try:
+        await websocket.accept()
+        
+        joined = True
+        ice_batcher = await join_room(room_id, websocket, ice_batch=ice_batch)
+        
+        # Ping task'ı başlat (Render free tier için keep-alive)
+        ping_task = asyncio.create_task(send_ping(websocket))
+        
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            
-            # Ping/pong mesajlarını işle
-            if message.get("type") == "ping":
-                await websocket.send_text(json.dumps({"type": "pong"}))
-                continue
-            elif message.get("type") == "pong":
-                continue  # Pong aldık, devam et
-            
-            current_connections = active_connections.get(room_id, set())
-            logger.info(f"Room {room_id}: Mesaj alındı - Tip: {message.get('type')}, Bağlantı sayısı: {len(current_connections)}")
-            
-            # Broadcast message to all other clients in the room
-            # Set'in kopyasını al (iteration sırasında değişiklik hatası önlemek için)
-            sent_count = 0
-            for connection in list(current_connections):
-                if connection != websocket:
-                    try:
-                        await connection.send_text(json.dumps(message))
-                        sent_count += 1
-                        logger.info(f"Room {room_id}: Mesaj gönderildi (tip: {message.get('type')})")
-                    except Exception as e:
-                        logger.error(f"Error sending message: {e}")
-            
-            if sent_count == 0:
-                logger.warning(f"Room {room_id}: Mesaj gönderilemedi - diğer kullanıcı yok")
+            await handle_signaling_message(room_id, websocket, message, ice_batcher)
                         
     except WebSocketDisconnect:
         logger.info(f"Client disconnected from room {room_id}")
@@ -102,27 +285,10 @@ async def websocket_endpoint(websocket: WebSocket, room_id: str):
         logger.error(f"WebSocket error: {e}")
     finally:
         # Ping task'ı iptal et
-        ping_task.cancel()
+        if ping_task is not None:
+            ping_task.cancel()
         
-        # Remove connection from room
-        if room_id in active_connections:
-            active_connections[room_id].discard(websocket)
-            
-            # Diğer kullanıcılara kullanıcının ayrıldığını bildir
-            # Set'in kopyasını al (iteration sırasında değişiklik hatası önlemek için)
-            remaining_connections = list(active_connections.get(room_id, set()))
-            remaining_count = len(remaining_connections)
-            
-            for connection in remaining_connections:
-                try:
-                    await connection.send_text(json.dumps({
-                        "type": "user-left",
-                        "data": {"room_id": room_id, "user_count": remaining_count}
-                    }))
-                except Exception:
-                    pass
-            
-            # Odada kimse kalmadıysa odayı sil
-            if room_id in active_connections and not active_connections[room_id]:
-                del active_connections[room_id]
-
+        if joined:
+            await leave_room(room_id, websocket, ice_batcher)
+        admission.release(slots)
+        _OPEN_SIGNALING_SOCKETS.dec()
@@ -3,13 +3,37 @@ STT (Speech-to-Text) and Transcript WebSocket endpoints
 Canlı transkript sistemi için WebSocket endpoint'leri
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
-from typing import Dict, List
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
+from typing import Dict, List, Literal, Optional, Tuple
 import asyncio
 import logging
 import sys
+import time
 from pathlib import Path
 
+from app.core.audio_store import SessionAudioLog
+from app.core.admission import (
+    admission,
+    CapacityExceeded,
+    CLOSE_MESSAGE_TOO_BIG,
+    KIND_STT,
+    KIND_TRANSCRIPT,
+)
+from app.core.config import settings
+from app.core.load_monitor import load_monitor, INFLIGHT_STT
+from app.core.metrics import registry, OPEN_WEBSOCKETS
+from app.core.stt_trigger import stt_trigger
+from app.core.transcript_store import transcript_store
+from app.core.transcript_writer import transcript_writer
+from app.core.tracing import (
+    trace_store,
+    STAGE_BROADCAST_COMPLETED,
+    STAGE_DIFF_COMPUTED,
+    STAGE_STT_REQUEST_SENT,
+    STAGE_STT_RESPONSE_RECEIVED,
+    STAGE_THRESHOLD_REACHED,
+)
+
 logger = logging.getLogger(__name__)
 
 # Backend root dizinini path'e ekle (services/whisper_stt.py için)
@@ -17,13 +41,27 @@ backend_dir = Path(__file__).resolve().parent.parent.parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
+from services.instrumentation import current_session_id
+
 try:
-    from services.whisper_stt import transcribe_with_whisper_chunk
+    from services.stt_router import stt_router, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+    
+    from services.stt_scheduler import stt_scheduler, QueueTimeout
+    from services.stt_cache import stt_result_cache, audio_cache_key
+    
+    # Provider router: breaker, timeout, retry ve opsiyonel hedging
+    transcribe_audio_chunk = stt_router.transcribe
 except ImportError as e:
     # Fallback: Eğer import başarısız olursa dummy fonksiyon kullan
-    logger.warning(f"[STT] Whisper STT import edilemedi: {e}, dummy fonksiyon kullanılıyor")
+    logger.warning(f"[STT] STT router import edilemedi: {e}, dummy fonksiyon kullanılıyor")
+    stt_router = None
+    stt_scheduler = None
+    stt_result_cache = None
+    
+    class QueueTimeout(Exception):
+        pass
     
-    async def transcribe_with_whisper_chunk(audio_bytes: bytes, language: str = "tr") -> str:
+    async def transcribe_audio_chunk(audio_bytes: bytes, language: str = "tr") -> str:
         return "[Whisper STT import hatası - OPENAI_API_KEY kontrol edin]"
 
 router = APIRouter()
@@ -32,13 +70,108 @@ router = APIRouter()
 transcript_clients: Dict[str, List[WebSocket]] = {}
 
 # Session bazlı STT buffer state
-SESSION_BUFFERS: Dict[str, bytearray] = {}  # raw audio bytes per session
+SESSION_BUFFERS: Dict[str, SessionAudioLog] = {}  # raw audio per session (disk + RAM tail)
 SESSION_LAST_TEXT: Dict[str, str] = {}  # last full transcript returned by Whisper
 SESSION_LAST_PROCESSED_SIZE: Dict[str, int] = {}  # last buffer length for which we called Whisper
+SESSION_WINDOW_START: Dict[str, int] = {}  # buffer offset where the live STT window starts
+
+# Metrikler (label child'ları hot path'te lookup yapmamak için burada alınır)
+_OPEN_TRANSCRIPT_SOCKETS = OPEN_WEBSOCKETS.labels("transcript")
+_OPEN_STT_SOCKETS = OPEN_WEBSOCKETS.labels("stt")
+
+_STT_CALLS = registry.counter(
+    "stt_calls_total",
+    "STT threshold decisions per received chunk",
+    labels=("decision",),
+)
+_STT_CALLS_EXECUTED = _STT_CALLS.labels("executed")
+_STT_CALLS_SKIPPED = _STT_CALLS.labels("skipped")
+
+_STT_CACHE_LOOKUPS = registry.counter(
+    "stt_cache_lookups_total",
+    "STT result cache lookups by content hash",
+    labels=("result",),
+)
+_STT_CACHE_HITS = _STT_CACHE_LOOKUPS.labels("hit")
+_STT_CACHE_MISSES = _STT_CACHE_LOOKUPS.labels("miss")
+
+_WHISPER_DURATION = registry.histogram(
+    "stt_whisper_call_seconds",
+    "Duration of transcribe_with_whisper_chunk calls",
+)
+_CHUNK_TO_BROADCAST = registry.histogram(
+    "stt_chunk_to_broadcast_seconds",
+    "Time from receiving an audio chunk to finishing the transcript broadcast",
+)
+_BROADCAST_FANOUT = registry.histogram(
+    "transcript_broadcast_fanout_seconds",
+    "Time spent sending one transcript message to all session clients",
+)
+_BROADCAST_FAILURES = registry.counter(
+    "transcript_broadcast_failures_total",
+    "Transcript sends that failed and dropped the client",
+)
+_REPLAYED_FRAMES = registry.counter(
+    "transcript_replayed_frames_total",
+    "Transcript frames re-sent to clients resuming with ?since=<seq>",
+)
 
-# Threshold'lar
-MIN_FIRST_STT_BYTES = 40000  # don't call Whisper before buffer >= 40 KB
-MIN_DELTA_BYTES = 20000  # call Whisper again only if buffer increased by at least 20 KB
+registry.gauge(
+    "stt_session_buffer_bytes",
+    "Total session audio bytes in SESSION_BUFFERS (disk + memory)",
+    callback=lambda: sum(len(b) for b in SESSION_BUFFERS.values()),
+)
+registry.gauge(
+    "stt_session_buffer_resident_bytes",
+    "Session audio bytes held in memory (not yet spilled to disk)",
+    callback=lambda: sum(b.resident_bytes for b in SESSION_BUFFERS.values()),
+)
+registry.gauge(
+    "stt_session_buffers",
+    "Number of sessions with an audio buffer",
+    callback=lambda: len(SESSION_BUFFERS),
+)
+registry.gauge(
+    "stt_inflight_calls",
+    "STT provider calls currently in flight",
+    callback=lambda: load_monitor.inflight[INFLIGHT_STT],
+)
+registry.gauge(
+    "transcript_write_pending_segments",
+    "Transcript segments waiting for the write-behind flush",
+    callback=lambda: transcript_writer.pending,
+)
+registry.gauge(
+    "transcript_write_persisted_segments",
+    "Transcript segments persisted by the write-behind writer since startup",
+    callback=lambda: transcript_writer.persisted,
+)
+
+if stt_scheduler is not None:
+    registry.gauge(
+        "stt_scheduler_queued_jobs",
+        "STT jobs waiting in the fair scheduler queue",
+        callback=lambda: stt_scheduler.queued,
+    )
+    registry.gauge(
+        "stt_scheduler_running_jobs",
+        "STT jobs dispatched by the scheduler and still running",
+        callback=lambda: stt_scheduler.running,
+    )
+
+if stt_router is not None:
+    _BREAKER_STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+    for _provider in stt_router.providers:
+        registry.gauge(
+            f"stt_provider_{_provider.name}_circuit_state",
+            f"Circuit breaker state of the {_provider.name} STT provider (0=closed, 1=half_open, 2=open)",
+            callback=lambda p=_provider: _BREAKER_STATE_VALUES[p.breaker.state],
+        )
+        registry.gauge(
+            f"stt_provider_{_provider.name}_hedged_wins",
+            f"Hedged requests won by the {_provider.name} STT provider",
+            callback=lambda p=_provider: p.hedged_wins,
+        )
 
 
 def get_session_clients(session_id: str) -> List[WebSocket]:
@@ -48,7 +181,75 @@ def get_session_clients(session_id: str) -> List[WebSocket]:
     return transcript_clients[session_id]
 
 
-async def broadcast_transcript(session_id: str, role: str, text: str):
+def add_transcript_client(session_id: str, client) -> None:
+    """
+    Transcript client'ını session'a kaydet.
+
+    ``client`` ``send_json`` metodu olan herhangi bir nesne olabilir
+    (ör. multiplexed endpoint'in kanal adaptörü).
+    """
+    get_session_clients(session_id).append(client)
+
+
+def remove_transcript_client(session_id: str, client) -> None:
+    """Transcript client'ını session'dan çıkar"""
+    clients = transcript_clients.get(session_id)
+    if clients and client in clients:
+        clients.remove(client)
+
+
+def _display_role(role: str) -> str:
+    return "Aday" if role == "candidate" else "Görüşmeci"
+
+
+async def attach_transcript_client(session_id: str, client, since: Optional[int] = None) -> None:
+    """
+    Client'ı kaydet; ``since`` verildiyse önce kaçırılan mesajları tek bir
+    ``{"type": "replay", "frames": [...]}`` mesajında gönder.
+    
+    Replay gönderilirken gelen yeni mesajlar da replay'e eklenir; client
+    kaydı son kontrolle aynı adımda (await olmadan) yapıldığı için arada
+    mesaj kaybolmaz veya iki kez gönderilmez.
+    """
+    transcript = transcript_store.get(session_id) if since is not None else None
+    if transcript is not None:
+        reset = since > transcript.next_seq - 1
+        if reset:
+            # Client'ın seq'i sunucudakinden ileride (ör. restart): baştan gönder
+            since = 0
+        frames: List[Dict] = []
+        while True:
+            pending = transcript.frames_since(since)
+            if pending is None:
+                # Boşluk ring buffer'dan büyük: log'dan yeniden üret
+                pending = [
+                    {"role": _display_role(s.role), "text": s.text, "seq": s.seq}
+                    for s in transcript.since(since)
+                    if not s.committed
+                ]
+            if not pending:
+                break
+            frames.extend(pending)
+            since = pending[-1]["seq"]
+            await client.send_json({
+                "type": "replay",
+                "frames": pending,
+                "reset": reset,
+                "next_seq": transcript.next_seq,
+            })
+            reset = False
+        if frames:
+            _REPLAYED_FRAMES.inc(len(frames))
+            logger.info(
+                "[Transcript WS] Replayed %d frame(s) to reconnecting client (session_id=%s, up to seq=%d)",
+                len(frames),
+                session_id,
+                since,
+            )
+    add_transcript_client(session_id, client)
+
+
+async def broadcast_transcript(session_id: str, role: str, text: str, seq: Optional[int] = None):
     """
     Transcript mesajını session'daki tüm client'lara gönder
     
@@ -56,7 +257,18 @@ async def broadcast_transcript(session_id: str, role: str, text: str):
         session_id: Mülakat oturum ID'si
         role: "Aday" veya "Görüşmeci"
         text: Transcribe edilmiş metin
+        seq: Parçanın transcript_store'daki sıra numarası
     """
+    # Frontend'in beklediği format: { role, text, seq }
+    message = {
+        "role": role,
+        "text": text,
+    }
+    if seq is not None:
+        message["seq"] = seq
+        # Client bağlı olmasa da sakla: yeniden bağlanınca replay edilir
+        transcript_store.get_or_create(session_id).remember_frame(message)
+    
     clients = get_session_clients(session_id)
     
     if not clients:
@@ -65,21 +277,20 @@ async def broadcast_transcript(session_id: str, role: str, text: str):
     
     logger.info(f"[STT] Broadcasting transcript to {len(clients)} client(s): role={role}, text_length={len(text)}")
     
+    started = time.perf_counter()
     disconnected_clients = []
     
     for client in clients:
         try:
-            # Frontend'in beklediği format: { role, text }
-            message = {
-                "role": role,
-                "text": text,
-            }
             await client.send_json(message)
             logger.debug(f"[STT] Transcript sent to client: {message}")
         except Exception as e:
             logger.warning(f"[STT] Transcript gönderim hatası: {e}")
+            _BROADCAST_FAILURES.inc()
             disconnected_clients.append(client)
     
+    _BROADCAST_FANOUT.observe(time.perf_counter() - started)
+    
     # Bağlantısı kopan client'ları temizle
     for client in disconnected_clients:
         if client in clients:
@@ -90,7 +301,8 @@ async def broadcast_transcript(session_id: str, role: str, text: str):
 @router.websocket("/ws/transcript")
 async def transcript_ws(
     ws: WebSocket,
-    session_id: str = Query(..., description="Mülakat oturum ID'si")
+    session_id: str = Query(..., description="Mülakat oturum ID'si"),
+    since: Optional[int] = Query(None, ge=0, description="Son alınan mesajın seq'i (yeniden bağlanma)"),
 ):
     """
     Transcript broadcast WebSocket endpoint
@@ -100,14 +312,19 @@ async def transcript_ws(
     
     Query Params:
         session_id: Mülakat oturum ID'si
+        since: Verilirse bu seq'ten sonraki mesajlar tek bir "replay" mesajıyla gönderilir
     """
-    await ws.accept()
-    logger.info(f"[Transcript WS] Yeni client bağlandı. Session: {session_id}")
-    
-    clients = get_session_clients(session_id)
-    clients.append(ws)
+    slots = [(KIND_TRANSCRIPT, session_id)]
+    if not await admission.admit(ws, slots):
+        return
+    _OPEN_TRANSCRIPT_SOCKETS.inc()
     
     try:
+        await ws.accept()
+        logger.info(f"[Transcript WS] Yeni client bağlandı. Session: {session_id}")
+        
+        await attach_transcript_client(session_id, ws, since)
+        
         # Bağlantıyı açık tut
         while True:
             # Client'tan mesaj bekleme - sadece bağlantı kontrolü
@@ -127,8 +344,281 @@ async def transcript_ws(
     except Exception as e:
         logger.error(f"[Transcript WS] Hata: {e}")
     finally:
-        if ws in clients:
-            clients.remove(ws)
+        remove_transcript_client(session_id, ws)
+        admission.release(slots)
+        _OPEN_TRANSCRIPT_SOCKETS.dec()
+
+
+def _strip_overlap(prev_text: str, text: str) -> str:
+    """
+    Yeni pencerenin metninden önceki metnin sonuyla örtüşen baş kelimeleri at.
+    
+    Pencere Cluster başından başladığı için son transkript edilen noktadan
+    biraz önceki audio tekrar gönderilir.
+    """
+    prev_words = prev_text.split()
+    words = text.split()
+    for overlap in range(min(len(prev_words), len(words)), 0, -1):
+        if prev_words[-overlap:] == words[:overlap]:
+            return " ".join(words[overlap:])
+    return " ".join(words)
+
+
+async def transcribe_scheduled(session_id: str, role: str, audio_bytes: bytes) -> Tuple[str, Optional[float]]:
+    """
+    STT çağrısını process genelindeki fair scheduler üzerinden yap.
+    
+    Provider kotası veya eşzamanlılık sınırı doluyken çağrı kuyrukta bekler;
+    çok uzun beklerse atlanır (bir sonraki chunk buffer'ın tamamını zaten gönderir).
+    
+    Returns:
+        (metin, provider çağrısının süresi); cache hit veya kuyruk zaman
+        aşımında provider'a gidilmediği için süre None
+    """
+    provider_seconds: Optional[float] = None
+    
+    async def call_provider() -> str:
+        # Sadece provider çağrısı ölçülür (kuyruk beklemesi hariç)
+        nonlocal provider_seconds
+        started = time.perf_counter()
+        try:
+            return await transcribe_audio_chunk(audio_bytes, language="tr")
+        finally:
+            provider_seconds = time.perf_counter() - started
+    
+    if stt_scheduler is None:
+        text = await call_provider()
+        return text, provider_seconds
+    
+    # Aynı audio penceresi (reconnect / replay) daha önce transcribe edildiyse provider'a gitme
+    cache_key = None
+    if stt_result_cache.enabled:
+        cache_key = audio_cache_key(audio_bytes, stt_router.model_key, "tr")
+        cached = stt_result_cache.get(cache_key)
+        if cached is not None:
+            _STT_CACHE_HITS.inc()
+            logger.info("[STT] STT cache hit: session_id=%s, %d bytes", session_id, len(audio_bytes))
+            return cached, None
+        _STT_CACHE_MISSES.inc()
+    
+    try:
+        text = await stt_scheduler.run(session_id, role, call_provider)
+    except QueueTimeout:
+        logger.warning("[STT] STT job timed out in scheduler queue: session_id=%s, role=%s", session_id, role)
+        return "", None
+    
+    if cache_key is not None:
+        stt_result_cache.put(cache_key, text)
+    return text, provider_seconds
+
+
+async def transcribe_batch(session_id: str, audio_bytes: bytes, language: str = "tr") -> str:
+    """
+    Mülakat sonu (final-pass) STT çağrısı.
+    
+    Canlı çağrılarla aynı fair scheduler'dan görüşmeci sınıfında geçer; böylece
+    toplu işler canlı aday transkriptinin önüne geçmez. Parça atlanmasın diye
+    kuyruk bekleme sınırı uygulanmaz.
+    """
+    if stt_scheduler is None:
+        return await transcribe_audio_chunk(audio_bytes, language=language)
+    return await stt_scheduler.run(
+        session_id,
+        "interviewer",
+        lambda: transcribe_audio_chunk(audio_bytes, language=language),
+        max_wait_seconds=0,
+    )
+
+
+async def process_audio_chunk(
+    session_id: str,
+    role: str,
+    audio_bytes: bytes,
+    chunk_count: int,
+    received_at: Optional[float] = None,
+) -> None:
+    """
+    Tek bir audio chunk'ını session buffer'ına ekle, eşikler aşıldıysa
+    Whisper'ı çağır ve yeni metni transcript client'larına yayınla.
+    
+    Args:
+        session_id: Mülakat oturum ID'si
+        role: "candidate" (Aday) veya "interviewer" (Görüşmeci)
+        audio_bytes: MediaRecorder'dan gelen WebM chunk
+        chunk_count: Bu bağlantıdaki chunk sırası (loglama için)
+        received_at: Chunk'ın alındığı ``time.perf_counter()`` zamanı (kuyruklu çağıranlar için)
+    """
+    if received_at is None:
+        received_at = time.perf_counter()
+    
+    # Provider instrumentation'ı çağrıları bu session'a yazsın
+    current_session_id.set(session_id)
+    
+    # Çok küçük chunk'ları ignore et (noise)
+    if len(audio_bytes) < 2000:
+        logger.debug("[STT] Chunk too small (%d bytes), skipping", len(audio_bytes))
+        return
+    
+    # Session buffer'ını al veya oluştur
+    buffer = SESSION_BUFFERS.get(session_id)
+    if buffer is None:
+        buffer = SESSION_BUFFERS[session_id] = SessionAudioLog(session_id, role)
+    
+    # Buffer limitleri: sınırsız büyüyen session'lar instance'ı düşürmesin.
+    # RAM limiti sadece diske yazılmamış kuyruğa uygulanır; diske yazılan kayıt
+    # ayrı ve çok daha geniş bir limitle sınırlanır
+    limit_reached = None
+    if settings.MAX_SESSION_BUFFER_BYTES and buffer.resident_bytes + len(audio_bytes) > settings.MAX_SESSION_BUFFER_BYTES:
+        limit_reached = settings.MAX_SESSION_BUFFER_BYTES
+    elif settings.MAX_SESSION_AUDIO_DISK_BYTES and len(buffer) + len(audio_bytes) > settings.MAX_SESSION_AUDIO_DISK_BYTES:
+        limit_reached = settings.MAX_SESSION_AUDIO_DISK_BYTES
+    if limit_reached is not None:
+        logger.warning(
+            "[STT] Session buffer limit reached: session_id=%s, buffer_size=%d, resident=%d, limit=%d",
+            session_id,
+            len(buffer),
+            buffer.resident_bytes,
+            limit_reached,
+        )
+        raise CapacityExceeded(CLOSE_MESSAGE_TOO_BIG, "session audio buffer limit reached")
+    
+    # Yeni chunk'ı buffer'a ekle
+    buffer.append(audio_bytes)
+    total_size = len(buffer)
+    
+    trace = trace_store.start(session_id, chunk_count, role, len(audio_bytes), received_at)
+    
+    # Eşik sabit değil: session'ın byte hızı ve son STT gecikmesine göre ayarlanır
+    trigger = stt_trigger.get(session_id)
+    trigger.observe_chunk(len(audio_bytes), received_at)
+    
+    logger.info(
+        "[STT] Received audio chunk: %d bytes (chunk #%d), buffer_size=%d",
+        len(audio_bytes),
+        chunk_count,
+        total_size,
+    )
+    
+    # Son Whisper çağrısından bu yana ne kadar yeni veri geldi?
+    prev_size = SESSION_LAST_PROCESSED_SIZE.get(session_id, 0)
+    delta = total_size - prev_size
+    
+    logger.debug(
+        "[STT] Buffer state: total=%d, prev_processed=%d, delta=%d",
+        total_size,
+        prev_size,
+        delta,
+    )
+    
+    # Whisper çağrısı yapılacak mı?
+    if trigger.should_trigger(total_size, prev_size, time.perf_counter()):
+        logger.info(
+            "[STT] Calling Whisper: total_size=%d >= %d, delta=%d >= %d",
+            total_size,
+            settings.STT_MIN_FIRST_BYTES,
+            delta,
+            trigger.delta_bytes,
+        )
+        trace.mark(STAGE_THRESHOLD_REACHED)
+        
+        # Pencere sınırı aşıldıysa son transkript edilen noktadan yeni pencere aç;
+        # Whisper'a kaydın tamamı değil header + pencere gider
+        window_start = SESSION_WINDOW_START.get(session_id, 0)
+        if (
+            settings.STT_WINDOW_MAX_BYTES
+            and total_size - window_start > settings.STT_WINDOW_MAX_BYTES
+            and prev_size > window_start
+        ):
+            window_start = SESSION_WINDOW_START[session_id] = prev_size
+            logger.info("[STT] Sliding STT window: session_id=%s, window_start=%d", session_id, window_start)
+        # Pencerenin henüz metni yok: önceki pencerenin metniyle örtüşen baş kısım atılacak
+        window_fresh = window_start > 0 and prev_size == window_start
+        full_audio_bytes = await buffer.read_window(window_start)
+        _STT_CALLS_EXECUTED.inc()
+        trace.mark(STAGE_STT_REQUEST_SENT)
+        trigger.in_flight = True
+        try:
+            async with load_monitor.track(INFLIGHT_STT):
+                transcript_full, provider_seconds = await transcribe_scheduled(session_id, role, full_audio_bytes)
+        finally:
+            trigger.in_flight = False
+        # Cache hit ve kuyruk zaman aşımı provider gecikmesi değildir: EWMA'ya girmez
+        if provider_seconds is not None:
+            _WHISPER_DURATION.observe(provider_seconds)
+            trigger.record_call(provider_seconds, time.perf_counter())
+        trace.mark(STAGE_STT_RESPONSE_RECEIVED)
+        
+        if transcript_full and transcript_full.strip():
+            # Önceki tam text
+            prev_text = SESSION_LAST_TEXT.get(session_id, "")
+            
+            # Sadece yeni eklenen kısmı al
+            if window_fresh:
+                new_text = _strip_overlap(prev_text, transcript_full)
+            elif transcript_full.startswith(prev_text):
+                new_text = transcript_full[len(prev_text):].strip()
+            else:
+                # Eğer önceki text ile başlamıyorsa, tüm text'i yeni kabul et
+                new_text = transcript_full.strip()
+                logger.warning(
+                    "[STT] Transcript doesn't start with previous text, sending full transcript"
+                )
+            
+            trace.mark(STAGE_DIFF_COMPUTED)
+            
+            # State'i güncelle
+            SESSION_LAST_TEXT[session_id] = transcript_full
+            SESSION_LAST_PROCESSED_SIZE[session_id] = total_size
+            
+            logger.info(
+                "[STT] Whisper result - Full: %s | New: %s",
+                transcript_full[:100] + "..." if len(transcript_full) > 100 else transcript_full,
+                new_text[:100] + "..." if len(new_text) > 100 else new_text,
+            )
+            
+            # Yeni text'i broadcast et
+            if new_text:
+                # Server tarafı log: parça, aynı rolün önceki parçasının bitişinden şimdiye kadar sürer
+                transcript = transcript_store.get_or_create(session_id)
+                end = max(0.0, transcript.elapsed() - (time.perf_counter() - received_at))
+                start = next((s.end for s in reversed(transcript.segments) if s.role == role), 0.0)
+                segment = transcript.append(role, new_text, start=min(start, end), end=end)
+                # Veritabanına arka planda toplu yazılır; canlı yol beklemez
+                transcript_writer.enqueue(session_id, transcript, segment)
+                
+                role_display = _display_role(role)
+                logger.info("[STT] Broadcasting new text: [%s] %s", role_display, new_text)
+                await broadcast_transcript(session_id, role_display, new_text, seq=segment.seq)
+                trace.mark(STAGE_BROADCAST_COMPLETED)
+                _CHUNK_TO_BROADCAST.observe(time.perf_counter() - received_at)
+                logger.info("[STT] Transcript sent to client(s).")
+            else:
+                logger.debug("[STT] No new text to broadcast")
+        else:
+            logger.info("[STT] Whisper returned empty text, not broadcasting")
+    else:
+        _STT_CALLS_SKIPPED.inc()
+        logger.debug(
+            "[STT] Skipping Whisper call: total_size=%d < %d or delta=%d < %d",
+            total_size,
+            settings.STT_MIN_FIRST_BYTES,
+            delta,
+            trigger.delta_bytes,
+        )
+
+
+async def cleanup_stt_session(session_id: str) -> None:
+    """Session'ın STT buffer state'ini temizle (kayıt diskte kalır)"""
+    buffer = SESSION_BUFFERS.pop(session_id, None)
+    if buffer is not None:
+        await buffer.close()
+    SESSION_LAST_TEXT.pop(session_id, None)
+    SESSION_LAST_PROCESSED_SIZE.pop(session_id, None)
+    SESSION_WINDOW_START.pop(session_id, None)
+    stt_trigger.discard(session_id)
+    # Bağlantı kapandı: bekleyen transkript parçalarını yaz
+    await transcript_writer.flush()
+    logger.info("[STT] Cleaned up session state for session_id=%s", session_id)
 
 
 @router.websocket("/ws/stt")
@@ -147,112 +637,104 @@ async def stt_ws(
         session_id: Mülakat oturum ID'si
         role: "candidate" (Aday) veya "interviewer" (Görüşmeci)
     """
-    await ws.accept()
-    logger.info("[STT] WebSocket connected: session_id=%s, role=%s", session_id, role)
+    slots = [(KIND_STT, session_id)]
+    if not await admission.admit(ws, slots):
+        return
+    _OPEN_STT_SOCKETS.inc()
     
     chunk_count = 0
     
     try:
+        await ws.accept()
+        logger.info("[STT] WebSocket connected: session_id=%s, role=%s", session_id, role)
+        
         while True:
             # Binary audio data al
             audio_bytes = await ws.receive_bytes()
             chunk_count += 1
             
-            # Çok küçük chunk'ları ignore et (noise)
-            if len(audio_bytes) < 2000:
-                logger.debug("[STT] Chunk too small (%d bytes), skipping", len(audio_bytes))
-                continue
-            
-            # Session buffer'ını al veya oluştur
-            buffer = SESSION_BUFFERS.setdefault(session_id, bytearray())
-            
-            # Yeni chunk'ı buffer'a ekle
-            buffer.extend(audio_bytes)
-            total_size = len(buffer)
-            
-            logger.info(
-                "[STT] Received audio chunk: %d bytes (chunk #%d), buffer_size=%d",
-                len(audio_bytes),
-                chunk_count,
-                total_size,
-            )
-            
-            # Son Whisper çağrısından bu yana ne kadar yeni veri geldi?
-            prev_size = SESSION_LAST_PROCESSED_SIZE.get(session_id, 0)
-            delta = total_size - prev_size
-            
-            logger.debug(
-                "[STT] Buffer state: total=%d, prev_processed=%d, delta=%d",
-                total_size,
-                prev_size,
-                delta,
-            )
+            await process_audio_chunk(session_id, role, audio_bytes, chunk_count)
             
-            # Whisper çağrısı yapılacak mı?
-            if total_size >= MIN_FIRST_STT_BYTES and delta >= MIN_DELTA_BYTES:
-                logger.info(
-                    "[STT] Calling Whisper: total_size=%d >= %d, delta=%d >= %d",
-                    total_size,
-                    MIN_FIRST_STT_BYTES,
-                    delta,
-                    MIN_DELTA_BYTES,
-                )
-                
-                # Tam buffer'ı Whisper'a gönder
-                full_audio_bytes = bytes(buffer)
-                transcript_full = await transcribe_with_whisper_chunk(full_audio_bytes, language="tr")
-                
-                if transcript_full and transcript_full.strip():
-                    # Önceki tam text
-                    prev_text = SESSION_LAST_TEXT.get(session_id, "")
-                    
-                    # Sadece yeni eklenen kısmı al
-                    if transcript_full.startswith(prev_text):
-                        new_text = transcript_full[len(prev_text):].strip()
-                    else:
-                        # Eğer önceki text ile başlamıyorsa, tüm text'i yeni kabul et
-                        new_text = transcript_full.strip()
-                        logger.warning(
-                            "[STT] Transcript doesn't start with previous text, sending full transcript"
-                        )
-                    
-                    # State'i güncelle
-                    SESSION_LAST_TEXT[session_id] = transcript_full
-                    SESSION_LAST_PROCESSED_SIZE[session_id] = total_size
-                    
-                    logger.info(
-                        "[STT] Whisper result - Full: %s | New: %s",
-                        transcript_full[:100] + "..." if len(transcript_full) > 100 else transcript_full,
-                        new_text[:100] + "..." if len(new_text) > 100 else new_text,
-                    )
-                    
-                    # Yeni text'i broadcast et
-                    if new_text:
-                        role_display = "Aday" if role == "candidate" else "Görüşmeci"
-                        logger.info("[STT] Broadcasting new text: [%s] %s", role_display, new_text)
-                        await broadcast_transcript(session_id, role_display, new_text)
-                        logger.info("[STT] Transcript sent to client(s).")
-                    else:
-                        logger.debug("[STT] No new text to broadcast")
-                else:
-                    logger.info("[STT] Whisper returned empty text, not broadcasting")
-            else:
-                logger.debug(
-                    "[STT] Skipping Whisper call: total_size=%d < %d or delta=%d < %d",
-                    total_size,
-                    MIN_FIRST_STT_BYTES,
-                    delta,
-                    MIN_DELTA_BYTES,
-                )
-                    
     except WebSocketDisconnect:
         logger.info("[STT] WebSocket disconnected: session_id=%s", session_id)
+    except CapacityExceeded as e:
+        await ws.close(code=e.code, reason=e.reason)
     except Exception:
         logger.exception("[STT] Unexpected error in STT websocket")
     finally:
         # Session state'i temizle
-        SESSION_BUFFERS.pop(session_id, None)
-        SESSION_LAST_TEXT.pop(session_id, None)
-        SESSION_LAST_PROCESSED_SIZE.pop(session_id, None)
-        logger.info("[STT] Cleaned up session state for session_id=%s", session_id)
+        await cleanup_stt_session(session_id)
+        admission.release(slots)
+        _OPEN_STT_SOCKETS.dec()
+
+
+
+@router.get("/sessions/{session_id}/traces")
+async def get_session_traces(
+    session_id: str,
+    format: Literal["json", "chrome"] = Query("json", description="json veya chrome (trace-event JSON)"),
+):
+    """
+    Session'ın son STT chunk trace'leri (debug)
+    
+    Her trace chunk'ın alınmasından broadcast'in bitmesine kadar geçen
+    aşama sürelerini içerir. format=chrome, chrome://tracing veya
+    Perfetto'ya yüklenebilecek trace-event JSON döndürür.
+    """
+    traces = trace_store.get(session_id)
+    if traces is None:
+        raise HTTPException(status_code=404, detail="No traces recorded for this session")
+    
+    if format == "chrome":
+        return trace_store.to_chrome_trace(session_id)
+    
+    return {
+        "session_id": session_id,
+        "traces": [t.to_dict() for t in traces],
+    }
+
+
+@router.get("/sessions/{session_id}/transcript")
+async def get_session_transcript(
+    session_id: str,
+    since: int = Query(0, ge=0, description="Bu sıra numarasından sonraki parçalar"),
+):
+    """
+    Session'ın server tarafında tutulan transkripti
+    
+    Parçalar sıra numarası, rol, session başından itibaren başlangıç/bitiş
+    zamanı ve durum (canlı: tentative, final-pass: committed) içerir.
+    ``since`` ile sadece yeni parçalar alınabilir.
+    """
+    transcript = transcript_store.get(session_id)
+    if transcript is None:
+        raise HTTPException(status_code=404, detail="No transcript recorded for this session")
+    return transcript.to_dict(since=since)
+
 
+@router.get("/triggers")
+async def get_stt_triggers():
+    """
+    Adaptive STT tetikleme durumu (debug)
+    
+    Session başına güncel byte eşiği, gözlenen gecikme ve byte hızı ile
+    instance genelindeki dakikalık çağrı bütçesi kullanımı.
+    """
+    return stt_trigger.snapshot()
+
+
+@router.get("/providers")
+async def get_stt_providers():
+    """
+    STT provider router durumu (debug)
+    
+    Provider sırası, circuit breaker state'leri, hata sayıları ve
+    hedging kararında kullanılan p95 süreleri.
+    """
+    if stt_router is None:
+        raise HTTPException(status_code=503, detail="STT router not available")
+    return {
+        **stt_router.snapshot(),
+        "scheduler": stt_scheduler.snapshot(),
+        "cache": stt_result_cache.snapshot(),
+    }
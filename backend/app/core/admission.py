@@ -0,0 +1,163 @@
+"""
+Admission control for WebSocket endpoints
+Oda, session ve instance bazlı kapasite limitleri
+"""
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.load_monitor import load_monitor, INFLIGHT_STT
+
+logger = logging.getLogger(__name__)
+
+# Slot türleri
+KIND_SOCKET = "socket"  # instance genelinde fiziksel WebSocket
+KIND_SIGNALING = "signaling"  # oda başına signaling peer
+KIND_TRANSCRIPT = "transcript"  # session başına transcript client
+KIND_STT = "stt"  # session başına STT stream
+
+# Kapanış kodları
+CLOSE_POLICY_VIOLATION = 1008  # oda/session dolu - aynı anahtarla tekrar denemek anlamsız
+CLOSE_MESSAGE_TOO_BIG = 1009  # session buffer limiti aşıldı
+CLOSE_TRY_AGAIN_LATER = 1013  # instance dolu - başka instance'a yönlendirilebilir
+
+Slot = Tuple[str, str]
+
+
+class CapacityExceeded(Exception):
+    """Bir kapasite limiti aşıldığında bağlantının kapatılması için fırlatılır"""
+
+    def __init__(self, code: int, reason: str):
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    WebSocket bağlantıları için kapasite sayacı.
+
+    Tüm sayaçlar tek event loop üzerinde güncellendiği için kilit gerekmez.
+    Limit 0 ise ilgili kontrol devre dışıdır.
+    """
+
+    def __init__(self):
+        # kind -> key -> aktif slot sayısı
+        self._occupancy: Dict[str, Dict[str, int]] = {
+            KIND_SIGNALING: {},
+            KIND_TRANSCRIPT: {},
+            KIND_STT: {},
+        }
+        # kind -> instance genelindeki aktif slot sayısı
+        self._totals: Dict[str, int] = {
+            KIND_SOCKET: 0,
+            KIND_SIGNALING: 0,
+            KIND_TRANSCRIPT: 0,
+            KIND_STT: 0,
+        }
+        # kind -> reddedilen bağlantı sayısı
+        self._rejected: Dict[str, int] = {kind: 0 for kind in self._totals}
+
+    @staticmethod
+    def per_key_limits() -> Dict[str, int]:
+        return {
+            KIND_SIGNALING: settings.MAX_SIGNALING_PEERS_PER_ROOM,
+            KIND_TRANSCRIPT: settings.MAX_TRANSCRIPT_CLIENTS_PER_SESSION,
+            KIND_STT: settings.MAX_STT_STREAMS_PER_SESSION,
+        }
+
+    @staticmethod
+    def instance_limits() -> Dict[str, int]:
+        return {
+            KIND_SOCKET: settings.MAX_WEBSOCKETS,
+            KIND_STT: settings.MAX_STT_SESSIONS,
+        }
+
+    def _check(self, kind: str, key: str) -> Optional[CapacityExceeded]:
+        # Yeni STT stream'leri, instance doygunken kabul edilmez (load shedding)
+        if kind == KIND_STT:
+            saturation = load_monitor.saturation_reason(INFLIGHT_STT)
+            if saturation:
+                return CapacityExceeded(CLOSE_TRY_AGAIN_LATER, f"instance saturated ({saturation})")
+
+        instance_limit = self.instance_limits().get(kind, 0)
+        if instance_limit and self._totals[kind] >= instance_limit:
+            return CapacityExceeded(CLOSE_TRY_AGAIN_LATER, f"instance at capacity ({kind})")
+
+        key_limit = self.per_key_limits().get(kind, 0)
+        if key_limit and self._occupancy[kind].get(key, 0) >= key_limit:
+            return CapacityExceeded(CLOSE_POLICY_VIOLATION, f"{kind} limit reached for {key}")
+
+        return None
+
+    def try_acquire(self, slots: List[Slot]) -> Optional[CapacityExceeded]:
+        """
+        Slot'ları tek seferde ayır (ya hepsi ya hiçbiri).
+
+        Returns:
+            Limit aşıldıysa CapacityExceeded, aksi halde None
+        """
+        slots = [(KIND_SOCKET, "")] + list(slots)
+        for kind, key in slots:
+            rejection = self._check(kind, key)
+            if rejection is not None:
+                self._rejected[kind] += 1
+                return rejection
+
+        for kind, key in slots:
+            self._totals[kind] += 1
+            if kind in self._occupancy:
+                self._occupancy[kind][key] = self._occupancy[kind].get(key, 0) + 1
+        return None
+
+    def release(self, slots: List[Slot]) -> None:
+        """try_acquire ile ayrılan slot'ları geri bırak"""
+        for kind, key in [(KIND_SOCKET, "")] + list(slots):
+            self._totals[kind] = max(0, self._totals[kind] - 1)
+            if kind in self._occupancy:
+                remaining = self._occupancy[kind].get(key, 0) - 1
+                if remaining > 0:
+                    self._occupancy[kind][key] = remaining
+                else:
+                    self._occupancy[kind].pop(key, None)
+
+    async def admit(self, websocket: WebSocket, slots: List[Slot]) -> bool:
+        """
+        Bağlantıyı kabul etmeden önce kapasite kontrolü yap.
+
+        Limit aşılmışsa handshake tamamlanır ve bağlantı hemen kapanış
+        koduyla kapatılır; böylece client sebebi görebilir.
+
+        Returns:
+            Bağlantı kabul edilebilirse True
+        """
+        rejection = self.try_acquire(slots)
+        if rejection is None:
+            return True
+
+        logger.warning("[Admission] Bağlantı reddedildi: %s (code=%d)", rejection.reason, rejection.code)
+        try:
+            await websocket.accept()
+            await websocket.close(code=rejection.code, reason=rejection.reason)
+        except Exception:
+            pass
+        return False
+
+    def snapshot(self) -> Dict:
+        """Anlık doluluk, limitler ve red sayaçları"""
+        return {
+            "limits": {
+                "instance": self.instance_limits(),
+                "per_key": self.per_key_limits(),
+            },
+            "totals": dict(self._totals),
+            "rejected": dict(self._rejected),
+            "rooms": dict(self._occupancy[KIND_SIGNALING]),
+            "transcript_sessions": dict(self._occupancy[KIND_TRANSCRIPT]),
+            "stt_sessions": dict(self._occupancy[KIND_STT]),
+        }
+
+
+admission = AdmissionController()
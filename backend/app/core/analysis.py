@@ -0,0 +1,264 @@
+"""
+Interview analysis materialization
+Mülakat raporunu bir kez üretip saklar; transkript, prompt veya model
+değişmedikçe tekrar Gemini çağrısı yapılmaz
+
+Saklanan rapor, üretildiği transkriptin hash'i, prompt sürümü ve model adı
+ile birlikte tutulur. Okumada mevcut transkriptin hash'i hesaplanır ve üçü
+de eşleşiyorsa rapor doğrudan döndürülür.
+
+Tüm Gemini rapor çağrıları ortak bir token bucket'tan geçer
+(``GEMINI_REPORT_RPM``); 429 dönerse bucket Retry-After kadar kapatılıp
+çağrı tekrar denenir.
+"""
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+
+from app.core.config import settings
+from app.core.load_monitor import INFLIGHT_LLM, load_monitor
+from app.core.repositories import ReportRepository, TranscriptSegmentRepository, reports_repo, segments_repo
+from app.core.transcript_store import ROLE_CANDIDATE
+from services.gemini_report import (
+    GEMINI_REPORT_MODEL_NAME,
+    MIN_TRANSCRIPT_LENGTH,
+    REPORT_PROMPT_VERSION,
+    ReportRateLimited,
+    generate_interview_report,
+)
+from services.stt_router import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Mülakata bağlı olmayan transkript raporları için bellek içi LRU sınırı
+MAX_CACHED_TRANSCRIPT_REPORTS = 256
+
+
+class AnalysisUnavailable(Exception):
+    """Rapor üretilemedi (transkript yok / çok kısa veya model boş rapor döndü)"""
+
+
+def transcript_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16, person=b"report-src").hexdigest()
+
+
+class AnalysisService:
+    def __init__(self, reports: ReportRepository, segments: TranscriptSegmentRepository):
+        self.reports = reports
+        self.segments = segments
+        # (interview_id, dil, transkript hash'i, prompt, model) / transcript key -> devam eden üretim
+        # (aynı iş için tek Gemini çağrısı)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: set = set()
+        self._transcript_reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.limiter = TokenBucket(settings.GEMINI_REPORT_RPM)
+        self.generated = 0
+        self.served_from_storage = 0
+        self.rate_limited = 0
+
+    @staticmethod
+    def is_current(stored: Dict[str, Any], text_hash: str, language: str) -> bool:
+        return (
+            stored.get("transcript_hash") == text_hash
+            and stored.get("prompt_version") == REPORT_PROMPT_VERSION
+            and stored.get("model") == GEMINI_REPORT_MODEL_NAME
+            and stored.get("language") == language
+        )
+
+    def _single_flight(self, key: Hashable, factory: Callable[[], Awaitable[Dict[str, Any]]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        return task
+
+    async def get(self, interview_id: int, language: str = "tr") -> Dict[str, Any]:
+        """Güncel analizi döndür; saklanan rapor eskiyse veya yoksa üret"""
+        return (await self.ensure(interview_id, language))[0]
+
+    async def ensure(
+        self,
+        interview_id: int,
+        language: str = "tr",
+        gate: Optional[asyncio.Semaphore] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        ``get`` gibi; ek olarak raporun yeni üretilip üretilmediğini döndürür.
+        ``gate`` verilirse sadece üretim adımı onun altında bekler (saklanan
+        rapor beklemeden döner).
+        """
+        text = await self.segments.transcript_text(interview_id, role=ROLE_CANDIDATE)
+        text_hash = transcript_hash(text)
+        stored = await self._stored_current(interview_id, text_hash, language)
+        if stored is not None:
+            return stored, False
+
+        async with gate or nullcontext():
+            if gate is not None:
+                # Sıra beklerken aynı rapor başka bir istekte üretilmiş olabilir
+                stored = await self._stored_current(interview_id, text_hash, language)
+                if stored is not None:
+                    return stored, False
+            # Transkript değiştiyse eski metin için süren üretime bağlanılmaz
+            key = (interview_id, language, text_hash, REPORT_PROMPT_VERSION, GEMINI_REPORT_MODEL_NAME)
+            task = self._single_flight(key, lambda: self._generate(interview_id, language, text, text_hash))
+            # shield: bekleyen istek iptal edilse de üretim tamamlanıp saklanır
+            return await asyncio.shield(task), True
+
+    async def analyze_transcript(
+        self,
+        text: str,
+        language: str = "tr",
+        gate: Optional[asyncio.Semaphore] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Mülakata bağlı olmayan transkript için rapor; aynı transkript, dil,
+        prompt ve model için sonuç bellekte tutulur.
+        """
+        key = f"{transcript_hash(text)}:{language}:{REPORT_PROMPT_VERSION}:{GEMINI_REPORT_MODEL_NAME}"
+        cached = self._cached_transcript_report(key)
+        if cached is not None:
+            return cached, False
+
+        async def generate() -> Dict[str, Any]:
+            report = await self._report(text, language)
+            self._transcript_reports[key] = report
+            if len(self._transcript_reports) > MAX_CACHED_TRANSCRIPT_REPORTS:
+                self._transcript_reports.popitem(last=False)
+            self.generated += 1
+            return report
+
+        async with gate or nullcontext():
+            cached = self._cached_transcript_report(key)
+            if cached is not None:
+                return cached, False
+            return await asyncio.shield(self._single_flight(("transcript", key), generate)), True
+
+    async def _stored_current(self, interview_id: int, text_hash: str, language: str) -> Optional[Dict[str, Any]]:
+        stored = await self.reports.get(interview_id, language)
+        if stored is not None and self.is_current(stored, text_hash, language):
+            self.served_from_storage += 1
+            return stored
+        return None
+
+    def _cached_transcript_report(self, key: str) -> Optional[Dict[str, Any]]:
+        cached = self._transcript_reports.get(key)
+        if cached is not None:
+            self._transcript_reports.move_to_end(key)
+            self.served_from_storage += 1
+        return cached
+
+    async def _report(self, text: str, language: str) -> Dict[str, Any]:
+        """Gemini'den rapor al (kota beklemesi ve 429 sonrası tekrar ile)"""
+        if len(text.strip()) < MIN_TRANSCRIPT_LENGTH:
+            raise AnalysisUnavailable("Transcript is empty or too short")
+
+        for attempt in range(settings.REPORT_RATE_LIMIT_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                async with load_monitor.track(INFLIGHT_LLM):
+                    report = await asyncio.to_thread(
+                        generate_interview_report, transcript=text, language=language, raise_on_rate_limit=True
+                    )
+                break
+            except ReportRateLimited as e:
+                # Diğer bekleyen çağrılar da Retry-After dolana kadar durur
+                self.rate_limited += 1
+                self.limiter.penalize(e.retry_after)
+                logger.warning("[Analysis] Rate limited (attempt %d), backing off %.1fs", attempt + 1, e.retry_after)
+        else:
+            raise AnalysisUnavailable("Report model is rate limited, try again later")
+
+        # Servis hata durumunda boş rapor döndürür; bu saklanmaz, sonraki okuma tekrar dener
+        if not report.get("overall_comment") and not report.get("key_topics"):
+            raise AnalysisUnavailable("Report generation returned an empty report")
+        return report
+
+    async def _generate(self, interview_id: int, language: str, text: str, text_hash: str) -> Dict[str, Any]:
+        logger.info("[Analysis] Generating report for interview %d (len=%d chars)", interview_id, len(text))
+        report = await self._report(text, language)
+        await self.reports.save(
+            interview_id,
+            language,
+            report,
+            transcript_hash=text_hash,
+            prompt_version=REPORT_PROMPT_VERSION,
+            model=GEMINI_REPORT_MODEL_NAME,
+        )
+        self.generated += 1
+        return await self.reports.get(interview_id, language)
+
+    async def batch(
+        self,
+        items: List[Tuple[Optional[int], Optional[str]]],
+        language: str = "tr",
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        ``(interview_id, transcript)`` öğeleri için raporları üret ve her
+        sonucu biter bitmez döndür. Güncel raporu olanlar beklemeden
+        "cached" olarak döner; en fazla ``concurrency`` üretim aynı anda çalışır.
+        """
+        gate = asyncio.Semaphore(max(1, concurrency or settings.REPORT_BATCH_CONCURRENCY))
+
+        async def run(index: int, interview_id: Optional[int], transcript: Optional[str]) -> Dict[str, Any]:
+            result: Dict[str, Any] = {"index": index}
+            try:
+                if interview_id is not None:
+                    result["interview_id"] = interview_id
+                    stored, generated = await self.ensure(interview_id, language, gate=gate)
+                    report = stored["report"]
+                else:
+                    report, generated = await self.analyze_transcript(transcript or "", language, gate=gate)
+                result.update(status="generated" if generated else "cached", report=report)
+            except AnalysisUnavailable as e:
+                result.update(status="unavailable", error=str(e))
+            except Exception as e:
+                logger.exception("[Analysis] Batch item %d failed", index)
+                result.update(status="error", error=str(e))
+            return result
+
+        tasks = [asyncio.create_task(run(i, interview_id, text)) for i, (interview_id, text) in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # İstemci koptuysa bekleyen öğeler iptal edilir (başlamış mülakat üretimleri shield ile tamamlanır)
+            for task in tasks:
+                task.cancel()
+
+    def materialize_in_background(self, interview_id: int, language: str = "tr") -> None:
+        """Mülakat bitiminde raporu arka planda üret (hatalar loglanır)"""
+        async def run() -> None:
+            try:
+                await self.get(interview_id, language)
+            except AnalysisUnavailable as e:
+                logger.info("[Analysis] Interview %d not materialized: %s", interview_id, e)
+            except Exception:
+                logger.exception("[Analysis] Materialization failed for interview %d", interview_id)
+
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def close(self) -> None:
+        """Arka plan üretimlerini iptal et (lifespan shutdown)"""
+        tasks = list(self._background) + list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "generated": self.generated,
+            "served_from_storage": self.served_from_storage,
+            "in_flight": len(self._inflight),
+            "rate_limited": self.rate_limited,
+        }
+
+
+analysis_service = AnalysisService(reports_repo, segments_repo)
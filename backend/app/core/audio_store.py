@@ -0,0 +1,240 @@
+"""
+Session audio store
+Session audio'sunu append-only dosyaya yazar; RAM'de sadece diske
+yazılmamış kuyruk (tail) tutulur. Canlı STT için kaydın tamamı değil,
+WebM header + son Cluster'lardan oluşan sınırlı bir pencere okunur
+
+Her STT bağlantısı kendi segment dosyasını açar
+(``{AUDIO_STORAGE_PATH}/{session_id}/{role}-{timestamp}.webm``). MediaRecorder
+her yeni kayıtta WebM header'ı tekrar yazdığı için reconnect sonrası aynı
+dosyaya eklemek çözülemeyen bir dosya üretirdi. Dosyalar bağlantı kapandıktan
+sonra da diskte kalır (mülakat sonu işlemleri için).
+"""
+from bisect import bisect_right
+from pathlib import Path
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import re
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Dosya adında kullanılamayacak karakterler (session_id client'tan gelir)
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+# Matroska Cluster ID'si ve Cluster'ın ilk child'ı (Timecode); pencere sınırları
+# sadece bu ikisiyle doğrulanan Cluster başlangıçlarına konur
+_CLUSTER_ID = b"\x1f\x43\xb6\x75"
+_TIMECODE_ID = 0xE7
+
+
+def _safe_name(value: str) -> str:
+    # Baştaki noktalar atılır: "." / ".." dizin dışına çıkamasın
+    return _UNSAFE_CHARS.sub("_", value)[:128].lstrip(".") or "_"
+
+
+def session_audio_dir(session_id: str) -> Path:
+    """Session'ın segment dosyalarının bulunduğu dizin"""
+    return Path(settings.AUDIO_STORAGE_PATH) / _safe_name(session_id)
+
+
+def list_session_segments(session_id: str) -> List[Path]:
+    """Session'ın diske yazılmış segment dosyaları (eskiden yeniye)"""
+    directory = session_audio_dir(session_id)
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.is_file() and p.suffix == ".webm")
+
+
+def parse_segment_name(path: Path) -> Tuple[str, int]:
+    """Segment dosya adından (role, başlangıç zamanı ns)"""
+    role, _, started_ns = path.stem.rpartition("-")
+    try:
+        return role, int(started_ns)
+    except ValueError:
+        return path.stem, 0
+
+
+class SessionAudioLog:
+    """
+    Tek bir STT bağlantısının append-only audio log'u.
+
+    ``append`` sadece RAM'deki kuyruğa ekler; kuyruk
+    ``SESSION_AUDIO_FLUSH_BYTES``'ı geçince veya audio okunmadan önce
+    tek bir thread çağrısında diske yazılır. Disk kapalıysa
+    (``SESSION_AUDIO_SPILL_ENABLED=false``) veya yazma başarısız olursa
+    audio RAM'de kalır.
+    """
+
+    def __init__(self, session_id: str, role: str):
+        self.session_id = session_id
+        self.role = role
+        self.path: Optional[Path] = None
+        if settings.SESSION_AUDIO_SPILL_ENABLED:
+            self.path = session_audio_dir(session_id) / f"{_safe_name(role)}-{time.time_ns()}.webm"
+        self._pending = bytearray()
+        self._flushed = 0
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._spill_failed = False
+        # Cluster başlangıç offset'leri (ilki = header sonu); tarama parçalar arasında devam eder
+        self._cluster_offsets: List[int] = []
+        self._scan_carry = b""
+        self._scan_base = 0
+
+    def __len__(self) -> int:
+        """Toplam audio boyutu (disk + RAM)"""
+        return self._flushed + len(self._pending)
+
+    @property
+    def resident_bytes(self) -> int:
+        """RAM'de tutulan (henüz diske yazılmamış) byte sayısı"""
+        return len(self._pending)
+
+    @property
+    def spilling(self) -> bool:
+        return self.path is not None and not self._spill_failed
+
+    def append(self, data: bytes) -> None:
+        """Chunk'ı ekle; kuyruk dolduysa arka planda diske yaz"""
+        self._scan_clusters(data)
+        self._pending.extend(data)
+        if (
+            self.spilling
+            and len(self._pending) >= settings.SESSION_AUDIO_FLUSH_BYTES
+            and (self._flush_task is None or self._flush_task.done())
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def _scan_clusters(self, data: bytes) -> None:
+        # Chunk sınırına denk gelen ID / size / Timecode bir sonraki append'te taranır
+        buf = self._scan_carry + data
+        keep_from = max(0, len(buf) - (len(_CLUSTER_ID) - 1))
+        pos = 0
+        while True:
+            i = buf.find(_CLUSTER_ID, pos)
+            if i < 0:
+                break
+            size_pos = i + len(_CLUSTER_ID)
+            if size_pos >= len(buf):
+                keep_from = min(keep_from, i)
+                break
+            first = buf[size_pos]
+            if first:
+                child_pos = size_pos + 9 - first.bit_length()
+                if child_pos >= len(buf):
+                    keep_from = min(keep_from, i)
+                    break
+                if buf[child_pos] == _TIMECODE_ID:
+                    self._cluster_offsets.append(self._scan_base + i)
+            pos = i + 1
+        self._scan_carry = buf[keep_from:]
+        self._scan_base += keep_from
+
+    def _write(self, data: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    async def flush(self) -> None:
+        """Bekleyen byte'ları tek yazma çağrısında diske ekle"""
+        async with self._lock:
+            if not self.spilling or not self._pending:
+                return
+            data = bytes(self._pending)
+            try:
+                await asyncio.to_thread(self._write, data)
+            except OSError:
+                # Disk sorunu transkripti durdurmasın: audio RAM'de kalmaya devam eder
+                self._spill_failed = True
+                logger.exception("[AudioStore] Spill failed, keeping session audio in memory: %s", self.path)
+                return
+            # Yazma sırasında gelen chunk'lar kuyrukta kalır
+            del self._pending[: len(data)]
+            self._flushed += len(data)
+
+    def _read_prefix(self, length: int) -> bytes:
+        # Büyük read() sonucu doğrudan dönen bytes nesnesine okunur (ara kopya yok)
+        with open(self.path, "rb") as f:
+            return f.read(length)
+
+    def _read_ranges(self, ranges: List[Tuple[int, int, int]], out: bytearray) -> None:
+        # (dosya başı, dosya sonu, çıktı offset'i): doğrudan çıktı buffer'ına okunur
+        with open(self.path, "rb") as f, memoryview(out) as view:
+            for start, end, offset in ranges:
+                f.seek(start)
+                f.readinto(view[offset:offset + end - start])
+
+    async def read_all(self) -> bytes:
+        """
+        Kaydın tamamını döndür (çağrı anındaki uzunlukta).
+
+        Kuyruk önce diske yazılır, kayıt dosyadan tek ``read`` ile alınır:
+        her STT tetiklemesinde kaydın tamamı bir kez kopyalanır, parçalar
+        ayrıca birleştirilmez. Disk kapalıysa kuyruk tek kopyayla döner.
+        """
+        length = len(self)
+        await self.flush()
+        async with self._lock:
+            flushed = self._flushed
+            if flushed >= length:
+                tail = None
+            else:
+                # Spill kapalı veya yazma başarısız: eksik kısım RAM'de
+                with memoryview(self._pending) as pending:
+                    tail = bytes(pending[: length - flushed])
+        if not flushed:
+            return tail or b""
+        head = await asyncio.to_thread(self._read_prefix, min(flushed, length))
+        return head if tail is None else head + tail
+
+    async def read_window(self, start: int) -> bytearray:
+        """
+        WebM header + ``start``'ı içeren Cluster'dan kaydın sonuna kadar olan kısım.
+
+        Çıktı tek başına çözülebilir bir WebM'dir ve boyutu kaydın toplam
+        uzunluğuna değil pencereye bağlıdır: sadece header ve pencere aralığı
+        dosyadan okunur. ``start`` ilk Cluster'dan önceyse veya Cluster
+        sınırları bulunamadıysa (WebM değil) kaydın tamamı döner.
+        """
+        length = len(self)
+        index = bisect_right(self._cluster_offsets, start) - 1
+        if index <= 0:
+            return await self.read_all()
+        header_end = self._cluster_offsets[0]
+        body_start = self._cluster_offsets[index]
+        await self.flush()
+        out = bytearray(header_end + length - body_start)
+        disk_ranges = []
+        async with self._lock:
+            flushed = self._flushed
+            offset = 0
+            with memoryview(self._pending) as pending:
+                for range_start, end in ((0, header_end), (body_start, length)):
+                    if range_start < flushed:
+                        disk_ranges.append((range_start, min(end, flushed), offset))
+                    if end > flushed:
+                        # Diske yazılmamış kısım RAM kuyruğundan kopyalanır
+                        ram_start = max(range_start, flushed)
+                        ram_offset = offset + ram_start - range_start
+                        out[ram_offset:offset + end - range_start] = pending[ram_start - flushed:end - flushed]
+                    offset += end - range_start
+        if disk_ranges:
+            await asyncio.to_thread(self._read_ranges, disk_ranges, out)
+        return out
+
+    async def close(self) -> None:
+        """Kalan kuyruğu diske yaz (dosya silinmez)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            await self._flush_task
+        await self.flush()
+        if self.spilling and self._flushed:
+            logger.info(
+                "[AudioStore] Session audio saved: session_id=%s, path=%s, %d bytes",
+                self.session_id,
+                self.path,
+                self._flushed,
+            )
@@ -0,0 +1,187 @@
+"""
+Bulk import / export helpers
+NDJSON ve CSV gövdelerini akış halinde satır satır okur ve yazar
+
+Okuma tarafı istek gövdesini parça parça alır, sadece yarım kalan son
+satırı bellekte tutar; yazma tarafı satırları küçük tamponlar halinde
+üretir. Böylece bellek kullanımı veri boyutundan bağımsızdır.
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+import codecs
+import csv
+import io
+import json
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+MEDIA_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+
+# Content-Type -> format
+_CONTENT_TYPES = {
+    "application/x-ndjson": FORMAT_NDJSON,
+    "application/ndjson": FORMAT_NDJSON,
+    "application/jsonl": FORMAT_NDJSON,
+    "application/x-jsonlines": FORMAT_NDJSON,
+    "text/csv": FORMAT_CSV,
+    "application/csv": FORMAT_CSV,
+}
+
+# Tek satır/kayıt için üst sınır (yeni satır içermeyen dev gövde belleği doldurmasın)
+MAX_RECORD_CHARS = 64 * 1024
+
+# Export'ta bir parçada biriktirilen yaklaşık karakter sayısı
+EXPORT_CHUNK_CHARS = 64 * 1024
+
+
+class RecordTooLarge:
+    """``MAX_RECORD_CHARS``'ı aşan satırın yerine üretilen işaret"""
+
+
+# (satır numarası, kayıt veya hata mesajı)
+Record = Tuple[int, Union[Dict[str, Any], str]]
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Union[str, RecordTooLarge]]:
+    """
+    Byte parçalarından satırlar (UTF-8, BOM atlanır, satır sonu ayrılır).
+
+    Çok uzun satırlar atlanır ve yerlerine ``RecordTooLarge`` üretilir.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    skipping = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if skipping:
+                # Uzun satırın kalan kısmı
+                skipping = False
+                continue
+            yield line[:-1] if line.endswith("\r") else line
+        if len(buffer) > MAX_RECORD_CHARS:
+            if not skipping:
+                yield RecordTooLarge()
+            skipping = True
+            buffer = ""
+    buffer += decoder.decode(b"", final=True)
+    if buffer and not skipping:
+        yield buffer[:-1] if buffer.endswith("\r") else buffer
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """Her satır bir JSON nesnesi; boş satırlar atlanır"""
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if isinstance(line, RecordTooLarge):
+            yield line_no, f"Line exceeds {MAX_RECORD_CHARS} characters"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, "Expected a JSON object"
+            continue
+        yield line_no, record
+
+
+async def iter_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    """
+    İlk kayıt başlık satırıdır; kayıtlar başlık adlarıyla sözlüğe çevrilir.
+
+    Tırnak içindeki satır sonları desteklenir: tırnak sayısı tek kaldıkça
+    sonraki satır aynı kayda eklenir. Boş hücreler atlanır (None sayılır).
+    """
+    header: Optional[List[str]] = None
+    line_no = 0
+    record_start = 0
+    parts: List[str] = []
+    quotes = 0
+    size = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if isinstance(line, RecordTooLarge):
+            parts, quotes, size = [], 0, 0
+            yield line_no, f"Line exceeds {MAX_RECORD_CHARS} characters"
+            continue
+        if not parts:
+            record_start = line_no
+        parts.append(line)
+        quotes += line.count('"')
+        size += len(line)
+        if quotes % 2:
+            if size > MAX_RECORD_CHARS:
+                parts, quotes, size = [], 0, 0
+                yield record_start, f"Record exceeds {MAX_RECORD_CHARS} characters"
+            continue
+        text, parts, quotes, size = "\n".join(parts), [], 0, 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text], strict=True))
+        except csv.Error as e:
+            yield record_start, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) > len(header):
+            yield record_start, f"Expected at most {len(header)} columns, got {len(values)}"
+            continue
+        yield record_start, {name: value for name, value in zip(header, values) if name and value != ""}
+    if parts:
+        yield record_start, "Unterminated quoted field"
+
+
+def parse_records(fmt: str, chunks: AsyncIterable[bytes]) -> AsyncIterator[Record]:
+    return iter_ndjson(chunks) if fmt == FORMAT_NDJSON else iter_csv(chunks)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+async def encode_rows(
+    fmt: str,
+    rows: AsyncIterable[Dict[str, Any]],
+    columns: Sequence[str],
+) -> AsyncIterator[str]:
+    """
+    Satırları NDJSON veya CSV (başlıklı) olarak ~``EXPORT_CHUNK_CHARS``'lık
+    parçalar halinde üret. CSV'de listeler "; " ile birleştirilir.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n") if fmt == FORMAT_CSV else None
+    if writer is not None:
+        writer.writerow(columns)
+    async for row in rows:
+        if writer is not None:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+        else:
+            buffer.write(json.dumps({column: row.get(column) for column in columns}, ensure_ascii=False))
+            buffer.write("\n")
+        if buffer.tell() >= EXPORT_CHUNK_CHARS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -19,8 +19,23 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "AI Interview Analysis System"
     
-    # Database
+    # Database (None = sqlite:///./data/ik_mulakat.db)
     DATABASE_URL: Optional[str] = None
+    DATABASE_POOL_SIZE: int = 4  # havuzdaki bağlantı sayısı
+    DATABASE_BUSY_TIMEOUT_MS: int = 5000  # yazma kilidi bekleme süresi
+    
+    # Transkript parçalarının toplu (write-behind) yazımı
+    TRANSCRIPT_WRITE_BATCH_SIZE: int = 200  # bu kadar parça birikince hemen yaz
+    TRANSCRIPT_WRITE_INTERVAL_SECONDS: float = 2.0  # en geç bu sürede bir yaz
+    TRANSCRIPT_WRITE_MAX_PENDING: int = 20000  # DB erişilemezken bellekte tutulan üst sınır
+    
+    # Rapor üretimi (Gemini): dakikadaki istek kotası (0 = sınırsız), 429 sonrası tekrar sayısı.
+    # Kota /ai/report, /ai/report/batch ve mülakat sonu rapor üretimi arasında ortaktır
+    GEMINI_REPORT_RPM: int = 0
+    REPORT_RATE_LIMIT_RETRIES: int = 2
+    # POST /ai/report/batch: istek başına en fazla öğe ve varsayılan eşzamanlılık
+    REPORT_BATCH_MAX_ITEMS: int = 100
+    REPORT_BATCH_CONCURRENCY: int = 4
     
     # Security
     SECRET_KEY: Optional[str] = None
@@ -39,10 +54,50 @@ class Settings(BaseSettings):
     # WebRTC
     STUN_SERVER: Optional[str] = None
     TURN_SERVER: Optional[str] = None
+    # Trickle ICE candidate'larını birleştirme penceresi (ms, 0 = kapalı)
+    SIGNALING_ICE_BATCH_WINDOW_MS: int = 5
+    
+    # Admission control (0 = limitsiz)
+    MAX_WEBSOCKETS: int = 500  # instance başına toplam WebSocket
+    MAX_STT_SESSIONS: int = 50  # instance başına eşzamanlı STT stream
+    MAX_SIGNALING_PEERS_PER_ROOM: int = 4
+    MAX_TRANSCRIPT_CLIENTS_PER_SESSION: int = 8
+    MAX_STT_STREAMS_PER_SESSION: int = 2
+    # Session audio'sunun RAM'de tutulan (diske yazılmamış) kısmı için limit
+    MAX_SESSION_BUFFER_BYTES: int = 25 * 1024 * 1024
+    # Session audio'sunun toplam (disk + RAM) boyutu; uzun mülakatlar için geniş tutulur
+    MAX_SESSION_AUDIO_DISK_BYTES: int = 1024 * 1024 * 1024
+    
+    # Load shedding (0 = kapalı)
+    LOOP_LAG_SAMPLE_INTERVAL_MS: int = 500
+    LOADSHED_MAX_LOOP_LAG_MS: int = 1000
+    LOADSHED_MAX_INFLIGHT_STT: int = 20
+    LOADSHED_MAX_INFLIGHT_LLM: int = 10
+    
+    # STT chunk tracing (session başına saklanan son trace sayısı, 0 = kapalı)
+    STT_TRACE_BUFFER_SIZE: int = 50
+    
+    # Adaptive STT tetikleme
+    STT_MIN_FIRST_BYTES: int = 40000  # ilk çağrı için gereken minimum buffer (WebM header + konuşma)
+    STT_MIN_DELTA_BYTES: int = 8000  # iki çağrı arası minimum yeni audio
+    STT_MAX_DELTA_BYTES: int = 160000  # iki çağrı arası maksimum yeni audio
+    STT_TARGET_LAG_SECONDS: float = 4.0  # hedef ortalama transkript gecikmesi
+    STT_CALLS_PER_MINUTE_BUDGET: int = 300  # instance genelinde dakikalık STT çağrısı (0 = sınırsız)
+    # Canlı STT'ye gönderilen audio penceresi; aşılınca pencere son işlenen noktaya kayar (0 = tüm kayıt)
+    STT_WINDOW_MAX_BYTES: int = 8 * 1024 * 1024
+    
+    # Transcript WS yeniden bağlanınca tekrar gönderilebilen son mesaj sayısı (session başına)
+    TRANSCRIPT_REPLAY_FRAMES: int = 256
+    
+    # Provider SDK'larını startup sonrası arka planda yükle (saniye, negatif = kapalı)
+    PROVIDER_SDK_WARMUP_DELAY_SECONDS: float = 1.0
     
     # File Storage
     AUDIO_STORAGE_PATH: str = "./data/audio"
     TEMP_STORAGE_PATH: str = "./data/temp"
+    # Session audio'sunu AUDIO_STORAGE_PATH altına yaz; RAM'de sadece yazılmamış kuyruk kalır
+    SESSION_AUDIO_SPILL_ENABLED: bool = True
+    SESSION_AUDIO_FLUSH_BYTES: int = 256 * 1024  # toplu disk yazma eşiği
 
 
 settings = Settings()
@@ -0,0 +1,377 @@
+"""
+Async database access
+SQLite (aiosqlite) bağlantı havuzu ve şema migration'ları
+
+Şema ve sorgular Postgres ile uyumlu SQL alt kümesiyle yazılır
+(``RETURNING``, ``ON CONFLICT``, standart tipler); sadece otomatik artan
+primary key dialect'e göre seçilir.
+"""
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+
+import aiosqlite
+
+from app.core.config import settings
+from app.core.text_search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = "sqlite:///./data/ik_mulakat.db"
+
+# Otomatik artan primary key (Postgres: BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY)
+PK = "INTEGER PRIMARY KEY"
+
+
+
+# Arama index'inde rowid = interview_id << 24 | kind << 22 | slot; eşleşmeleri
+# mülakata göre gruplamak ve role göre süzmek için içerik tablosuna gidilmez
+SEARCH_KIND_CANDIDATE = 0
+SEARCH_KIND_INTERVIEWER = 1
+SEARCH_KIND_TOPIC = 2
+SEARCH_ROLE_KINDS = {"candidate": SEARCH_KIND_CANDIDATE, "interviewer": SEARCH_KIND_INTERVIEWER}
+_SEARCH_SLOT_BITS = 22
+
+
+def search_rowid(interview_id: int, kind: int, slot: int) -> int:
+    return (interview_id << 24) | (kind << _SEARCH_SLOT_BITS) | (slot & ((1 << _SEARCH_SLOT_BITS) - 1))
+
+
+# Rapor konuları dil başına ayrı slot aralığında tutulur (aynı mülakatın
+# tr ve en raporları birbirinin konularını silmesin)
+REPORT_LANGUAGES = ("tr", "en")
+TOPIC_SLOTS_PER_LANGUAGE = 1 << 10
+
+
+def topic_slot_range(language: str) -> Tuple[int, int]:
+    """Dilin konu slot aralığı (başlangıç, bitiş dahil)"""
+    index = REPORT_LANGUAGES.index(language) if language in REPORT_LANGUAGES else len(REPORT_LANGUAGES)
+    start = index * TOPIC_SLOTS_PER_LANGUAGE
+    return start, start + TOPIC_SLOTS_PER_LANGUAGE - 1
+
+
+async def _backfill_search_index(conn: aiosqlite.Connection) -> None:
+    """Mevcut transkript parçalarını arama index'ine ekle (migration 2)"""
+    async with conn.execute("SELECT interview_id, seq, role, text FROM transcript_segments") as cursor:
+        rows = [
+            (search_rowid(interview_id, SEARCH_ROLE_KINDS.get(role, SEARCH_KIND_INTERVIEWER), seq), normalize_text(text), text)
+            for interview_id, seq, role, text in await cursor.fetchall()
+        ]
+    await conn.executemany("INSERT INTO interview_search (rowid, content, original) VALUES (?, ?, ?)", rows)
+
+
+async def _reindex_report_topics(conn: aiosqlite.Connection) -> None:
+    """Rapor konularını dile göre slot aralıklarıyla yeniden indeksle (migration 4)"""
+    await conn.execute(
+        "DELETE FROM interview_search WHERE (rowid >> ?) & 3 = ?", (_SEARCH_SLOT_BITS, SEARCH_KIND_TOPIC)
+    )
+    async with conn.execute("SELECT interview_id, language, report_json FROM reports") as cursor:
+        reports = await cursor.fetchall()
+    rows = []
+    for interview_id, language, report_json in reports:
+        topics = [t for t in json.loads(report_json).get("key_topics") or [] if isinstance(t, str) and t.strip()]
+        start, _ = topic_slot_range(language)
+        rows.extend(
+            (search_rowid(interview_id, SEARCH_KIND_TOPIC, start + i), normalize_text(topic), topic)
+            for i, topic in enumerate(topics[:TOPIC_SLOTS_PER_LANGUAGE])
+        )
+    await conn.executemany("INSERT INTO interview_search (rowid, content, original) VALUES (?, ?, ?)", rows)
+
+
+# (version, statements) - sadece sona ekleme yapılır, eski migration'lar değiştirilmez.
+# Statement SQL string'i veya ``async fn(conn)`` olabilir.
+MIGRATIONS: List[tuple] = [
+    (
+        1,
+        [
+            f"""
+            CREATE TABLE candidates (
+                id {PK},
+                full_name TEXT NOT NULL,
+                email TEXT UNIQUE,
+                phone TEXT,
+                position TEXT,
+                notes TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """,
+            "CREATE INDEX ix_candidates_position_id ON candidates (position, id)",
+            f"""
+            CREATE TABLE interviews (
+                id {PK},
+                session_id TEXT NOT NULL UNIQUE,
+                candidate_id INTEGER REFERENCES candidates (id) ON DELETE SET NULL,
+                position TEXT,
+                status TEXT NOT NULL DEFAULT 'scheduled',
+                started_at TEXT,
+                ended_at TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """,
+            # Aday geçmişi ve durum filtresi keyset sayfalama ile index üzerinden okunur
+            "CREATE INDEX ix_interviews_candidate_id_id ON interviews (candidate_id, id)",
+            "CREATE INDEX ix_interviews_status_id ON interviews (status, id)",
+            "CREATE INDEX ix_interviews_position_id ON interviews (position, id)",
+            f"""
+            CREATE TABLE transcript_segments (
+                id {PK},
+                interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                start_seconds REAL NOT NULL,
+                end_seconds REAL NOT NULL,
+                text TEXT NOT NULL,
+                committed BOOLEAN NOT NULL DEFAULT FALSE,
+                created_at TEXT NOT NULL,
+                UNIQUE (interview_id, seq)
+            )
+            """,
+            f"""
+            CREATE TABLE reports (
+                id {PK},
+                interview_id INTEGER NOT NULL UNIQUE REFERENCES interviews (id) ON DELETE CASCADE,
+                language TEXT NOT NULL,
+                overall_score REAL,
+                report_json TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        [
+            # Transkript parçaları ve rapor konuları için ters index (SQLite FTS5;
+            # Postgres'te tsvector + GIN karşılığıdır). ``content`` normalize
+            # edilmiş metindir, ``original`` sonuçta gösterilir.
+            """
+            CREATE VIRTUAL TABLE interview_search USING fts5(
+                content,
+                original UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """,
+            _backfill_search_index,
+        ],
+    ),
+    (
+        3,
+        [
+            # Materialize edilen analiz: hangi transkript / prompt / model ile üretildiği
+            "ALTER TABLE reports ADD COLUMN transcript_hash TEXT",
+            "ALTER TABLE reports ADD COLUMN prompt_version TEXT",
+            "ALTER TABLE reports ADD COLUMN model TEXT",
+        ],
+    ),
+    (
+        4,
+        [
+            # Rapor mülakat + dil başına tutulur (tr ve en birbirinin üzerine yazmasın)
+            f"""
+            CREATE TABLE reports_new (
+                id {PK},
+                interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+                language TEXT NOT NULL,
+                overall_score REAL,
+                report_json TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                transcript_hash TEXT,
+                prompt_version TEXT,
+                model TEXT,
+                UNIQUE (interview_id, language)
+            )
+            """,
+            "INSERT INTO reports_new SELECT id, interview_id, language, overall_score, report_json, created_at, "
+            "transcript_hash, prompt_version, model FROM reports",
+            "DROP TABLE reports",
+            "ALTER TABLE reports_new RENAME TO reports",
+            _reindex_report_topics,
+        ],
+    ),
+]
+
+
+class ConstraintError(ValueError):
+    """Unique / foreign key kısıtı ihlali (ör. aynı e-posta ile ikinci aday)"""
+
+
+def _sqlite_path(url: Optional[str]) -> str:
+    """``sqlite:///relative.db`` / ``sqlite:////abs.db`` URL'sinden dosya yolu"""
+    url = url or DEFAULT_DATABASE_URL
+    scheme, sep, rest = url.partition("://")
+    if not sep or scheme.split("+")[0] != "sqlite":
+        logger.warning(
+            "[Database] Unsupported DATABASE_URL scheme %r, falling back to %s",
+            scheme,
+            DEFAULT_DATABASE_URL,
+        )
+        return _sqlite_path(DEFAULT_DATABASE_URL)
+    return rest[1:] if rest.startswith("/") else rest
+
+
+def row_to_dict(row: Optional[aiosqlite.Row]) -> Optional[Dict[str, Any]]:
+    return dict(row) if row is not None else None
+
+
+class Database:
+    """
+    Sabit boyutlu aiosqlite bağlantı havuzu.
+
+    Her bağlantı kendi thread'inde çalışır; WAL modunda okumalar birbirini
+    ve yazmayı beklemez, yazmalar ``busy_timeout`` ile sıraya girer.
+    Havuz ilk kullanımda (veya lifespan startup'ta) açılır.
+    """
+
+    def __init__(self, url: Optional[str] = None, pool_size: Optional[int] = None):
+        self.url = url
+        self.pool_size = max(1, pool_size or settings.DATABASE_POOL_SIZE)
+        self._pool: Optional[asyncio.Queue] = None
+        self._connections: List[aiosqlite.Connection] = []
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def path(self) -> str:
+        return _sqlite_path(self.url if self.url is not None else settings.DATABASE_URL)
+
+    async def _open(self) -> aiosqlite.Connection:
+        # isolation_level=None: autocommit; transaction() açıkça BEGIN yazar
+        conn = await aiosqlite.connect(self.path, isolation_level=None)
+        conn.row_factory = aiosqlite.Row
+        await conn.execute(f"PRAGMA busy_timeout = {int(settings.DATABASE_BUSY_TIMEOUT_MS)}")
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute("PRAGMA journal_mode = WAL")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    async def connect(self) -> None:
+        """Havuzu aç ve bekleyen migration'ları uygula"""
+        async with self._connect_lock:
+            if self._pool is not None:
+                return
+            path = self.path
+            if path != ":memory:":
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+            first = await self._open()
+            try:
+                await self._migrate(first)
+                connections = [first] + [await self._open() for _ in range(self.pool_size - 1)]
+            except BaseException:
+                await first.close()
+                raise
+
+            pool: asyncio.Queue = asyncio.Queue()
+            for conn in connections:
+                pool.put_nowait(conn)
+            self._connections = connections
+            self._pool = pool
+            logger.info("[Database] Connected: %s (pool_size=%d)", path, self.pool_size)
+
+    async def _migrate(self, conn: aiosqlite.Connection) -> None:
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL)"
+        )
+        for version, statements in MIGRATIONS:
+            # Sürüm kontrolü yazma kilidi altında: birden çok worker aynı anda başlayabilir
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                async with conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations") as cursor:
+                    (current,) = await cursor.fetchone()
+                if version <= current:
+                    await conn.execute("COMMIT")
+                    continue
+                for statement in statements:
+                    if callable(statement):
+                        await statement(conn)
+                    else:
+                        await conn.execute(statement)
+                await conn.execute(
+                    "INSERT INTO schema_migrations (version, applied_at) VALUES (?, CURRENT_TIMESTAMP)",
+                    (version,),
+                )
+                await conn.execute("COMMIT")
+            except BaseException:
+                await conn.execute("ROLLBACK")
+                raise
+            logger.info("[Database] Applied migration %d", version)
+
+    async def close(self) -> None:
+        """Tüm bağlantıları kapat (lifespan shutdown)"""
+        async with self._connect_lock:
+            connections, self._connections, self._pool = self._connections, [], None
+            for conn in connections:
+                try:
+                    await conn.close()
+                except Exception:
+                    logger.exception("[Database] Error while closing connection")
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Havuzdan bir bağlantı ödünç al"""
+        if self._pool is None:
+            await self.connect()
+        pool = self._pool
+        conn = await pool.get()
+        try:
+            yield conn
+        finally:
+            pool.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Yazma transaction'ı; hata olursa geri alınır"""
+        async with self.connection() as conn:
+            # IMMEDIATE: yazma kilidi baştan alınır, okuma->yazma yükseltmesinde SQLITE_BUSY olmaz
+            await conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException as e:
+                await conn.execute("ROLLBACK")
+                if isinstance(e, aiosqlite.IntegrityError):
+                    raise ConstraintError(str(e)) from e
+                raise
+            await conn.execute("COMMIT")
+
+    async def fetch_one(self, sql: str, params: Sequence[Any] = ()) -> Optional[Dict[str, Any]]:
+        async with self.connection() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return row_to_dict(await cursor.fetchone())
+
+    async def fetch_all(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        async with self.connection() as conn:
+            async with conn.execute(sql, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+
+    async def iterate(
+        self,
+        sql: str,
+        params: Sequence[Any] = (),
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Sonuçları cursor üzerinden ``batch_size``'lık parçalarla oku (bellek
+        sonuç boyutundan bağımsız). Bağlantı iterasyon boyunca tutulur;
+        yarıda bırakılırsa ``contextlib.aclosing`` ile kapatılmalı.
+        """
+        async with self.connection() as conn:
+            async with conn.execute(sql, params) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """Tek bir yazma sorgusu çalıştır, etkilenen satır sayısını döndür"""
+        async with self.transaction() as conn:
+            cursor = await conn.execute(sql, params)
+            return cursor.rowcount
+
+
+database = Database()
@@ -0,0 +1,123 @@
+"""
+Event loop lag monitor and in-flight call tracking
+Instance doygunluğunu ölçer ve yük atma (load shedding) kararını verir
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+import asyncio
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# In-flight çağrı türleri
+INFLIGHT_STT = "stt"
+INFLIGHT_LLM = "llm"
+
+# Saturasyon kararı için saklanan son lag örneği sayısı
+LAG_WINDOW_SIZE = 10
+
+
+class LoadMonitor:
+    """
+    Event loop gecikmesini periyodik olarak ölçer ve devam eden
+    STT/LLM çağrılarını sayar.
+
+    Lag, ``asyncio.sleep(interval)`` çağrısının planlanandan ne kadar
+    geç uyandığıdır; senkron bir Gemini/Whisper çağrısı loop'u
+    bloklarsa bir sonraki örnekte büyük bir değer olarak görünür.
+    """
+
+    def __init__(self):
+        self.inflight: Dict[str, int] = {INFLIGHT_STT: 0, INFLIGHT_LLM: 0}
+        self.last_lag_ms: float = 0.0
+        self.max_lag_ms: float = 0.0
+        self._recent_lags: Deque[float] = deque(maxlen=LAG_WINDOW_SIZE)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Arka plan ölçüm task'ını başlat (lifespan startup)"""
+        if self._task is None and settings.LOOP_LAG_SAMPLE_INTERVAL_MS > 0:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                "[LoadMonitor] Event loop lag monitor başlatıldı (interval=%dms)",
+                settings.LOOP_LAG_SAMPLE_INTERVAL_MS,
+            )
+
+    async def stop(self) -> None:
+        """Arka plan task'ını durdur (lifespan shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.LOOP_LAG_SAMPLE_INTERVAL_MS / 1000.0
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - started - interval) * 1000.0)
+            self.last_lag_ms = lag_ms
+            self._recent_lags.append(lag_ms)
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            if settings.LOADSHED_MAX_LOOP_LAG_MS and lag_ms >= settings.LOADSHED_MAX_LOOP_LAG_MS:
+                logger.warning("[LoadMonitor] Event loop lag: %.0fms", lag_ms)
+
+    @property
+    def recent_max_lag_ms(self) -> float:
+        return max(self._recent_lags, default=0.0)
+
+    @asynccontextmanager
+    async def track(self, kind: str):
+        """Bir STT/LLM çağrısını süresince in-flight olarak say"""
+        self.inflight[kind] += 1
+        try:
+            yield
+        finally:
+            self.inflight[kind] -= 1
+
+    def saturation_reason(self, kind: Optional[str] = None) -> Optional[str]:
+        """
+        Instance doygunsa sebebini döndür, değilse None.
+
+        Args:
+            kind: Verilirse sadece loop lag ve o türün in-flight limiti kontrol edilir
+        """
+        if settings.LOADSHED_MAX_LOOP_LAG_MS and self.recent_max_lag_ms >= settings.LOADSHED_MAX_LOOP_LAG_MS:
+            return f"event loop lag {self.recent_max_lag_ms:.0f}ms"
+
+        limits = {
+            INFLIGHT_STT: settings.LOADSHED_MAX_INFLIGHT_STT,
+            INFLIGHT_LLM: settings.LOADSHED_MAX_INFLIGHT_LLM,
+        }
+        for name, limit in limits.items():
+            if kind is not None and name != kind:
+                continue
+            if limit and self.inflight[name] >= limit:
+                return f"{name} in-flight calls {self.inflight[name]}/{limit}"
+
+        return None
+
+    def snapshot(self) -> Dict:
+        """Readiness endpoint'i için anlık durum"""
+        reason = self.saturation_reason()
+        return {
+            "status": "saturated" if reason else "ready",
+            "reason": reason,
+            "loop_lag_ms": {
+                "last": round(self.last_lag_ms, 1),
+                "recent_max": round(self.recent_max_lag_ms, 1),
+                "max": round(self.max_lag_ms, 1),
+            },
+            "inflight": dict(self.inflight),
+        }
+
+
+load_monitor = LoadMonitor()
@@ -0,0 +1,543 @@
+"""
+Repositories
+Aday, mülakat, transkript ve rapor tabloları için async veri erişimi
+
+Liste sorguları OFFSET yerine keyset sayfalama kullanır: sonraki sayfa
+``id < cursor`` ile index üzerinden başlar, böylece derin sayfalar da
+ilk sayfa kadar hızlıdır.
+"""
+from datetime import datetime, timezone
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional
+import json
+
+from app.core.database import (
+    SEARCH_KIND_INTERVIEWER,
+    SEARCH_KIND_TOPIC,
+    SEARCH_ROLE_KINDS,
+    Database,
+    database,
+    search_rowid,
+    topic_slot_range,
+)
+from app.core.text_search import build_match_query, normalize_text
+
+# Liste endpoint'lerinde sayfa boyutu sınırı
+MAX_PAGE_SIZE = 100
+
+INTERVIEW_STATUSES = ("scheduled", "in_progress", "ended")
+
+# Çok satırlı INSERT başına satır (8 kolon x 500 = 4000 parametre, SQLite sınırının altında)
+SEGMENT_INSERT_CHUNK = 500
+
+# Toplu aday eklemede INSERT başına satır (7 kolon x 500 = 3500 parametre)
+CANDIDATE_INSERT_CHUNK = 500
+
+
+def utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _page(rows: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    """``limit + 1`` satırdan sayfa ve sonraki cursor'ı üret"""
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {
+        "items": items,
+        "next_cursor": items[-1]["id"] if has_more and items else None,
+    }
+
+
+def _keyset(
+    table: str,
+    filters: Dict[str, Any],
+    cursor: Optional[int],
+    limit: int,
+    columns: str = "*",
+):
+    """``WHERE <filters> AND id < cursor ORDER BY id DESC LIMIT limit + 1`` sorgusu"""
+    clauses = [f"{column} = ?" for column in filters]
+    params: List[Any] = list(filters.values())
+    if cursor is not None:
+        clauses.append("id < ?")
+        params.append(cursor)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    params.append(min(max(1, limit), MAX_PAGE_SIZE) + 1)
+    return f"SELECT {columns} FROM {table}{where} ORDER BY id DESC LIMIT ?", params
+
+
+class CandidateRepository:
+    COLUMNS = ("full_name", "email", "phone", "position", "notes")
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get(self, candidate_id: int) -> Optional[Dict[str, Any]]:
+        return await self.db.fetch_one("SELECT * FROM candidates WHERE id = ?", (candidate_id,))
+
+    async def list(
+        self,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        position: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        filters = {"position": position} if position is not None else {}
+        sql, params = _keyset("candidates", filters, cursor, limit)
+        return _page(await self.db.fetch_all(sql, params), min(max(1, limit), MAX_PAGE_SIZE))
+
+    async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        now = utcnow()
+        values = {column: data.get(column) for column in self.COLUMNS}
+        candidate_id = await self._insert(values, now)
+        return await self.get(candidate_id)
+
+    async def _insert(self, values: Dict[str, Any], now: str) -> int:
+        async with self.db.transaction() as conn:
+            async with conn.execute(
+                "INSERT INTO candidates (full_name, email, phone, position, notes, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) RETURNING id",
+                (*(values[c] for c in self.COLUMNS), now, now),
+            ) as cursor:
+                (candidate_id,) = await cursor.fetchone()
+        return candidate_id
+
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Adayları tek transaction'da çok satırlı INSERT'lerle ekle.
+
+        E-postası zaten kayıtlı (veya aynı partide daha önce geçen) satırlar
+        atlanır; her satır için eklenip eklenmediği döndürülür.
+        """
+        if not rows:
+            return []
+        now = utcnow()
+        inserted_emails: Counter = Counter()
+        async with self.db.transaction() as conn:
+            for start in range(0, len(rows), CANDIDATE_INSERT_CHUNK):
+                chunk = rows[start:start + CANDIDATE_INSERT_CHUNK]
+                params: List[Any] = []
+                for row in chunk:
+                    params.extend((*(row.get(c) for c in self.COLUMNS), now, now))
+                placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                async with conn.execute(
+                    "INSERT INTO candidates (full_name, email, phone, position, notes, created_at, updated_at) "
+                    f"VALUES {placeholders} ON CONFLICT (email) DO NOTHING RETURNING email",
+                    params,
+                ) as cursor:
+                    inserted_emails.update(email for (email,) in await cursor.fetchall() if email is not None)
+        # RETURNING sırası garanti değil; e-postası dönen ilk satır eklenmiş sayılır
+        result = []
+        for row in rows:
+            email = row.get("email")
+            if email is None:
+                result.append(True)
+            elif inserted_emails[email] > 0:
+                inserted_emails[email] -= 1
+                result.append(True)
+            else:
+                result.append(False)
+        return result
+
+    async def update(self, candidate_id: int, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        changes = {k: v for k, v in changes.items() if k in self.COLUMNS}
+        if changes:
+            assignments = ", ".join(f"{column} = ?" for column in changes)
+            updated = await self.db.execute(
+                f"UPDATE candidates SET {assignments}, updated_at = ? WHERE id = ?",
+                (*changes.values(), utcnow(), candidate_id),
+            )
+            if not updated:
+                return None
+        return await self.get(candidate_id)
+
+    async def delete(self, candidate_id: int) -> bool:
+        return bool(await self.db.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,)))
+
+
+class InterviewRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        return await self.db.fetch_one("SELECT * FROM interviews WHERE id = ?", (interview_id,))
+
+    async def existing_ids(self, interview_ids: List[int]) -> set:
+        if not interview_ids:
+            return set()
+        rows = await self.db.fetch_all(
+            f"SELECT id FROM interviews WHERE id IN ({', '.join('?' * len(interview_ids))})", interview_ids
+        )
+        return {row["id"] for row in rows}
+
+    async def get_by_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self.db.fetch_one("SELECT * FROM interviews WHERE session_id = ?", (session_id,))
+
+    async def list(
+        self,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        candidate_id: Optional[int] = None,
+        status: Optional[str] = None,
+        position: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        filters = {
+            column: value
+            for column, value in (("candidate_id", candidate_id), ("status", status), ("position", position))
+            if value is not None
+        }
+        sql, params = _keyset("interviews", filters, cursor, limit)
+        return _page(await self.db.fetch_all(sql, params), min(max(1, limit), MAX_PAGE_SIZE))
+
+    async def create(
+        self,
+        session_id: str,
+        candidate_id: Optional[int] = None,
+        position: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = utcnow()
+        async with self.db.transaction() as conn:
+            async with conn.execute(
+                "INSERT INTO interviews (session_id, candidate_id, position, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'scheduled', ?, ?) RETURNING id",
+                (session_id, candidate_id, position, now, now),
+            ) as cursor:
+                (interview_id,) = await cursor.fetchone()
+        return await self.get(interview_id)
+
+    async def ensure_session(self, session_id: str) -> int:
+        """Session'ın mülakat kaydının id'si (yoksa oluşturulur)"""
+        now = utcnow()
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                "INSERT INTO interviews (session_id, status, created_at, updated_at) VALUES (?, 'scheduled', ?, ?) "
+                "ON CONFLICT (session_id) DO NOTHING",
+                (session_id, now, now),
+            )
+            async with conn.execute("SELECT id FROM interviews WHERE session_id = ?", (session_id,)) as cursor:
+                (interview_id,) = await cursor.fetchone()
+        return interview_id
+
+    async def set_status(self, interview_id: int, status: str) -> Optional[Dict[str, Any]]:
+        """Durumu güncelle; başlangıç/bitiş zamanı ilk geçişte yazılır"""
+        now = utcnow()
+        timestamp_column = {"in_progress": "started_at", "ended": "ended_at"}.get(status)
+        extra = f", {timestamp_column} = COALESCE({timestamp_column}, ?)" if timestamp_column else ""
+        params: List[Any] = [status, now] + ([now] if timestamp_column else []) + [interview_id]
+        updated = await self.db.execute(f"UPDATE interviews SET status = ?, updated_at = ?{extra} WHERE id = ?", params)
+        return await self.get(interview_id) if updated else None
+
+    def iter_export(
+        self,
+        candidate_id: Optional[int] = None,
+        status: Optional[str] = None,
+        position: Optional[str] = None,
+        language: str = "tr",
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Mülakatlar aday bilgisi ve ``language`` rapor özetiyle, id sırasıyla;
+        satırlar cursor'dan parça parça okunur (``Database.iterate``).
+        """
+        filters = {
+            f"i.{column}": value
+            for column, value in (("candidate_id", candidate_id), ("status", status), ("position", position))
+            if value is not None
+        }
+        where = f" WHERE {' AND '.join(f'{column} = ?' for column in filters)}" if filters else ""
+        return self.db.iterate(
+            "SELECT i.id AS interview_id, i.session_id, i.status, i.position, i.created_at, i.started_at, "
+            "i.ended_at, c.id AS candidate_id, c.full_name AS candidate_name, c.email AS candidate_email, "
+            "r.language AS report_language, r.report_json FROM interviews i "
+            "LEFT JOIN candidates c ON c.id = i.candidate_id "
+            f"LEFT JOIN reports r ON r.interview_id = i.id AND r.language = ?{where} ORDER BY i.id",
+            [language, *filters.values()],
+        )
+
+
+class TranscriptSegmentRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def list(self, interview_id: int, after_seq: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        """``after_seq``'ten sonraki parçalar (seq sırasıyla, UNIQUE(interview_id, seq) index'i)"""
+        return await self.db.fetch_all(
+            "SELECT seq, role, start_seconds, end_seconds, text, committed FROM transcript_segments "
+            "WHERE interview_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (interview_id, after_seq, limit),
+        )
+
+    async def transcript_text(self, interview_id: int, role: Optional[str] = None) -> str:
+        """
+        Saklanan parçalardan transkript metni (SessionTranscript.text ile aynı kural:
+        final-pass parçaları varsa sadece onlar, yoksa canlı parçalar).
+        """
+        role_clause = " AND role = ?" if role is not None else ""
+        role_params = (role,) if role is not None else ()
+        rows = await self.db.fetch_all(
+            "SELECT text FROM transcript_segments WHERE interview_id = ? AND committed = TRUE"
+            f"{role_clause} ORDER BY start_seconds, seq",
+            (interview_id, *role_params),
+        )
+        if not rows and not await self.has_committed(interview_id):
+            rows = await self.db.fetch_all(
+                f"SELECT text FROM transcript_segments WHERE interview_id = ?{role_clause} ORDER BY seq",
+                (interview_id, *role_params),
+            )
+        return "\n".join(row["text"] for row in rows)
+
+    async def has_committed(self, interview_id: int) -> bool:
+        """Mülakatın final-pass (committed) parçası saklanmış mı"""
+        row = await self.db.fetch_one(
+            "SELECT 1 FROM transcript_segments WHERE interview_id = ? AND committed = TRUE LIMIT 1", (interview_id,)
+        )
+        return row is not None
+
+    async def max_seq(self, interview_id: int) -> int:
+        row = await self.db.fetch_one(
+            "SELECT COALESCE(MAX(seq), 0) AS max_seq FROM transcript_segments WHERE interview_id = ?",
+            (interview_id,),
+        )
+        return row["max_seq"]
+
+    async def insert_many(self, segments: List[Dict[str, Any]]) -> None:
+        """
+        Parçaları (birden çok mülakattan) tek transaction'da çok satırlı
+        INSERT'lerle ekle; aynı (interview_id, seq) tekrar gelirse yok sayılır.
+        """
+        if not segments:
+            return
+        now = utcnow()
+        async with self.db.transaction() as conn:
+            for start in range(0, len(segments), SEGMENT_INSERT_CHUNK):
+                chunk = segments[start:start + SEGMENT_INSERT_CHUNK]
+                params: List[Any] = []
+                for s in chunk:
+                    params.extend(
+                        (s["interview_id"], s["seq"], s["role"], s["start"], s["end"], s["text"], bool(s["committed"]), now)
+                    )
+                placeholders = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?)"] * len(chunk))
+                async with conn.execute(
+                    "INSERT INTO transcript_segments "
+                    "(interview_id, seq, role, start_seconds, end_seconds, text, committed, created_at) "
+                    f"VALUES {placeholders} ON CONFLICT (interview_id, seq) DO NOTHING "
+                    "RETURNING interview_id, seq, role, text",
+                    params,
+                ) as cursor:
+                    inserted = await cursor.fetchall()
+                # Sadece gerçekten eklenen parçalar indekslenir (tekrar denemeler çift kayıt üretmez)
+                await conn.executemany(
+                    "INSERT INTO interview_search (rowid, content, original) VALUES (?, ?, ?)",
+                    [
+                        (
+                            search_rowid(interview_id, SEARCH_ROLE_KINDS.get(role, SEARCH_KIND_INTERVIEWER), seq),
+                            normalize_text(text),
+                            text,
+                        )
+                        for interview_id, seq, role, text in inserted
+                    ],
+                )
+
+
+class ReportRepository:
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def get(self, interview_id: int, language: str = "tr") -> Optional[Dict[str, Any]]:
+        row = await self.db.fetch_one(
+            "SELECT * FROM reports WHERE interview_id = ? AND language = ?", (interview_id, language)
+        )
+        if row is not None:
+            row["report"] = json.loads(row.pop("report_json"))
+        return row
+
+    async def save(
+        self,
+        interview_id: int,
+        language: str,
+        report: Dict[str, Any],
+        transcript_hash: Optional[str] = None,
+        prompt_version: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        """Raporu kaydet (mülakat ve dil başına tek rapor, varsa üzerine yazılır)"""
+        topics = [t for t in report.get("key_topics") or [] if isinstance(t, str) and t.strip()]
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                "INSERT INTO reports "
+                "(interview_id, language, overall_score, report_json, created_at, transcript_hash, prompt_version, model) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (interview_id, language) DO UPDATE SET "
+                "overall_score = excluded.overall_score, report_json = excluded.report_json, "
+                "created_at = excluded.created_at, transcript_hash = excluded.transcript_hash, "
+                "prompt_version = excluded.prompt_version, model = excluded.model",
+                (
+                    interview_id,
+                    language,
+                    report.get("overall_score"),
+                    json.dumps(report, ensure_ascii=False),
+                    utcnow(),
+                    transcript_hash,
+                    prompt_version,
+                    model,
+                ),
+            )
+            # Rapor konuları arama index'inde raporla birlikte yenilenir (sadece bu dilin aralığı)
+            first_slot, last_slot = topic_slot_range(language)
+            topic_rowid = search_rowid(interview_id, SEARCH_KIND_TOPIC, first_slot)
+            await conn.execute(
+                "DELETE FROM interview_search WHERE rowid BETWEEN ? AND ?",
+                (topic_rowid, search_rowid(interview_id, SEARCH_KIND_TOPIC, last_slot)),
+            )
+            await conn.executemany(
+                "INSERT INTO interview_search (rowid, content, original) VALUES (?, ?, ?)",
+                [
+                    (topic_rowid + i, normalize_text(topic), topic)
+                    for i, topic in enumerate(topics[: last_slot - first_slot + 1])
+                ],
+            )
+
+    async def latest_for_candidates(
+        self,
+        candidate_ids: Optional[List[int]] = None,
+        position: Optional[str] = None,
+        language: str = "tr",
+    ) -> List[Dict[str, Any]]:
+        """
+        Her adayın ``language`` raporu olan en son mülakatındaki skor, duygu
+        oranları ve konular. ``candidate_ids`` veya aday ``position``'ı ile
+        filtrelenir.
+
+        Alanlar rapor JSON'undan SQLite içinde çıkarılır; tüm raporu
+        Python'da parse etmekten çok daha ucuzdur.
+        """
+        clauses: List[str] = ["r.language = ?"]
+        params: List[Any] = [language]
+        if candidate_ids is not None:
+            if not candidate_ids:
+                return []
+            clauses.append(f"i.candidate_id IN ({', '.join('?' * len(candidate_ids))})")
+            params.extend(candidate_ids)
+        if position is not None:
+            clauses.append("c.position = ?")
+            params.append(position)
+        where = f" AND {' AND '.join(clauses)}" if clauses else ""
+        rows = await self.db.fetch_all(
+            "WITH latest AS ("
+            " SELECT i.candidate_id, MAX(i.id) AS interview_id FROM interviews i"
+            " JOIN reports r ON r.interview_id = i.id"
+            " JOIN candidates c ON c.id = i.candidate_id"
+            f" WHERE i.candidate_id IS NOT NULL{where}"
+            " GROUP BY i.candidate_id"
+            ") "
+            "SELECT c.id AS candidate_id, c.full_name, l.interview_id, r.overall_score, "
+            "json_extract(r.report_json, '$.sentiment.positive') AS positive, "
+            "json_extract(r.report_json, '$.sentiment.neutral') AS neutral, "
+            "json_extract(r.report_json, '$.sentiment.negative') AS negative, "
+            "json_extract(r.report_json, '$.key_topics') AS key_topics FROM latest l "
+            "JOIN candidates c ON c.id = l.candidate_id "
+            "JOIN reports r ON r.interview_id = l.interview_id AND r.language = ?",
+            params + [language],
+        )
+        for row in rows:
+            topics = json.loads(row["key_topics"]) if row["key_topics"] else []
+            row["key_topics"] = topics if isinstance(topics, list) else []
+        return rows
+
+
+class SearchRepository:
+    """Transkript parçaları ve rapor konuları üzerinde tam metin arama"""
+
+    # Rapor konusu eşleşmesi kaç transkript parçası eşleşmesi sayılır
+    TOPIC_WEIGHT = 5
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    async def search(
+        self,
+        query: str,
+        role: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Mülakatları eşleşen parça sayısına göre sırala (rapor konuları
+        ``TOPIC_WEIGHT`` kat sayılır).
+
+        Gruplama ve rol filtresi sadece rowid üzerinden yapılır, içerik
+        tablosu okunmaz. Sayfalama keyset ile: cursor son sonucun
+        ``"<score>:<interview_id>"`` değeridir.
+        """
+        match = build_match_query(query)
+        limit = min(max(1, limit), MAX_PAGE_SIZE)
+        if match is None:
+            return {"items": [], "next_cursor": None}
+
+        where = "interview_search MATCH ?"
+        params: List[Any] = [match]
+        if role is not None:
+            where += " AND (rowid >> 22) & 3 = ?"
+            params.append(SEARCH_ROLE_KINDS[role])
+        having = ""
+        if cursor:
+            last_score, _, last_id = cursor.partition(":")
+            having = " HAVING score < ? OR (score = ? AND interview_id > ?)"
+            params.extend([int(last_score), int(last_score), int(last_id)])
+        params.append(limit + 1)
+
+        rows = await self.db.fetch_all(
+            "SELECT rowid >> 24 AS interview_id, COUNT(*) AS hits, MIN(rowid) AS first_rowid, "
+            f"SUM(CASE WHEN (rowid >> 22) & 3 = {SEARCH_KIND_TOPIC} THEN {self.TOPIC_WEIGHT} ELSE 1 END) AS score "
+            f"FROM interview_search WHERE {where} GROUP BY interview_id{having} "
+            "ORDER BY score DESC, interview_id LIMIT ?",
+            params,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if not rows:
+            return {"items": [], "next_cursor": None}
+
+        ids = [row["interview_id"] for row in rows]
+        first_rowids = [row["first_rowid"] for row in rows]
+        placeholders = ", ".join("?" * len(rows))
+        interviews = {
+            r["id"]: r for r in await self.db.fetch_all(f"SELECT * FROM interviews WHERE id IN ({placeholders})", ids)
+        }
+        # Her mülakatın ilk eşleşen parçası; MATCH tekrarlanmaz, rowid ile okunur
+        originals = {
+            r["rowid"]: r["original"]
+            for r in await self.db.fetch_all(
+                f"SELECT rowid, original FROM interview_search WHERE rowid IN ({placeholders})", first_rowids
+            )
+        }
+        kind_names = {
+            SEARCH_ROLE_KINDS["candidate"]: ("transcript", "candidate"),
+            SEARCH_ROLE_KINDS["interviewer"]: ("transcript", "interviewer"),
+            SEARCH_KIND_TOPIC: ("topic", None),
+        }
+        matches: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            kind, match_role = kind_names.get((row["first_rowid"] >> 22) & 3, ("transcript", None))
+            matches[row["interview_id"]] = {
+                "text": originals.get(row["first_rowid"]),
+                "kind": kind,
+                "role": match_role,
+            }
+
+        items = [
+            {
+                "interview": interviews.get(row["interview_id"]),
+                "score": row["score"],
+                "hits": row["hits"],
+                "match": matches.get(row["interview_id"]),
+            }
+            for row in rows
+        ]
+        next_cursor = f"{rows[-1]['score']}:{rows[-1]['interview_id']}" if has_more else None
+        return {"items": items, "next_cursor": next_cursor}
+
+
+candidates_repo = CandidateRepository(database)
+interviews_repo = InterviewRepository(database)
+segments_repo = TranscriptSegmentRepository(database)
+reports_repo = ReportRepository(database)
+search_repo = SearchRepository(database)
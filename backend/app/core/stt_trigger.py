@@ -0,0 +1,163 @@
+"""
+Adaptive STT trigger controller
+Session başına STT çağrı eşiğini gözlenen provider gecikmesine göre ayarlar
+
+Buffer her STT çağrısında baştan transcribe edildiği için ortalama
+transkript gecikmesi yaklaşık ``interval / 2 + latency`` olur. Controller
+hedef gecikmeyi tutturacak interval'ı seçer; interval hiçbir zaman son
+gözlenen gecikmenin altına inmez (üst üste binen çağrı olmasın) ve global
+dakika bütçesi aşılıyorsa orantılı olarak uzatılır. Interval, session'ın
+gözlenen audio byte hızıyla byte eşiğine çevrilir.
+"""
+from collections import deque
+from typing import Deque, Dict, Optional
+import logging
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Gecikme/byte hızı EWMA katsayısı (yeni örneğin ağırlığı)
+EWMA_ALPHA = 0.3
+
+# Byte hızı bilinmeden önce kullanılan varsayım (~32 kbps Opus/WebM)
+DEFAULT_AUDIO_BYTES_PER_SECOND = 4000.0
+
+# Byte hızı örneği için minimum süre; arka arkaya gelen (kuyruktan boşalan)
+# chunk'lar hızı şişirmesin diye bu süreden kısa aralıklar birleştirilir
+MIN_RATE_SAMPLE_SECONDS = 0.5
+
+# Bütçe hesabında kullanılan pencere (saniye)
+BUDGET_WINDOW_SECONDS = 60.0
+
+
+def _ewma(previous: Optional[float], sample: float) -> float:
+    if previous is None:
+        return sample
+    return EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * previous
+
+
+class CallBudget:
+    """Instance genelinde son 60 saniyedeki STT çağrılarını sayar"""
+
+    def __init__(self, calls_per_minute: int):
+        self.calls_per_minute = calls_per_minute
+        self._calls: Deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0] > BUDGET_WINDOW_SECONDS:
+            self._calls.popleft()
+
+    def record(self, now: float) -> None:
+        self._calls.append(now)
+        self._trim(now)
+
+    def pressure(self, now: float) -> float:
+        """Bütçe kullanım oranı (1.0 = bütçe dolu; 0 = bütçe kapalı)"""
+        if self.calls_per_minute <= 0:
+            return 0.0
+        self._trim(now)
+        return len(self._calls) / self.calls_per_minute
+
+    @property
+    def recent_calls(self) -> int:
+        return len(self._calls)
+
+
+class SessionTrigger:
+    """Tek bir session'ın STT tetikleme durumu"""
+
+    def __init__(self, controller: "STTTriggerController", initial_latency: Optional[float]):
+        self._controller = controller
+        self.latency_seconds: Optional[float] = initial_latency
+        self.bytes_per_second: Optional[float] = None
+        self.delta_bytes: int = settings.STT_MIN_DELTA_BYTES
+        self.in_flight = False
+        self._last_chunk_at: Optional[float] = None
+        self._unsampled_bytes = 0
+
+    def observe_chunk(self, nbytes: int, now: float) -> None:
+        """Gelen chunk'tan audio byte hızını güncelle"""
+        if self._last_chunk_at is None:
+            self._last_chunk_at = now
+            return
+        self._unsampled_bytes += nbytes
+        elapsed = now - self._last_chunk_at
+        if elapsed >= MIN_RATE_SAMPLE_SECONDS:
+            self.bytes_per_second = _ewma(self.bytes_per_second, self._unsampled_bytes / elapsed)
+            self._unsampled_bytes = 0
+            self._last_chunk_at = now
+
+    def interval_seconds(self, now: float) -> float:
+        """Hedef gecikme, son gecikme ve bütçe baskısına göre tetikleme aralığı"""
+        latency = self.latency_seconds or 0.0
+        interval = max(2 * (settings.STT_TARGET_LAG_SECONDS - latency), latency)
+        pressure = self._controller.budget.pressure(now)
+        if pressure > 1.0:
+            interval *= pressure
+        return interval
+
+    def should_trigger(self, total_size: int, prev_size: int, now: float) -> bool:
+        """Buffer yeterince büyüdü mü? (önceki çağrı bitmeden tetiklemez)"""
+        if self.in_flight or total_size < settings.STT_MIN_FIRST_BYTES:
+            return False
+
+        rate = self.bytes_per_second or DEFAULT_AUDIO_BYTES_PER_SECOND
+        self.delta_bytes = int(
+            min(
+                max(self.interval_seconds(now) * rate, settings.STT_MIN_DELTA_BYTES),
+                settings.STT_MAX_DELTA_BYTES,
+            )
+        )
+        return total_size - prev_size >= self.delta_bytes
+
+    def record_call(self, latency_seconds: float, now: float) -> None:
+        """Tamamlanan STT çağrısının süresini kaydet"""
+        self.latency_seconds = _ewma(self.latency_seconds, latency_seconds)
+        self._controller.record_call(latency_seconds, now)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "latency_seconds": round(self.latency_seconds, 3) if self.latency_seconds is not None else None,
+            "bytes_per_second": round(self.bytes_per_second, 1) if self.bytes_per_second is not None else None,
+            "delta_bytes": self.delta_bytes,
+            "in_flight": self.in_flight,
+        }
+
+
+class STTTriggerController:
+    """Session trigger'larını ve ortak çağrı bütçesini tutar"""
+
+    def __init__(self):
+        self.budget = CallBudget(settings.STT_CALLS_PER_MINUTE_BUDGET)
+        # Yeni session'lar instance genelindeki gecikmeyle başlar
+        self.global_latency_seconds: Optional[float] = None
+        self._sessions: Dict[str, SessionTrigger] = {}
+
+    def get(self, session_id: str) -> SessionTrigger:
+        trigger = self._sessions.get(session_id)
+        if trigger is None:
+            trigger = self._sessions[session_id] = SessionTrigger(self, self.global_latency_seconds)
+        return trigger
+
+    def discard(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def record_call(self, latency_seconds: float, now: float) -> None:
+        self.global_latency_seconds = _ewma(self.global_latency_seconds, latency_seconds)
+        self.budget.record(now)
+
+    def snapshot(self) -> Dict[str, object]:
+        now = time.perf_counter()
+        return {
+            "global_latency_seconds": (
+                round(self.global_latency_seconds, 3) if self.global_latency_seconds is not None else None
+            ),
+            "calls_last_minute": self.budget.recent_calls,
+            "budget_pressure": round(self.budget.pressure(now), 3),
+            "sessions": {sid: t.to_dict() for sid, t in self._sessions.items()},
+        }
+
+
+stt_trigger = STTTriggerController()
@@ -0,0 +1,47 @@
+"""
+Text search helpers
+Türkçe'ye duyarlı normalizasyon ve FTS5 sorgu üretimi
+
+Hem indekslenen metin hem sorgu aynı şekilde normalize edilir: Türkçe
+büyük/küçük harf kuralları (İ -> i, I -> ı) uygulanır, ardından noktalı /
+noktasız i ve diğer aksanlar katlanır (ı -> i, ş -> s, ğ -> g, ...). Böylece
+"KUBERNETES", "kubernetes" ve "Kübernetes" veya "ışık" ve "isik" aynı
+terimle eşleşir.
+"""
+from typing import Optional
+import re
+import unicodedata
+
+# Türkçe büyük harf -> küçük harf (str.lower() "İ"yi "i̇" yapar, "I"yı "i" yapar)
+_TURKISH_LOWER = str.maketrans({"İ": "i", "I": "ı"})
+
+# Aksan katlama: NFKD'nin ayırmadığı harfler
+_FOLD = str.maketrans({"ı": "i", "ß": "ss", "æ": "ae", "ø": "o", "đ": "d", "ł": "l"})
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Sorgudaki terim sınırı (çok uzun sorgular FTS'i yavaşlatmasın)
+MAX_QUERY_TERMS = 8
+
+
+def normalize_text(text: str) -> str:
+    """Arama için normalize edilmiş metin (küçük harf, aksansız)"""
+    text = text.translate(_TURKISH_LOWER).lower().translate(_FOLD)
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Kullanıcı sorgusundan FTS5 MATCH ifadesi.
+
+    Terimler normalize edilip tırnak içine alınır (FTS sözdizimi enjekte
+    edilemez) ve AND ile birleştirilir; son terim önek olarak eşleşir
+    ("kube" -> "kubernetes"). Terim yoksa None.
+    """
+    terms = _TOKEN.findall(normalize_text(query))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " AND ".join(quoted)
@@ -0,0 +1,123 @@
+"""
+Per-chunk latency tracing for the STT pipeline
+Her audio chunk'ının buffer -> Whisper -> broadcast aşamalarındaki zaman damgaları
+"""
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import time
+
+from app.core.config import settings
+
+# Aşamalar (sırasıyla)
+STAGE_RECEIVED = "received"
+STAGE_THRESHOLD_REACHED = "threshold_reached"
+STAGE_STT_REQUEST_SENT = "stt_request_sent"
+STAGE_STT_RESPONSE_RECEIVED = "stt_response_received"
+STAGE_DIFF_COMPUTED = "diff_computed"
+STAGE_BROADCAST_COMPLETED = "broadcast_completed"
+
+# İz tutulan maksimum session sayısı (eski session'lar LRU ile düşer)
+MAX_TRACED_SESSIONS = 200
+
+
+class ChunkTrace:
+    """Tek bir chunk'ın aşama zaman damgaları (monotonic, perf_counter)"""
+
+    __slots__ = ("chunk", "role", "size", "marks")
+
+    def __init__(self, chunk: int, role: str, size: int, received_at: float):
+        self.chunk = chunk
+        self.role = role
+        self.size = size
+        self.marks: List[Tuple[str, float]] = [(STAGE_RECEIVED, received_at)]
+
+    def mark(self, stage: str) -> None:
+        self.marks.append((stage, time.perf_counter()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        started = self.marks[0][1]
+        return {
+            "chunk": self.chunk,
+            "role": self.role,
+            "bytes": self.size,
+            "stages_ms": {stage: round((t - started) * 1000.0, 3) for stage, t in self.marks},
+            "total_ms": round((self.marks[-1][1] - started) * 1000.0, 3),
+        }
+
+
+class _NullTrace:
+    """Tracing kapalıyken kullanılan no-op trace"""
+
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class TraceStore:
+    """Session başına son N chunk trace'ini tutan ring buffer"""
+
+    def __init__(self):
+        self._sessions: "OrderedDict[str, Deque[ChunkTrace]]" = OrderedDict()
+
+    def start(self, session_id: str, chunk: int, role: str, size: int, received_at: float):
+        """Yeni bir chunk trace'i başlat; tracing kapalıysa no-op trace döner"""
+        limit = settings.STT_TRACE_BUFFER_SIZE
+        if limit <= 0:
+            return NULL_TRACE
+
+        traces = self._sessions.get(session_id)
+        if traces is None:
+            traces = self._sessions[session_id] = deque(maxlen=limit)
+            if len(self._sessions) > MAX_TRACED_SESSIONS:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+
+        trace = ChunkTrace(chunk, role, size, received_at)
+        traces.append(trace)
+        return trace
+
+    def get(self, session_id: str) -> Optional[List[ChunkTrace]]:
+        traces = self._sessions.get(session_id)
+        return list(traces) if traces is not None else None
+
+    def to_chrome_trace(self, session_id: str) -> Dict[str, Any]:
+        """
+        Chrome trace-event formatı (chrome://tracing, Perfetto).
+
+        Her aşama arası bir "X" (complete) event'idir; thread olarak rol kullanılır.
+        """
+        events: List[Dict[str, Any]] = []
+        for trace in self.get(session_id) or []:
+            tid = trace.role
+            for (stage, t), (next_stage, next_t) in zip(trace.marks, trace.marks[1:]):
+                events.append({
+                    "name": f"{stage} -> {next_stage}",
+                    "cat": "stt",
+                    "ph": "X",
+                    "ts": round(t * 1_000_000, 1),
+                    "dur": round((next_t - t) * 1_000_000, 1),
+                    "pid": session_id,
+                    "tid": tid,
+                    "args": {"chunk": trace.chunk, "bytes": trace.size},
+                })
+            if len(trace.marks) == 1:
+                # Eşik aşılmadan buffer'da kalan chunk: anlık event
+                events.append({
+                    "name": STAGE_RECEIVED,
+                    "cat": "stt",
+                    "ph": "i",
+                    "s": "t",
+                    "ts": round(trace.marks[0][1] * 1_000_000, 1),
+                    "pid": session_id,
+                    "tid": tid,
+                    "args": {"chunk": trace.chunk, "bytes": trace.size},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+trace_store = TraceStore()
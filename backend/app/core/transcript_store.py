@@ -0,0 +1,157 @@
+"""
+Per-session transcript store
+Broadcast edilen transkript parçalarını session başına append-only log
+olarak tutar; REST okuma ve /ai/* endpoint'leri buradan beslenir
+
+Canlı STT parçaları "tentative" eklenir (Whisper sonraki çağrıda metni
+revize edebilir); mülakat sonu final-pass parçaları "committed" eklenir ve
+varsa metin birleştirmede canlı parçaların yerine kullanılır.
+
+Her session ayrıca WebSocket'e gönderilen son mesajları sınırlı bir ring
+buffer'da tutar; yeniden bağlanan client ``?since=<seq>`` ile sadece
+kaçırdığı mesajları alır.
+"""
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bellekte tutulan maksimum session (en eski kullanılan atılır)
+MAX_TRANSCRIPT_SESSIONS = 1000
+
+ROLE_CANDIDATE = "candidate"
+ROLE_INTERVIEWER = "interviewer"
+
+
+class TranscriptSegment:
+    """Tek bir transkript parçası (session başına binlerce olabilir: __slots__)"""
+
+    __slots__ = ("seq", "role", "start", "end", "text", "committed")
+
+    def __init__(self, seq: int, role: str, start: float, end: float, text: str, committed: bool):
+        self.seq = seq
+        self.role = role
+        self.start = start  # saniye, session başından itibaren
+        self.end = end
+        self.text = text
+        self.committed = committed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "role": self.role,
+            "start": round(self.start, 3),
+            "end": round(self.end, 3),
+            "text": self.text,
+            "status": "committed" if self.committed else "tentative",
+        }
+
+
+class SessionTranscript:
+    """Bir session'ın append-only transkript log'u"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started_at = time.time()  # epoch; segment zamanları buna göre
+        self._started_monotonic = time.monotonic()
+        self.segments: List[TranscriptSegment] = []
+        self._has_committed = False
+        # Son broadcast mesajları (seq artan sırada)
+        self.recent_frames: Deque[Dict[str, Any]] = deque(maxlen=max(1, settings.TRANSCRIPT_REPLAY_FRAMES))
+
+    @property
+    def next_seq(self) -> int:
+        return len(self.segments) + 1
+
+    @property
+    def has_committed(self) -> bool:
+        return self._has_committed
+
+    def elapsed(self) -> float:
+        """Session başından bu yana geçen süre (saniye)"""
+        return time.monotonic() - self._started_monotonic
+
+    def append(
+        self,
+        role: str,
+        text: str,
+        start: float,
+        end: float,
+        committed: bool = False,
+    ) -> TranscriptSegment:
+        segment = TranscriptSegment(self.next_seq, role, start, end, text, committed)
+        self.segments.append(segment)
+        self._has_committed = self._has_committed or committed
+        return segment
+
+    def since(self, seq: int = 0) -> List[TranscriptSegment]:
+        """``seq``'den sonraki parçalar (seq'ler 1'den başlar ve boşluksuzdur)"""
+        return self.segments[max(0, seq):]
+
+    def remember_frame(self, frame: Dict[str, Any]) -> None:
+        """Broadcast edilen mesajı ring buffer'a ekle (``frame["seq"]`` olmalı)"""
+        self.recent_frames.append(frame)
+
+    def frames_since(self, seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        ``seq``'den sonraki mesajlar; boşluk ring buffer'dan taşmışsa None
+        (çağıran log'dan yeniden üretir).
+        """
+        if not self.recent_frames:
+            return [] if seq >= self.next_seq - 1 else None
+        if self.recent_frames[0]["seq"] > seq + 1:
+            return None
+        return [f for f in self.recent_frames if f["seq"] > seq]
+
+    def text(self, role: Optional[str] = None) -> str:
+        """
+        Parçaları satır satır birleştir.
+
+        Final-pass (committed) parçalar varsa sadece onlar kullanılır;
+        yoksa canlı (tentative) parçalar kullanılır.
+        """
+        segments = self.segments
+        if self._has_committed:
+            segments = sorted((s for s in segments if s.committed), key=lambda s: s.start)
+        return "\n".join(s.text for s in segments if role is None or s.role == role)
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "started_at": self.started_at,
+            "next_seq": self.next_seq,
+            "segments": [s.to_dict() for s in self.since(since)],
+        }
+
+
+class TranscriptStore:
+    """Session transkriptlerini LRU sınırıyla tutar"""
+
+    def __init__(self, max_sessions: int = MAX_TRANSCRIPT_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SessionTranscript]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[SessionTranscript]:
+        transcript = self._sessions.get(session_id)
+        if transcript is not None:
+            self._sessions.move_to_end(session_id)
+        return transcript
+
+    def get_or_create(self, session_id: str) -> SessionTranscript:
+        transcript = self.get(session_id)
+        if transcript is None:
+            transcript = self._sessions[session_id] = SessionTranscript(session_id)
+            if len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                logger.info("[TranscriptStore] Evicted transcript of session %s", evicted)
+        return transcript
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+transcript_store = TranscriptStore()
@@ -0,0 +1,162 @@
+"""
+Write-behind transcript persistence
+Transkript parçalarını canlı yoldan ayırarak veritabanına toplu yazar
+
+``enqueue`` senkron ve sadece bellekte çalışır; tüm session'lardan gelen
+parçalar ``TRANSCRIPT_WRITE_BATCH_SIZE``'a ulaşınca veya
+``TRANSCRIPT_WRITE_INTERVAL_SECONDS`` dolunca arka planda tek transaction'da
+çok satırlı INSERT'lerle yazılır. Bağlantı kapanınca ve shutdown'da bekleyen
+parçalar ``flush`` ile yazılır.
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.repositories import InterviewRepository, TranscriptSegmentRepository, interviews_repo, segments_repo
+from app.core.transcript_store import SessionTranscript, TranscriptSegment
+
+logger = logging.getLogger(__name__)
+
+# session_id -> (transcript, interview_id, seq offset) eşlemesi için LRU sınırı
+MAX_CACHED_TARGETS = 1000
+
+
+class TranscriptWriteBehind:
+    """Tüm session'ların transkript parçaları için ortak write-behind kuyruğu"""
+
+    def __init__(
+        self,
+        interviews: InterviewRepository,
+        segments: TranscriptSegmentRepository,
+        batch_size: Optional[int] = None,
+        interval_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.interviews = interviews
+        self.segments = segments
+        self.batch_size = max(1, batch_size or settings.TRANSCRIPT_WRITE_BATCH_SIZE)
+        self.interval_seconds = (
+            interval_seconds if interval_seconds is not None else settings.TRANSCRIPT_WRITE_INTERVAL_SECONDS
+        )
+        self.max_pending = max(self.batch_size, max_pending or settings.TRANSCRIPT_WRITE_MAX_PENDING)
+        self._pending: List[Tuple[str, SessionTranscript, TranscriptSegment]] = []
+        self._targets: "OrderedDict[str, Tuple[SessionTranscript, int, int]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.persisted = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Arka plan flush task'ını başlat (lifespan startup)"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, session_id: str, transcript: SessionTranscript, segment: TranscriptSegment) -> None:
+        """Parçayı yazma kuyruğuna ekle (bekleme yapmaz)"""
+        self._pending.append((session_id, transcript, segment))
+        if len(self._pending) > self.max_pending:
+            # Veritabanı uzun süre erişilemezse bellek sınırsız büyümesin
+            overflow = len(self._pending) - self.max_pending
+            del self._pending[:overflow]
+            self.dropped += overflow
+            logger.error("[TranscriptWriter] Pending queue full, dropped %d oldest segment(s)", overflow)
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _resolve(self, session_id: str, transcript: SessionTranscript) -> Tuple[int, int]:
+        """
+        Session'ın interview_id'si ve seq offset'i.
+
+        Bellekteki log yeniden oluşturulduysa (restart / LRU) seq'ler 1'den
+        başlar; veritabanındaki son seq'in üstüne kaydırılarak eski
+        parçalarla çakışmaları önlenir.
+        """
+        cached = self._targets.get(session_id)
+        if cached is not None and cached[0] is transcript:
+            self._targets.move_to_end(session_id)
+            return cached[1], cached[2]
+        interview_id = await self.interviews.ensure_session(session_id)
+        offset = await self.segments.max_seq(interview_id)
+        self._targets[session_id] = (transcript, interview_id, offset)
+        if len(self._targets) > MAX_CACHED_TARGETS:
+            self._targets.popitem(last=False)
+        return interview_id, offset
+
+    async def flush(self) -> int:
+        """Bekleyen tüm parçaları yaz; yazılan parça sayısını döndür"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            started = time.perf_counter()
+            try:
+                rows: List[Dict[str, Any]] = []
+                for session_id, transcript, segment in batch:
+                    interview_id, offset = await self._resolve(session_id, transcript)
+                    rows.append({
+                        "interview_id": interview_id,
+                        "seq": offset + segment.seq,
+                        "role": segment.role,
+                        "start": segment.start,
+                        "end": segment.end,
+                        "text": segment.text,
+                        "committed": segment.committed,
+                    })
+                await self.segments.insert_many(rows)
+            except BaseException as e:
+                # Parçaları kuyruğun başına geri koy, bir sonraki turda tekrar denenir
+                # (iptal edilen flush kısmen yazdıysa tekrarlar ON CONFLICT ile atlanır)
+                self._pending[:0] = batch
+                if not isinstance(e, Exception):
+                    raise
+                self.failed_flushes += 1
+                logger.exception("[TranscriptWriter] Flush failed, %d segment(s) kept for retry", len(batch))
+                return 0
+            self.persisted += len(batch)
+            logger.debug(
+                "[TranscriptWriter] Persisted %d segment(s) in %.1fms",
+                len(batch),
+                (time.perf_counter() - started) * 1000,
+            )
+            return len(batch)
+
+    async def close(self) -> None:
+        """Task'ı durdur ve kalanları yaz (lifespan shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "persisted": self.persisted,
+            "dropped": self.dropped,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+transcript_writer = TranscriptWriteBehind(interviews_repo, segments_repo)
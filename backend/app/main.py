@@ -10,8 +10,11 @@ backend_dir = Path(__file__).resolve().parent.parent
 if str(backend_dir) not in sys.path:
     sys.path.insert(0, str(backend_dir))
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 
 # Logging yapılandırması
@@ -22,10 +25,57 @@ logger = logging.getLogger(__name__)
 # from app.api.v1 import auth, candidates, interviews, signaling, audio_stream
 # from app.core.config import settings
 
+import asyncio
+
+from app.core.analysis import analysis_service
+from app.core.config import settings
+from app.core.database import database
+from app.core.load_monitor import load_monitor
+from app.core.transcript_writer import transcript_writer
+from services.gemini_questions import GEMINI_MODEL_NAME
+from services.gemini_report import GEMINI_REPORT_MODEL_NAME
+from services.gemini_stt import gemini_file_cleaner
+from services.provider_clients import provider_clients
+from services.stt_scheduler import stt_scheduler
+from services.sdk_warmup import warm_up_providers
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Uygulama yaşam döngüsü: arka plan servislerini başlat/durdur"""
+    load_monitor.start()
+    await database.connect()
+    transcript_writer.start()
+    
+    # Provider SDK'ları lazy import edilir; ilk isteği beklemeden arka planda
+    # SDK'ları yükle, havuzlu client'ları oluştur ve bağlantıları ısıt
+    warmup_task = None
+    if settings.PROVIDER_SDK_WARMUP_DELAY_SECONDS >= 0:
+        warmup_task = asyncio.create_task(
+            warm_up_providers(
+                settings.PROVIDER_SDK_WARMUP_DELAY_SECONDS,
+                generative_model_names=(GEMINI_MODEL_NAME, GEMINI_REPORT_MODEL_NAME),
+            )
+        )
+    
+    yield
+    
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await stt_scheduler.close()
+    await gemini_file_cleaner.close()
+    await asyncio.to_thread(provider_clients.close)
+    await analysis_service.close()
+    await transcript_writer.close()
+    await database.close()
+    await load_monitor.stop()
+
+
 app = FastAPI(
     title="AI Interview Analysis System",
     description="Full-stack AI-powered interview analysis platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 logger.info("🚀 FastAPI uygulaması başlatılıyor...")
@@ -58,12 +108,18 @@ app.add_middleware(
 )
 
 # Import routers
-from app.api.v1 import signaling, stt, ai
+from app.api.v1 import signaling, stt, ai, mux, interviews, candidates
+from app.core.admission import admission
+from app.core.metrics import registry
+from services.instrumentation import usage_tracker
 
 # Include routers
 app.include_router(signaling.router, prefix="/api/v1", tags=["Signaling"])
 app.include_router(stt.router, prefix="/api/v1/stt", tags=["STT"])
 app.include_router(ai.router, prefix="/api/v1/ai", tags=["AI"])
+app.include_router(mux.router, prefix="/api/v1", tags=["Mux"])
+app.include_router(interviews.router, prefix="/api/v1")
+app.include_router(candidates.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -77,3 +133,47 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint
+    Event loop lag ve in-flight STT/LLM çağrıları eşikleri aşarsa 503 döner
+    """
+    snapshot = load_monitor.snapshot()
+    status_code = 503 if snapshot["reason"] else 200
+    return JSONResponse(status_code=status_code, content=snapshot)
+
+
+@app.get("/capacity")
+async def capacity_snapshot():
+    """Anlık oda/session doluluğu ve admission limitleri"""
+    snapshot = admission.snapshot()
+    snapshot["session_buffers"] = {
+        "sessions": len(stt.SESSION_BUFFERS),
+        "total_bytes": sum(len(b) for b in stt.SESSION_BUFFERS.values()),
+        "resident_bytes": sum(b.resident_bytes for b in stt.SESSION_BUFFERS.values()),
+    }
+    return snapshot
+
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition formatında metrikler"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/usage")
+async def provider_usage():
+    """Provider çağrılarının model ve session bazlı süre, token ve maliyet özetleri"""
+    return usage_tracker.snapshot()
+
+
+@app.get("/usage/sessions/{session_id}")
+async def provider_usage_for_session(session_id: str):
+    """Tek bir mülakat oturumunun provider kullanım özeti"""
+    summary = usage_tracker.session_summary(session_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No provider usage recorded for this session")
+    return summary
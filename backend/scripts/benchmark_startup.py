@@ -0,0 +1,123 @@
+"""
+Startup Import-Time Benchmark
+app.main'in soğuk import süresini ölçer (Render free tier cold start takibi için)
+
+Kullanım:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --top 15
+    python scripts/benchmark_startup.py --json >> bench_startup.jsonl
+    python scripts/benchmark_startup.py --budget-ms 1000   # aşılırsa exit code 1
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Backend root dizini (app/ ve services/ burada)
+backend_dir = Path(__file__).resolve().parent.parent
+
+TARGET_MODULE = "app.main"
+
+
+def run_once(module: str) -> Tuple[float, Dict[str, int]]:
+    """
+    Yeni bir interpreter'da modülü -X importtime ile import et.
+
+    Returns:
+        (duvar saati süresi ms, modül -> kümülatif import süresi µs)
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(backend_dir) + os.pathsep + env.get("PYTHONPATH", "")
+    # Lazy import'u ölçüyoruz; startup warm-up'ı burada tetiklenmez (lifespan çalışmaz)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000.0
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cum, name = line[len("import time:"):].split("|")
+            cumulative[name.strip()] = int(cum.strip())
+        except ValueError:
+            continue  # başlık satırı
+    return wall_ms, cumulative
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure cold import time of the FastAPI app")
+    parser.add_argument("--runs", type=int, default=5, help="Ölçüm sayısı (varsayılan: 5)")
+    parser.add_argument("--top", type=int, default=10, help="En yavaş top-level import sayısı")
+    parser.add_argument("--module", default=TARGET_MODULE, help="Ölçülecek modül")
+    parser.add_argument("--json", action="store_true", help="Tek satır JSON çıktı (trend takibi için)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Medyan import süresi limiti")
+    args = parser.parse_args()
+
+    wall_times: List[float] = []
+    import_times: List[float] = []
+    slowest: Dict[str, List[int]] = {}
+
+    for _ in range(args.runs):
+        wall_ms, cumulative = run_once(args.module)
+        wall_times.append(wall_ms)
+        import_times.append(cumulative.get(args.module, 0) / 1000.0)
+        for name, us in cumulative.items():
+            # Sadece top-level paketler (alt modüller zaten kümülatif süreye dahil)
+            if "." not in name and name != args.module:
+                slowest.setdefault(name, []).append(us)
+
+    top = sorted(
+        ((name, statistics.median(values) / 1000.0) for name, values in slowest.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "import_ms_median": round(statistics.median(import_times), 1),
+        "import_ms_min": round(min(import_times), 1),
+        "import_ms_max": round(max(import_times), 1),
+        "process_ms_median": round(statistics.median(wall_times), 1),
+        "slowest_packages_ms": {name: round(ms, 1) for name, ms in top},
+        "timestamp": int(time.time()),
+    }
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"📦 {args.module} import süresi ({args.runs} ölçüm)")
+        print(f"   median: {result['import_ms_median']} ms  "
+              f"(min {result['import_ms_min']} / max {result['import_ms_max']})")
+        print(f"   interpreter dahil process süresi (median): {result['process_ms_median']} ms")
+        print("\n🐢 En yavaş top-level paketler:")
+        for name, ms in top:
+            print(f"   {ms:8.1f} ms  {name}")
+
+    if args.budget_ms is not None and result["import_ms_median"] > args.budget_ms:
+        print(
+            f"\n❌ Median import süresi {result['import_ms_median']} ms > budget {args.budget_ms} ms",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
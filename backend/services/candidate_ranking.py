@@ -0,0 +1,156 @@
+"""
+Candidate Ranking Service
+Rapor skorlarını sütunsal dizilere yükleyip adayları NumPy ile
+sıralar; yüzdelik, skor dağılımı ve konu kapsama matrisi üretir
+
+NumPy ilk sıralamada import edilir (provider SDK'ları gibi): uygulamanın
+açılışı bu modülü yüklerken NumPy'nin import süresini ödemez.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Skor dağılımı histogram aralıkları (0-100, 10'luk)
+SCORE_BINS = tuple(range(0, 101, 10))
+
+SENTIMENTS = ("positive", "neutral", "negative")
+
+# Kapsama matrisinde gösterilen en sık konu sayısı
+MAX_TOPICS = 50
+
+
+@dataclass
+class CandidateScores:
+    """
+    Her adayın en son raporu, sütunsal olarak (aynı indeks aynı aday).
+
+    Satırlar ``ReportRepository.latest_for_candidates`` çıktısıdır.
+    """
+
+    candidate_ids: List[int] = field(default_factory=list)
+    names: List[str] = field(default_factory=list)
+    interview_ids: List[int] = field(default_factory=list)
+    scores: List[float] = field(default_factory=list)
+    sentiments: List[List[float]] = field(default_factory=list)  # [positive, neutral, negative]
+    topics: List[List[str]] = field(default_factory=list)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        self.candidate_ids.append(row["candidate_id"])
+        self.names.append(row["full_name"])
+        self.interview_ids.append(row["interview_id"])
+        self.scores.append(float(row.get("overall_score") or 0))
+        self.sentiments.append([float(row.get(k) or 0) for k in SENTIMENTS])
+        self.topics.append([t for t in row.get("key_topics") or [] if isinstance(t, str) and t.strip()])
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+
+def _topic_matrix(topics: List[List[str]], max_topics: int):
+    """
+    Konu x aday boolean kapsama matrisi (en sık ``max_topics`` konu).
+
+    Konular büyük/küçük harf ve boşluk farkı gözetmeden birleştirilir;
+    etiket olarak ilk görülen yazım kullanılır.
+    """
+    import numpy as np
+
+    labels: Dict[str, str] = {}
+    topic_index: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[int] = []
+    for col, candidate_topics in enumerate(topics):
+        for topic in candidate_topics:
+            key = " ".join(topic.casefold().split())
+            if key not in topic_index:
+                topic_index[key] = len(topic_index)
+                labels[key] = topic.strip()
+            rows.append(topic_index[key])
+            cols.append(col)
+
+    matrix = np.zeros((len(topic_index), len(topics)), dtype=bool)
+    if rows:
+        matrix[np.asarray(rows), np.asarray(cols)] = True
+    frequency = matrix.sum(axis=1)
+    # Sıklığa göre azalan, eşitlikte ilk görülme sırası
+    order = np.argsort(-frequency, kind="stable")[:max_topics]
+    keys = list(topic_index)
+    return [labels[keys[i]] for i in order], matrix[order], frequency[order]
+
+
+def rank_candidates(
+    data: CandidateScores,
+    include_matrix: bool = True,
+    limit: Optional[int] = None,
+    max_topics: int = MAX_TOPICS,
+) -> Dict[str, Any]:
+    """
+    Adayları skora göre sırala (eşitlikte pozitif duygu oranı yüksek olan önde).
+
+    Rank "1224" stilindedir: eşit skorlu adaylar aynı sırayı paylaşır.
+    Yüzdelik, skoru adayınkine eşit veya düşük adayların oranıdır.
+    """
+    n = len(data)
+    if n == 0:
+        return {"total": 0, "candidates": [], "stats": None, "distribution": None, "topics": None}
+
+    import numpy as np
+
+    scores = np.asarray(data.scores, dtype=np.float64)
+    sentiments = np.asarray(data.sentiments, dtype=np.float64).reshape(n, 3)
+
+    sorted_scores = np.sort(scores)
+    rank = n - np.searchsorted(sorted_scores, scores, side="right") + 1
+    percentile = np.searchsorted(sorted_scores, scores, side="right") / n * 100
+    # lexsort son anahtara göre önce sıralar: skor, sonra pozitif duygu (ikisi de azalan)
+    order = np.lexsort((-sentiments[:, 0], -scores))
+    if limit is not None:
+        order = order[:limit]
+
+    counts, _ = np.histogram(scores, bins=SCORE_BINS)
+    p25, median, p75 = np.percentile(scores, [25, 50, 75])
+
+    labels, matrix, frequency = _topic_matrix(data.topics, max_topics)
+    # Döngüde NumPy skalerleri yerine düz Python değerleri kullanılır
+    score_list = scores.tolist()
+    rank_list = rank.tolist()
+    percentile_list = np.round(percentile, 1).tolist()
+    sentiment_list = sentiments.tolist()
+    candidates = []
+    for i in order.tolist():
+        candidates.append({
+            "candidate_id": data.candidate_ids[i],
+            "full_name": data.names[i],
+            "interview_id": data.interview_ids[i],
+            "overall_score": score_list[i],
+            "rank": rank_list[i],
+            "percentile": percentile_list[i],
+            "sentiment": dict(zip(SENTIMENTS, sentiment_list[i])),
+            "key_topics": data.topics[i],
+        })
+
+    topics: Dict[str, Any] = {
+        "labels": labels,
+        "frequency": frequency.tolist(),
+        "coverage_ratio": np.round(frequency / n, 3).tolist(),
+    }
+    if include_matrix:
+        # Sütunlar ``candidates`` sırasındadır
+        topics["coverage"] = matrix[:, order].astype(np.uint8).tolist()
+
+    return {
+        "total": n,
+        "candidates": candidates,
+        "stats": {
+            "mean": round(float(scores.mean()), 2),
+            "std": round(float(scores.std()), 2),
+            "min": float(sorted_scores[0]),
+            "p25": float(p25),
+            "median": float(median),
+            "p75": float(p75),
+            "max": float(sorted_scores[-1]),
+            "sentiment_mean": dict(zip(SENTIMENTS, np.round(sentiments.mean(axis=0), 2).tolist())),
+        },
+        "distribution": {"bins": list(SCORE_BINS), "counts": counts.tolist()},
+        "topics": topics,
+    }
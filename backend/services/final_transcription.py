@@ -0,0 +1,151 @@
+"""
+Final-pass Transcription Service
+Mülakat bitiminde kaydedilmiş audio'nun tamamını duraklama noktalarından
+parçalara bölüp paralel transcribe eder ve zaman damgalı transkript üretir
+"""
+
+import os
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.webm_segmenter import AudioSegment, WebMParseError, split_at_pauses
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda provider'a gönderilen parça sayısı
+FINAL_PASS_MAX_CONCURRENCY = int(os.getenv("FINAL_PASS_MAX_CONCURRENCY", "4"))
+
+# Parça uzunluğu: hedeften sonraki ilk duraklamada kesilir, max'ta sert kesilir (saniye)
+FINAL_PASS_TARGET_SEGMENT_SECONDS = float(os.getenv("FINAL_PASS_TARGET_SEGMENT_SECONDS", "30"))
+FINAL_PASS_MAX_SEGMENT_SECONDS = float(os.getenv("FINAL_PASS_MAX_SEGMENT_SECONDS", "60"))
+
+# Duraklama sayılan minimum sessizlik (ms)
+FINAL_PASS_MIN_PAUSE_MS = float(os.getenv("FINAL_PASS_MIN_PAUSE_MS", "400"))
+
+# Whisper dosya limiti; parse edilemeyen kayıtlar tek parça gönderilirken kontrol edilir
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+ROLE_DISPLAY = {"candidate": "Aday", "interviewer": "Görüşmeci"}
+
+TranscribeFn = Callable[..., Awaitable[str]]
+
+
+@dataclass
+class RecordingFile:
+    """Transcribe edilecek tek bir segment dosyası"""
+
+    path: Path
+    role: str
+    offset_seconds: float  # mülakat başından itibaren kaydın başlangıcı
+
+
+@dataclass
+class TranscriptSegment:
+    role: str
+    start: float  # saniye, mülakat başından itibaren
+    end: float
+    text: str
+
+
+def _format_timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _split_recording(path: Path) -> List[AudioSegment]:
+    """Kaydı oku ve duraklama noktalarından böl (thread'de çalışır)"""
+    audio = path.read_bytes()
+    try:
+        return split_at_pauses(
+            audio,
+            target_seconds=FINAL_PASS_TARGET_SEGMENT_SECONDS,
+            max_seconds=FINAL_PASS_MAX_SEGMENT_SECONDS,
+            min_pause_ms=FINAL_PASS_MIN_PAUSE_MS,
+        )
+    except WebMParseError as e:
+        if len(audio) > MAX_UPLOAD_BYTES:
+            logger.error("[Final Pass] %s parse edilemedi ve tek parça için çok büyük: %s", path, e)
+            return []
+        logger.warning("[Final Pass] %s parse edilemedi, tek parça gönderiliyor: %s", path, e)
+        return [AudioSegment(start_ms=0.0, end_ms=0.0, audio=audio)]
+
+
+async def transcribe_recordings(
+    recordings: List[RecordingFile],
+    transcribe: TranscribeFn,
+    language: str = "tr",
+    max_concurrency: int = FINAL_PASS_MAX_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Kayıtları parçalara böl, en fazla ``max_concurrency`` parçayı aynı anda
+    transcribe et ve sonuçları zamana göre birleştir.
+
+    Args:
+        recordings: Session'ın segment dosyaları
+        transcribe: ``transcribe(audio_bytes, language=...)`` (ör. stt_router.transcribe)
+        language: Dil kodu (varsayılan: "tr" - Türkçe)
+        max_concurrency: Eşzamanlı provider çağrısı sınırı
+
+    Returns:
+        segments, text ve süre/sayı istatistiklerini içeren dict
+    """
+    started = time.perf_counter()
+    split_results = await asyncio.gather(
+        *(asyncio.to_thread(_split_recording, rec.path) for rec in recordings)
+    )
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(rec: RecordingFile, segment: AudioSegment) -> Optional[TranscriptSegment]:
+        async with semaphore:
+            text = await transcribe(segment.audio, language=language)
+        text = (text or "").strip()
+        if not text:
+            return None
+        return TranscriptSegment(
+            role=rec.role,
+            start=round(rec.offset_seconds + segment.start_ms / 1000, 3),
+            end=round(rec.offset_seconds + segment.end_ms / 1000, 3),
+            text=text,
+        )
+
+    jobs = [
+        run(rec, segment)
+        for rec, segments in zip(recordings, split_results)
+        for segment in segments
+        if not segment.silent
+    ]
+    skipped_silent = sum(1 for segments in split_results for segment in segments if segment.silent)
+    results = await asyncio.gather(*jobs)
+
+    segments = sorted((r for r in results if r is not None), key=lambda s: (s.start, s.role))
+    duration = max(
+        (rec.offset_seconds + (segs[-1].end_ms / 1000 if segs else 0.0))
+        for rec, segs in zip(recordings, split_results)
+    ) if recordings else 0.0
+
+    text = "\n".join(
+        f"[{_format_timestamp(s.start)}] {ROLE_DISPLAY.get(s.role, s.role)}: {s.text}" for s in segments
+    )
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "[Final Pass] %d recording(s), %d segment(s) transcribed (%d silent skipped, %d empty) in %.2fs",
+        len(recordings),
+        len(jobs),
+        skipped_silent,
+        len(jobs) - len(segments),
+        elapsed,
+    )
+    return {
+        "segments": [asdict(s) for s in segments],
+        "text": text,
+        "duration_seconds": round(duration, 3),
+        "segment_count": len(jobs),
+        "silent_segments_skipped": skipped_silent,
+        "empty_segments": len(jobs) - len(segments),
+        "elapsed_seconds": round(elapsed, 3),
+    }
@@ -4,16 +4,14 @@ Aday transkriptine göre takip soruları üretir
 """
 
 import os
+import asyncio
 import json
 import re
 import logging
 from typing import List
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-    logging.warning("[Gemini Questions] google-generativeai paketi bulunamadı")
+from services.instrumentation import instrument_call
+from services.provider_clients import provider_clients
 
 logger = logging.getLogger(__name__)
 
@@ -28,21 +26,13 @@ MIN_TRANSCRIPT_LENGTH = 50  # karakter
 
 
 def configure_gemini_client():
-    """Gemini client'ı yapılandır"""
-    if not genai:
-        raise ImportError(
-            "google-generativeai paketi yüklü değil. "
-            "Lütfen requirements.txt'e google-generativeai>=0.8.0 ekleyin."
-        )
-    
-    if not GEMINI_API_KEY:
-        raise ValueError(
-            "GEMINI_API_KEY environment variable bulunamadı. "
-            "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
-        )
+    """
+    Paylaşılan Gemini model'ini döndür
     
-    genai.configure(api_key=GEMINI_API_KEY)
-    logger.info(f"[Gemini Questions] Gemini client yapılandırıldı (model: {GEMINI_MODEL_NAME})")
+    genai.configure ve GenerativeModel oluşturma provider_clients tarafından
+    süreç başına bir kez yapılır (ImportError/ValueError fırlatabilir).
+    """
+    return provider_clients.generative_model(GEMINI_MODEL_NAME)
 
 
 async def generate_question_suggestions(transcript: str, language: str = "tr") -> List[str]:
@@ -67,7 +57,7 @@ async def generate_question_suggestions(transcript: str, language: str = "tr") -
     
     # Gemini client'ı yapılandır
     try:
-        configure_gemini_client()
+        model = configure_gemini_client()
     except (ImportError, ValueError) as e:
         logger.error(f"[Gemini Questions] Gemini client yapılandırma hatası: {e}")
         raise
@@ -98,10 +88,18 @@ Sadece JSON array'i döndür, başka açıklama yapma."""
     )
     
     try:
-        model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-        response = model.generate_content(prompt)
+        with instrument_call("gemini", GEMINI_MODEL_NAME, "questions") as call:
+            # Senkron SDK çağrısı event loop'u bloklamasın
+            response = await asyncio.to_thread(
+                model.generate_content,
+                prompt,
+                request_options=provider_clients.request_options,
+            )
+            response_text = response.text.strip()
+            call.set_usage(response, prompt_text=prompt, response_text=response_text)
+            if not response_text:
+                call.outcome = "empty"
         
-        response_text = response.text.strip()
         logger.debug(f"[Gemini Questions] Gemini response: {response_text[:200]}...")
         
         # JSON array'i bul (regex ile)
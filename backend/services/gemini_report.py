@@ -7,13 +7,10 @@ import os
 import json
 import re
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
-    logging.warning("[Gemini Report] google-generativeai paketi bulunamadı")
+from services.instrumentation import instrument_call
+from services.provider_clients import provider_clients
 
 logger = logging.getLogger(__name__)
 
@@ -23,25 +20,46 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Gemini model - varsayılan gemini-1.5-flash-001
 GEMINI_REPORT_MODEL_NAME = os.getenv("GEMINI_REPORT_MODEL", "gemini-2.5-flash")
 
+# Prompt sürümü - prompt metni değişince artırılır; saklanan analizler yeniden üretilir
+REPORT_PROMPT_VERSION = "1"
+
 # Minimum transcript uzunluğu
 MIN_TRANSCRIPT_LENGTH = 20  # karakter
 
+# 429 cevabında Retry-After yoksa beklenecek süre (saniye)
+REPORT_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("REPORT_RATE_LIMIT_COOLDOWN_SECONDS", "10"))
+
+
+class ReportRateLimited(Exception):
+    """Gemini kota / rate limit hatası döndürdü (429 / RESOURCE_EXHAUSTED)"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def _rate_limit_delay(exc: BaseException) -> Optional[float]:
+    """Hata rate limit ise beklenecek süre, değilse None"""
+    code = getattr(exc, "code", None)
+    if code is None:
+        code = getattr(exc, "status_code", None)
+    if code != 429 and type(exc).__name__ != "ResourceExhausted":
+        return None
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", REPORT_RATE_LIMIT_COOLDOWN_SECONDS))
+    except (TypeError, ValueError):
+        return REPORT_RATE_LIMIT_COOLDOWN_SECONDS
+
 
 def _configure_gemini():
-    """Gemini client'ı yapılandır ve model döndür"""
-    if not genai:
-        raise ImportError(
-            "google-generativeai paketi yüklü değil. "
-            "Lütfen requirements.txt'e google-generativeai>=0.8.0 ekleyin."
-        )
-    
+    """Paylaşılan Gemini model'ini döndür (provider_clients süreç başına bir kez oluşturur)"""
     if not GEMINI_API_KEY:
         logger.error("[Gemini Report] GEMINI_API_KEY is not set")
         raise RuntimeError("GEMINI_API_KEY not configured")
     
-    genai.configure(api_key=GEMINI_API_KEY)
-    logger.info("[Gemini Report] Gemini configured (model=%s)", GEMINI_REPORT_MODEL_NAME)
-    return genai.GenerativeModel(GEMINI_REPORT_MODEL_NAME)
+    return provider_clients.generative_model(GEMINI_REPORT_MODEL_NAME)
 
 
 def _empty_report() -> Dict[str, Any]:
@@ -86,10 +104,18 @@ def _normalize_report(data: Dict[str, Any]) -> Dict[str, Any]:
     return base
 
 
-def generate_interview_report(transcript: str, language: str = "tr") -> Dict[str, Any]:
+def generate_interview_report(
+    transcript: str,
+    language: str = "tr",
+    raise_on_rate_limit: bool = False,
+) -> Dict[str, Any]:
     """
     Mülakat transkriptine göre rapor üretir.
     UI'daki kutulara direkt map edilebilecek bir dict döner.
+    
+    Hata durumunda boş rapor döner; ``raise_on_rate_limit`` ise rate limit
+    hatası ``ReportRateLimited`` olarak yükseltilir (çağıran bekleyip tekrar
+    deneyebilsin).
     """
     if not transcript or len(transcript.strip()) < MIN_TRANSCRIPT_LENGTH:
         logger.warning("[Gemini Report] Transcript too short, returning empty report")
@@ -140,8 +166,12 @@ MÜLAKAT TRANSKRİPTİ:
             "[Gemini Report] Requesting report from Gemini (len=%d chars)",
             len(transcript),
         )
-        response = model.generate_content(prompt)
-        raw = response.text.strip()
+        with instrument_call("gemini", GEMINI_REPORT_MODEL_NAME, "report") as call:
+            response = model.generate_content(prompt, request_options=provider_clients.request_options)
+            raw = response.text.strip()
+            call.set_usage(response, prompt_text=prompt, response_text=raw)
+            if not raw:
+                call.outcome = "empty"
         logger.info("[Gemini Report] Raw Gemini response (first 200 chars): %s", raw[:200])
         
         # Markdown code block'ları temizle
@@ -163,7 +193,11 @@ MÜLAKAT TRANSKRİPTİ:
     except json.JSONDecodeError:
         logger.exception("[Gemini Report] JSON parse error, returning empty report")
         return _empty_report()
-    except Exception:
+    except Exception as e:
+        retry_after = _rate_limit_delay(e)
+        if retry_after is not None and raise_on_rate_limit:
+            logger.warning("[Gemini Report] Rate limited, retry after %.1fs", retry_after)
+            raise ReportRateLimited(retry_after) from e
         logger.exception("[Gemini Report] Unexpected error, returning empty report")
         return _empty_report()
 
@@ -4,10 +4,19 @@ Audio chunk'larını Gemini API ile Türkçe metne çevirir
 """
 
 import os
-import tempfile
+import asyncio
 import logging
-from typing import Optional
-from google import genai
+from collections import deque
+from io import BytesIO
+from typing import TYPE_CHECKING, Deque, List, Optional
+
+from services.instrumentation import instrument_call
+from services.provider_clients import provider_clients
+
+if TYPE_CHECKING:
+    from google import genai
+
+# google-genai SDK'sı provider_clients tarafından ilk kullanımda import edilir
 
 logger = logging.getLogger(__name__)
 
@@ -17,30 +26,120 @@ GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 # Gemini model - ses transkripsiyonu için
 GEMINI_MODEL = "gemini-2.0-flash-exp"  # veya "gemini-2.0-flash"
 
-# Gemini client - global olarak bir kez oluştur
-_client: Optional[genai.Client] = None
+# Inline audio için üst sınır (istek limiti 20 MB; prompt ve base64 payı bırakılır)
+GEMINI_INLINE_MAX_BYTES = int(os.getenv("GEMINI_INLINE_MAX_BYTES", str(14 * 1024 * 1024)))
+
+# Files API ile yüklenen dosyaların arka planda toplu silinmesi
+GEMINI_FILE_CLEANUP_BATCH_SIZE = int(os.getenv("GEMINI_FILE_CLEANUP_BATCH_SIZE", "10"))
+GEMINI_FILE_CLEANUP_INTERVAL_SECONDS = float(os.getenv("GEMINI_FILE_CLEANUP_INTERVAL_SECONDS", "30"))
+
+_AUDIO_MIME_TYPES = {
+    ".webm": "audio/webm",
+    ".wav": "audio/wav",
+    ".mp3": "audio/mp3",
+    ".ogg": "audio/ogg",
+    ".flac": "audio/flac",
+    ".m4a": "audio/aac",
+    ".aac": "audio/aac",
+}
+
 
+def get_gemini_client() -> "genai.Client":
+    """Paylaşılan google-genai client'ını döndür"""
+    return provider_clients.genai()
 
-def get_gemini_client() -> genai.Client:
-    """Gemini client'ı singleton olarak döndür"""
-    global _client
+
+def _mime_type_for(suffix: str) -> str:
+    """Dosya uzantısından audio MIME type'ı (bilinmiyorsa audio/webm)"""
+    return _AUDIO_MIME_TYPES.get(suffix.lower(), "audio/webm")
+
+
+class GeminiFileCleaner:
+    """
+    Files API'ye yüklenen dosyaları transkript yolunu bekletmeden siler.
+    
+    İsimler kuyrukta birikir; batch dolduğunda veya interval geçtiğinde
+    tek bir thread çağrısında toplu silinir. Silinemeyen dosyalar Gemini
+    tarafında zaten süre dolunca (48 saat) kendiliğinden silinir.
+    """
     
-    if _client is None:
-        if not GEMINI_API_KEY:
-            raise ValueError(
-                "GEMINI_API_KEY environment variable bulunamadı. "
-                "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
-            )
-        _client = genai.Client(api_key=GEMINI_API_KEY)
-        logger.info("[Gemini STT] Client oluşturuldu")
+    def __init__(
+        self,
+        batch_size: int = GEMINI_FILE_CLEANUP_BATCH_SIZE,
+        interval_seconds: float = GEMINI_FILE_CLEANUP_INTERVAL_SECONDS,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.interval_seconds = interval_seconds
+        self._pending: Deque[str] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.deleted = 0
+        self.failed = 0
     
-    return _client
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+    
+    def enqueue(self, name: str) -> None:
+        """Dosyayı silinmek üzere kuyruğa ekle (event loop içinden çağrılmalı)"""
+        self._pending.append(name)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+    
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    async def flush(self) -> None:
+        """Kuyruktaki tüm dosyaları tek thread çağrısında sil"""
+        if not self._pending:
+            return
+        names = list(self._pending)
+        self._pending.clear()
+        await asyncio.to_thread(self._delete_batch, names)
+    
+    def _delete_batch(self, names: List[str]) -> None:
+        client = get_gemini_client()
+        for name in names:
+            try:
+                client.files.delete(name=name)
+                self.deleted += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"[Gemini STT] Dosya silme hatası (önemli değil): {name}: {e}")
+        logger.debug("[Gemini STT] %d uploaded file(s) cleaned up", len(names))
+    
+    async def close(self) -> None:
+        """Arka plan task'ını durdur ve kalan dosyaları sil (shutdown'da)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("[Gemini STT] Shutdown file cleanup failed")
+
+
+gemini_file_cleaner = GeminiFileCleaner()
 
 
 async def transcribe_with_gemini_chunk(
     audio_bytes: bytes,
     suffix: str = ".webm",
     language: str = "tr",  # Türkçe için "tr"
+    raise_on_error: bool = False,
 ) -> str:
     """
     Kısa bir ses segmentini Gemini ile Türkçe metne çevirir.
@@ -49,6 +148,7 @@ async def transcribe_with_gemini_chunk(
         audio_bytes: Audio chunk bytes (MediaRecorder'dan gelen)
         suffix: Dosya uzantısı (.webm, .wav, .mp3, vs.)
         language: Dil kodu (varsayılan: "tr" - Türkçe)
+        raise_on_error: True ise API hataları yutulmaz (provider router için)
     
     Returns:
         Transcribe edilmiş metin (boş string hata durumunda)
@@ -61,71 +161,75 @@ async def transcribe_with_gemini_chunk(
         logger.error("[Gemini STT] GEMINI_API_KEY bulunamadı")
         return ""
     
-    tmp_path = None
+    mime_type = _mime_type_for(suffix)
+    inline = len(audio_bytes) <= GEMINI_INLINE_MAX_BYTES
     
-    try:
-        # 1) Gelen chunk'ı geçici bir dosyaya yaz
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(audio_bytes)
-            tmp.flush()
-            tmp_path = tmp.name
-        
-        logger.debug(f"[Gemini STT] Geçici dosya oluşturuldu: {tmp_path} ({len(audio_bytes)} bytes)")
-        
-        # 2) Gemini client'ı al
-        client = get_gemini_client()
-        
-        # 3) Dosyayı Gemini Files API ile yükle
-        logger.debug("[Gemini STT] Dosya Gemini'ye yükleniyor...")
-        myfile = client.files.upload(file=tmp_path)
-        logger.debug(f"[Gemini STT] Dosya yüklendi. File URI: {myfile.uri}")
-        
-        # 4) Gemini'den transkript iste
-        prompt = "Bu dosyada Türkçe konuşma var. Lütfen yalnızca düz transkript metnini döndür."
-        
-        logger.info(f"[Gemini STT] Transkript isteniyor (model: {GEMINI_MODEL}, audio_size: {len(audio_bytes)} bytes)...")
-        result = client.models.generate_content(
-            model=GEMINI_MODEL,
-            contents=[
-                myfile,
-                prompt,
-            ],
-        )
-        
-        # 5) Sonucu parse et - response.candidates ve content.parts üzerinden
-        text = ""
-        if result.candidates:
-            for candidate in result.candidates:
-                if candidate.content and candidate.content.parts:
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            text += part.text
-        
-        text = text.strip()
-        
-        logger.info(f"[Gemini STT] Gemini text={text!r} (length: {len(text)})")
-        
-        # 6) Dosyayı Gemini'den sil (opsiyonel - storage tasarrufu için)
+    with instrument_call("gemini", GEMINI_MODEL, "transcribe", len(audio_bytes)) as call:
         try:
-            client.files.delete(name=myfile.name)
-            logger.debug("[Gemini STT] Geçici dosya Gemini'den silindi")
-        except Exception as e:
-            logger.warning(f"[Gemini STT] Dosya silme hatası (önemli değil): {e}")
-        
-        return text
-        
-    except Exception as e:
-        logger.exception("[Gemini STT] Gemini transcribe error")
-        return ""
-    
-    finally:
-        # 7) Lokal geçici dosyayı sil
-        if tmp_path and os.path.exists(tmp_path):
+            # 1) Gemini client'ı al
+            client = get_gemini_client()
+            
+            # 2) Audio part'ını hazırla: küçük payload'lar bellekten inline gider,
+            #    limit üstü payload'lar Files API'ye (disk kullanmadan) yüklenir
+            uploaded_name = None
+            if inline:
+                from google.genai import types
+                
+                audio_part = types.Part.from_bytes(data=audio_bytes, mime_type=mime_type)
+                logger.debug(f"[Gemini STT] Inline audio part ({len(audio_bytes)} bytes, {mime_type})")
+            else:
+                logger.debug("[Gemini STT] Audio inline limitini aşıyor, Files API'ye yükleniyor...")
+                audio_part = await asyncio.to_thread(
+                    client.files.upload,
+                    file=BytesIO(audio_bytes),
+                    config={"mime_type": mime_type},
+                )
+                uploaded_name = audio_part.name
+                logger.debug(f"[Gemini STT] Dosya yüklendi. File URI: {audio_part.uri}")
+            
+            # 3) Gemini'den transkript iste
+            prompt = "Bu dosyada Türkçe konuşma var. Lütfen yalnızca düz transkript metnini döndür."
+            
+            logger.info(f"[Gemini STT] Transkript isteniyor (model: {GEMINI_MODEL}, audio_size: {len(audio_bytes)} bytes, inline: {inline})...")
             try:
-                os.unlink(tmp_path)
-                logger.debug(f"[Gemini STT] Lokal geçici dosya silindi: {tmp_path}")
-            except Exception as e:
-                logger.warning(f"[Gemini STT] Lokal dosya silme hatası: {e}")
+                result = await asyncio.to_thread(
+                    client.models.generate_content,
+                    model=GEMINI_MODEL,
+                    contents=[
+                        audio_part,
+                        prompt,
+                    ],
+                )
+            finally:
+                # 4) Yüklenen dosyanın silinmesi kritik yolda beklenmez
+                if uploaded_name:
+                    gemini_file_cleaner.enqueue(uploaded_name)
+            
+            # 5) Sonucu parse et - response.candidates ve content.parts üzerinden
+            text = ""
+            if result.candidates:
+                for candidate in result.candidates:
+                    if candidate.content and candidate.content.parts:
+                        for part in candidate.content.parts:
+                            if hasattr(part, 'text') and part.text:
+                                text += part.text
+            
+            text = text.strip()
+            
+            logger.info(f"[Gemini STT] Gemini text={text!r} (length: {len(text)})")
+            
+            call.set_usage(result, prompt_text=prompt, response_text=text)
+            if not text:
+                call.outcome = "empty"
+            
+            return text
+        
+        except Exception as e:
+            call.outcome = "error"
+            logger.exception("[Gemini STT] Gemini transcribe error")
+            if raise_on_error:
+                raise
+            return ""
 
 
 # Synchronous wrapper (async fonksiyon çağrılamazsa)
@@ -137,8 +241,6 @@ def transcribe_with_gemini_chunk_sync(
     """
     Synchronous wrapper - asyncio olmadan kullanım için
     """
-    import asyncio
-    
     try:
         loop = asyncio.get_event_loop()
     except RuntimeError:
@@ -0,0 +1,257 @@
+"""
+Provider Call Instrumentation
+Whisper/Gemini çağrıları için süre, payload boyutu, token kullanımı ve maliyet kaydı
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Aktif mülakat oturumu - çağıran katman (ör. stt_ws) set eder, servisler imza değiştirmeden okur
+current_session_id: ContextVar[Optional[str]] = ContextVar("current_session_id", default=None)
+
+# Token sayısı usage metadata'da yoksa yerel tahmin: ~4 karakter = 1 token
+CHARS_PER_TOKEN = 4
+
+# Opus/WebM ~32 kbps -> saniyede ~4000 byte (Whisper dakika bazlı ücretlendirme tahmini için)
+ESTIMATED_AUDIO_BYTES_PER_SECOND = 4000
+
+# Takip edilen maksimum session sayısı (eski session'lar LRU ile düşer)
+MAX_TRACKED_SESSIONS = 1000
+
+# USD fiyatları: token modelleri 1M token başına, ses modelleri dakika başına
+# PROVIDER_PRICING_JSON env ile override edilebilir
+DEFAULT_PRICING: Dict[str, Dict[str, float]] = {
+    "gemini-2.5-flash": {"input_per_1m": 0.30, "output_per_1m": 2.50},
+    "gemini-2.0-flash": {"input_per_1m": 0.10, "output_per_1m": 0.40},
+    "gemini-2.0-flash-exp": {"input_per_1m": 0.10, "output_per_1m": 0.40},
+    "whisper-1": {"per_minute": 0.006},
+}
+
+
+def _load_pricing() -> Dict[str, Dict[str, float]]:
+    pricing = dict(DEFAULT_PRICING)
+    raw = os.getenv("PROVIDER_PRICING_JSON")
+    if raw:
+        try:
+            pricing.update(json.loads(raw))
+        except (ValueError, TypeError):
+            logger.warning("[Instrumentation] PROVIDER_PRICING_JSON parse edilemedi, varsayılan fiyatlar kullanılıyor")
+    return pricing
+
+
+PRICING = _load_pricing()
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Usage metadata yoksa kaba token tahmini"""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class CallRecord:
+    """Tek bir provider çağrısının ölçümleri"""
+
+    provider: str
+    model: str
+    operation: str
+    session_id: Optional[str] = None
+    bytes_uploaded: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    tokens_estimated: bool = False
+    audio_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    outcome: str = "ok"  # ok | empty | error | cancelled
+
+    def set_usage(self, response: Any, prompt_text: Optional[str] = None, response_text: Optional[str] = None) -> None:
+        """
+        Token sayılarını response'un usage metadata'sından al, yoksa tahmin et.
+
+        Gemini (google-generativeai ve google-genai) ``usage_metadata``,
+        OpenAI ``usage`` alanını kullanır.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.prompt_tokens = int(getattr(usage, "prompt_token_count", 0) or 0)
+            self.response_tokens = int(getattr(usage, "candidates_token_count", 0) or 0)
+        else:
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                self.prompt_tokens = int(getattr(usage, "input_tokens", 0) or getattr(usage, "prompt_tokens", 0) or 0)
+                self.response_tokens = int(
+                    getattr(usage, "output_tokens", 0) or getattr(usage, "completion_tokens", 0) or 0
+                )
+
+        if not self.prompt_tokens and prompt_text:
+            self.prompt_tokens = estimate_tokens(prompt_text)
+            self.tokens_estimated = True
+        if not self.response_tokens and response_text:
+            self.response_tokens = estimate_tokens(response_text)
+            self.tokens_estimated = True
+
+    @property
+    def cost_usd(self) -> float:
+        price = PRICING.get(self.model)
+        if not price:
+            return 0.0
+        cost = 0.0
+        cost += self.prompt_tokens * price.get("input_per_1m", 0.0) / 1_000_000
+        cost += self.response_tokens * price.get("output_per_1m", 0.0) / 1_000_000
+        cost += self.audio_seconds / 60.0 * price.get("per_minute", 0.0)
+        return cost
+
+
+@dataclass
+class UsageSummary:
+    """Birden fazla çağrının toplamı"""
+
+    calls: int = 0
+    errors: int = 0
+    empty: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    bytes_uploaded: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    cost_usd: float = 0.0
+    by_operation: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, record: CallRecord) -> None:
+        self.calls += 1
+        if record.outcome == "error":
+            self.errors += 1
+        elif record.outcome == "empty":
+            self.empty += 1
+        self.total_seconds += record.duration_seconds
+        self.max_seconds = max(self.max_seconds, record.duration_seconds)
+        self.bytes_uploaded += record.bytes_uploaded
+        self.prompt_tokens += record.prompt_tokens
+        self.response_tokens += record.response_tokens
+        self.cost_usd += record.cost_usd
+        self.by_operation[record.operation] = self.by_operation.get(record.operation, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "empty": self.empty,
+            "total_seconds": round(self.total_seconds, 3),
+            "avg_seconds": round(self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_seconds": round(self.max_seconds, 3),
+            "bytes_uploaded": self.bytes_uploaded,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "by_operation": dict(self.by_operation),
+        }
+
+
+class UsageTracker:
+    """
+    Çağrı kayıtlarını session ve model bazında toplar.
+
+    Senkron SDK çağrıları (ör. rapor üretimi) worker thread'lerde ölçülür;
+    LRU ve toplamlar kilit altında güncellenip okunur.
+    """
+
+    def __init__(self, max_sessions: int = MAX_TRACKED_SESSIONS):
+        self.max_sessions = max_sessions
+        self.by_model: Dict[str, UsageSummary] = {}
+        self.by_session: "OrderedDict[str, UsageSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            self.by_model.setdefault(record.model, UsageSummary()).add(record)
+
+            if record.session_id:
+                summary = self.by_session.get(record.session_id)
+                if summary is None:
+                    summary = self.by_session[record.session_id] = UsageSummary()
+                    if len(self.by_session) > self.max_sessions:
+                        self.by_session.popitem(last=False)
+                else:
+                    self.by_session.move_to_end(record.session_id)
+                summary.add(record)
+
+    def session_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self.by_session.get(session_id)
+            return summary.to_dict() if summary else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "models": {model: s.to_dict() for model, s in self.by_model.items()},
+                "sessions": {sid: s.to_dict() for sid, s in self.by_session.items()},
+            }
+
+
+usage_tracker = UsageTracker()
+
+
+@contextmanager
+def instrument_call(
+    provider: str,
+    model: str,
+    operation: str,
+    bytes_uploaded: int = 0,
+) -> Iterator[CallRecord]:
+    """
+    Bir provider çağrısını ölç ve usage_tracker'a kaydet.
+
+    Servisler hataları yutup boş değer döndürdüğü için sonucu
+    ``record.outcome`` ile kendileri işaretler; blok içinden exception
+    çıkarsa outcome otomatik olarak "error" olur.
+
+    Example:
+        with instrument_call("openai", model, "transcribe", len(audio)) as call:
+            result = client.audio.transcriptions.create(...)
+            call.set_usage(result, response_text=result.text)
+    """
+    record = CallRecord(
+        provider=provider,
+        model=model,
+        operation=operation,
+        session_id=current_session_id.get(),
+        bytes_uploaded=bytes_uploaded,
+    )
+    started = time.perf_counter()
+    try:
+        yield record
+    except asyncio.CancelledError:
+        # Ör. hedged isteğin kaybeden tarafı
+        record.outcome = "cancelled"
+        raise
+    except BaseException:
+        record.outcome = "error"
+        raise
+    finally:
+        record.duration_seconds = time.perf_counter() - started
+        usage_tracker.record(record)
+        logger.debug(
+            "[Instrumentation] %s/%s %s: %.3fs, %d bytes, tokens=%d/%d%s, outcome=%s, session=%s",
+            record.provider,
+            record.model,
+            record.operation,
+            record.duration_seconds,
+            record.bytes_uploaded,
+            record.prompt_tokens,
+            record.response_tokens,
+            " (est)" if record.tokens_estimated else "",
+            record.outcome,
+            record.session_id,
+        )
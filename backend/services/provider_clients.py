@@ -0,0 +1,227 @@
+"""
+Provider Client Registry
+OpenAI ve Gemini client'larını süreç başına bir kez oluşturur, bağlantı havuzlarını
+yapılandırır, startup'ta ısıtır ve shutdown'da kapatır (FastAPI lifespan tarafından yönetilir)
+"""
+
+import os
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from google import genai as google_genai
+
+logger = logging.getLogger(__name__)
+
+# API key'ler - environment variable'dan al
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+
+# HTTP bağlantı havuzu ve timeout ayarları
+PROVIDER_HTTP_MAX_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "20"))
+PROVIDER_HTTP_MAX_KEEPALIVE = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE", "10"))
+PROVIDER_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_HTTP_KEEPALIVE_EXPIRY", "120"))
+PROVIDER_HTTP_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_HTTP_CONNECT_TIMEOUT", "5"))
+PROVIDER_HTTP_TIMEOUT = float(os.getenv("PROVIDER_HTTP_TIMEOUT", "60"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "2"))
+
+# Startup'ta ücretsiz bir metadata isteğiyle TLS/keep-alive bağlantısını önceden aç
+PROVIDER_PREWARM_CONNECTIONS = os.getenv("PROVIDER_PREWARM_CONNECTIONS", "true").lower() in ("1", "true", "yes")
+
+
+class ProviderClientRegistry:
+    """
+    Provider client'larının süreç genelindeki tek kopyaları.
+
+    Client'lar ilk kullanımda ya da ``warm_up()`` ile oluşturulur. Warm-up
+    bir thread'de çalışabildiği için oluşturma bir kilitle korunur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._openai: Optional["OpenAI"] = None
+        self._genai: Optional["google_genai.Client"] = None
+        self._generativeai_configured = False
+        self._generative_models: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # OpenAI (Whisper)
+    # ------------------------------------------------------------------
+
+    def openai(self) -> "OpenAI":
+        """Havuzlu httpx transport'lu OpenAI client'ı"""
+        if self._openai is not None:
+            return self._openai
+
+        with self._lock:
+            if self._openai is None:
+                if not OPENAI_API_KEY:
+                    raise ValueError(
+                        "OPENAI_API_KEY environment variable bulunamadı. "
+                        "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
+                    )
+                import httpx
+                from openai import OpenAI
+
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=PROVIDER_HTTP_MAX_CONNECTIONS,
+                        max_keepalive_connections=PROVIDER_HTTP_MAX_KEEPALIVE,
+                        keepalive_expiry=PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=httpx.Timeout(PROVIDER_HTTP_TIMEOUT, connect=PROVIDER_HTTP_CONNECT_TIMEOUT),
+                )
+                self._openai = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    http_client=http_client,
+                    max_retries=PROVIDER_MAX_RETRIES,
+                )
+                logger.info(
+                    "[Provider Clients] OpenAI client oluşturuldu (max_connections=%d, keepalive=%d)",
+                    PROVIDER_HTTP_MAX_CONNECTIONS,
+                    PROVIDER_HTTP_MAX_KEEPALIVE,
+                )
+        return self._openai
+
+    # ------------------------------------------------------------------
+    # google-genai (Gemini STT)
+    # ------------------------------------------------------------------
+
+    def genai(self) -> "google_genai.Client":
+        """google-genai client'ı (timeout yapılandırılmış)"""
+        if self._genai is not None:
+            return self._genai
+
+        with self._lock:
+            if self._genai is None:
+                if not GEMINI_API_KEY:
+                    raise ValueError(
+                        "GEMINI_API_KEY environment variable bulunamadı. "
+                        "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
+                    )
+                from google import genai
+
+                self._genai = genai.Client(
+                    api_key=GEMINI_API_KEY,
+                    # HttpOptions.timeout milisaniye cinsinden
+                    http_options={"timeout": int(PROVIDER_HTTP_TIMEOUT * 1000)},
+                )
+                logger.info("[Provider Clients] google-genai client oluşturuldu")
+        return self._genai
+
+    # ------------------------------------------------------------------
+    # google-generativeai (soru önerisi ve rapor)
+    # ------------------------------------------------------------------
+
+    def generative_model(self, model_name: str):
+        """
+        ``genai.configure`` bir kez çalıştırılır, GenerativeModel'ler model adına
+        göre cache'lenir. Böylece istek başına yeniden yapılandırma yapılmaz.
+
+        Raises:
+            ImportError: google-generativeai yüklü değilse
+            ValueError: GEMINI_API_KEY yoksa
+        """
+        model = self._generative_models.get(model_name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._generative_models.get(model_name)
+            if model is not None:
+                return model
+
+            try:
+                import google.generativeai as generativeai
+            except ImportError as e:
+                raise ImportError(
+                    "google-generativeai paketi yüklü değil. "
+                    "Lütfen requirements.txt'e google-generativeai>=0.8.0 ekleyin."
+                ) from e
+
+            if not self._generativeai_configured:
+                if not GEMINI_API_KEY:
+                    raise ValueError(
+                        "GEMINI_API_KEY environment variable bulunamadı. "
+                        "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
+                    )
+                generativeai.configure(api_key=GEMINI_API_KEY)
+                self._generativeai_configured = True
+                logger.info("[Provider Clients] google-generativeai yapılandırıldı")
+
+            model = self._generative_models[model_name] = generativeai.GenerativeModel(model_name)
+            logger.info("[Provider Clients] GenerativeModel oluşturuldu (model=%s)", model_name)
+        return model
+
+    @property
+    def request_options(self) -> Dict[str, float]:
+        """google-generativeai ``generate_content`` çağrıları için timeout"""
+        return {"timeout": PROVIDER_HTTP_TIMEOUT}
+
+    # ------------------------------------------------------------------
+    # Lifespan
+    # ------------------------------------------------------------------
+
+    def warm_up(self, generative_model_names=()) -> None:
+        """
+        Yapılandırılmış provider'ların client'larını oluştur ve (isteğe bağlı)
+        bağlantıyı ücretsiz bir metadata isteğiyle önceden aç.
+
+        Senkron çalışır; lifespan bunu ``asyncio.to_thread`` ile çağırır.
+        """
+        if OPENAI_API_KEY:
+            try:
+                client = self.openai()
+                if PROVIDER_PREWARM_CONNECTIONS:
+                    client.models.list()
+                    logger.info("[Provider Clients] OpenAI bağlantısı ısıtıldı")
+            except Exception as e:
+                logger.warning(f"[Provider Clients] OpenAI warm-up hatası: {e}")
+
+        if GEMINI_API_KEY:
+            try:
+                self.genai()
+            except Exception as e:
+                logger.warning(f"[Provider Clients] google-genai warm-up hatası: {e}")
+
+            for model_name in generative_model_names:
+                try:
+                    self.generative_model(model_name)
+                except Exception as e:
+                    logger.warning(f"[Provider Clients] GenerativeModel warm-up hatası ({model_name}): {e}")
+
+            if PROVIDER_PREWARM_CONNECTIONS and generative_model_names:
+                try:
+                    import google.generativeai as generativeai
+
+                    generativeai.get_model(f"models/{generative_model_names[0]}")
+                    logger.info("[Provider Clients] Gemini bağlantısı ısıtıldı")
+                except Exception as e:
+                    logger.warning(f"[Provider Clients] Gemini bağlantı warm-up hatası: {e}")
+
+    def close(self) -> None:
+        """Açık bağlantı havuzlarını kapat (lifespan shutdown)"""
+        with self._lock:
+            if self._openai is not None:
+                try:
+                    self._openai.close()
+                except Exception as e:
+                    logger.warning(f"[Provider Clients] OpenAI client kapatma hatası: {e}")
+                self._openai = None
+
+            if self._genai is not None:
+                close = getattr(self._genai, "close", None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception as e:
+                        logger.warning(f"[Provider Clients] google-genai client kapatma hatası: {e}")
+                self._genai = None
+
+            self._generative_models.clear()
+        logger.info("[Provider Clients] Provider client'ları kapatıldı")
+
+
+provider_clients = ProviderClientRegistry()
@@ -0,0 +1,67 @@
+"""
+Provider SDK Warm-up
+Ağır provider SDK'larını sunucu bağlantı kabul etmeye başladıktan sonra arka planda import eder
+ve paylaşılan provider client'larını oluşturur
+"""
+
+import asyncio
+import importlib
+import logging
+import time
+from typing import Sequence, Tuple
+
+from services.provider_clients import provider_clients
+
+logger = logging.getLogger(__name__)
+
+# Servislerin ilk kullanımda import ettiği SDK'lar
+PROVIDER_SDK_MODULES: Tuple[str, ...] = (
+    "openai",
+    "google.genai",
+    "google.generativeai",
+)
+
+
+async def warm_up_provider_sdks(delay_seconds: float = 0.0) -> None:
+    """
+    SDK'ları thread'de import et; ilk STT/LLM isteği import maliyetini ödemesin.
+
+    Import'lar thread'de yapıldığı için event loop bloklanmaz; eşzamanlı
+    bir istek aynı modülü import ederse Python import kilidi bekletir.
+
+    Args:
+        delay_seconds: İlk isteklere (ör. /health) öncelik vermek için bekleme süresi
+    """
+    if delay_seconds > 0:
+        await asyncio.sleep(delay_seconds)
+
+    for module_name in PROVIDER_SDK_MODULES:
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(importlib.import_module, module_name)
+        except ImportError as e:
+            logger.warning(f"[SDK Warmup] {module_name} import edilemedi: {e}")
+            continue
+        except Exception:
+            logger.exception(f"[SDK Warmup] {module_name} import hatası")
+            continue
+        logger.info(
+            "[SDK Warmup] %s yüklendi (%.0fms)",
+            module_name,
+            (time.perf_counter() - started) * 1000.0,
+        )
+
+
+async def warm_up_providers(delay_seconds: float = 0.0, generative_model_names: Sequence[str] = ()) -> None:
+    """
+    SDK'ları import et, ardından havuzlu client'ları oluşturup bağlantıları ısıt.
+
+    Args:
+        delay_seconds: İlk isteklere öncelik vermek için bekleme süresi
+        generative_model_names: Önceden oluşturulacak Gemini model'leri
+    """
+    await warm_up_provider_sdks(delay_seconds)
+    try:
+        await asyncio.to_thread(provider_clients.warm_up, tuple(generative_model_names))
+    except Exception:
+        logger.exception("[SDK Warmup] Provider client warm-up hatası")
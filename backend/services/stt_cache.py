@@ -0,0 +1,83 @@
+"""
+STT Result Cache
+Aynı audio penceresi tekrar gönderildiğinde (reconnect / replay) provider
+çağrısını atlamak için içerik hash'i -> transkript LRU cache'i
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cache'te tutulan maksimum sonuç sayısı (0 = kapalı)
+STT_CACHE_MAX_ENTRIES = int(os.getenv("STT_CACHE_MAX_ENTRIES", "512"))
+
+# 16 byte BLAKE2b digest: çakışma olasılığı ihmal edilebilir, key küçük kalır
+DIGEST_SIZE = 16
+
+
+def audio_cache_key(audio_bytes: bytes, model: str, language: str) -> bytes:
+    """
+    Audio içeriği, model ve dil için cache key'i.
+
+    Büyük buffer'lar kopyalanmadan memoryview üzerinden hash'lenir.
+    """
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE, person=b"stt-cache")
+    h.update(model.encode())
+    h.update(b"\0")
+    h.update(language.encode())
+    h.update(b"\0")
+    h.update(memoryview(audio_bytes))
+    return h.digest()
+
+
+class STTResultCache:
+    """Audio hash'ine göre transkript sonuçlarını tutan LRU cache"""
+
+    def __init__(self, max_entries: int = STT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: bytes) -> Optional[str]:
+        text = self._entries.get(key)
+        if text is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def put(self, key: bytes, text: str) -> None:
+        """Sonucu kaydet (boş sonuçlar cache'lenmez; provider hatası olabilir)"""
+        if not self.enabled or not text:
+            return
+        self._entries[key] = text
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+stt_result_cache = STTResultCache()
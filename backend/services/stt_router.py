@@ -0,0 +1,485 @@
+"""
+STT Provider Router
+Whisper ve Gemini STT arasında circuit breaker, timeout, jitter'lı retry ve
+opsiyonel hedging ile yönlendirme yapar
+"""
+
+import os
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sıralı provider listesi: ilk uygun olan primary, sonraki secondary
+STT_PROVIDERS = os.getenv("STT_PROVIDERS", "whisper,gemini")
+
+# Tek bir provider denemesi için üst sınır (saniye)
+STT_PROVIDER_TIMEOUT_SECONDS = float(os.getenv("STT_PROVIDER_TIMEOUT_SECONDS", "15"))
+
+# Aynı provider'da ek deneme sayısı ve full-jitter backoff tabanı (saniye)
+STT_RETRY_ATTEMPTS = int(os.getenv("STT_RETRY_ATTEMPTS", "1"))
+STT_RETRY_BASE_DELAY = float(os.getenv("STT_RETRY_BASE_DELAY", "0.25"))
+
+# Art arda bu kadar hata sonrası breaker açılır; bu süre sonra tek probe'a izin verilir
+STT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("STT_BREAKER_FAILURE_THRESHOLD", "3"))
+STT_BREAKER_RESET_SECONDS = float(os.getenv("STT_BREAKER_RESET_SECONDS", "30"))
+
+# Hedging: primary p95'i geçince secondary'yi de başlat, ilk başarılı cevabı al
+STT_HEDGING_ENABLED = os.getenv("STT_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+STT_HEDGE_MIN_SAMPLES = int(os.getenv("STT_HEDGE_MIN_SAMPLES", "20"))
+STT_HEDGE_DEFAULT_DELAY = float(os.getenv("STT_HEDGE_DEFAULT_DELAY", "3.0"))
+
+# Provider kotası (dakikadaki istek, 0 = sınırsız) ve 429 sonrası varsayılan bekleme
+STT_PROVIDER_RPM = {
+    "whisper": int(os.getenv("STT_WHISPER_RPM", "0")),
+    "gemini": int(os.getenv("STT_GEMINI_RPM", "0")),
+}
+STT_RATE_LIMIT_COOLDOWN_SECONDS = float(os.getenv("STT_RATE_LIMIT_COOLDOWN_SECONDS", "5"))
+
+# p95 hesabı için tutulan son başarılı çağrı süreleri
+LATENCY_WINDOW = 200
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+TranscribeFn = Callable[..., Awaitable[str]]
+
+# Scheduler'ın işi başlatmadan önce token'ını aldığı provider. Bu task'taki
+# ilk çağrı o provider'a gider ve bucket'tan ikinci kez token almaz.
+reserved_provider: ContextVar[Optional["STTProvider"]] = ContextVar("stt_reserved_provider", default=None)
+
+
+class ProviderError(Exception):
+    """Provider çağrısı başarısız (timeout, API hatası veya breaker açık)"""
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_client_error(exc: BaseException) -> bool:
+    """
+    4xx hataları (408/429 hariç) isteğin kendisiyle ilgilidir: retry edilmez
+    ve provider sağlığına yazılmaz.
+    """
+    status = _status_code(exc)
+    if status is None:
+        return False
+    return 400 <= status < 500 and status not in (408, 429)
+
+
+def _retry_after(exc: BaseException) -> float:
+    """429 cevabındaki Retry-After (yoksa varsayılan cooldown)"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", STT_RATE_LIMIT_COOLDOWN_SECONDS))
+    except (TypeError, ValueError):
+        return STT_RATE_LIMIT_COOLDOWN_SECONDS
+
+
+class TokenBucket:
+    """
+    Provider kotasına göre istek hızını sınırlayan token bucket.
+
+    ``rate_per_minute`` 0 ise sınırsızdır; yine de 429 sonrası
+    ``penalize`` ile geçici olarak kapatılabilir.
+    """
+
+    def __init__(self, rate_per_minute: int = 0, clock: Callable[[], float] = time.monotonic):
+        self.rate_per_minute = rate_per_minute
+        self._rate = rate_per_minute / 60.0
+        # Burst: kotanın ~10 saniyelik kısmı (en az 1 istek)
+        self.capacity = max(1.0, rate_per_minute / 6.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self._rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def time_until_available(self) -> float:
+        """Bir token için beklenmesi gereken süre (0 = hemen)"""
+        now = self._clock()
+        wait = max(0.0, self._blocked_until - now)
+        if self._rate <= 0:
+            return wait
+        self._refill(now)
+        if self._tokens >= 1:
+            return wait
+        return max(wait, (1 - self._tokens) / self._rate)
+
+    def try_acquire(self) -> bool:
+        """Token hemen alınabiliyorsa al (beklemez)"""
+        if self.time_until_available() > 0:
+            return False
+        if self._rate > 0:
+            self._tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        """Token alınana kadar bekle"""
+        while not self.try_acquire():
+            await asyncio.sleep(self.time_until_available())
+
+    def penalize(self, seconds: float) -> None:
+        """Provider rate limit döndürdü: bucket'ı boşalt ve süre dolana kadar kapat"""
+        self._tokens = 0.0
+        self._updated_at = self._clock()
+        self._blocked_until = max(self._blocked_until, self._updated_at + seconds)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "rate_per_minute": self.rate_per_minute,
+            "wait_seconds": round(self.time_until_available(), 3),
+        }
+
+
+class CircuitBreaker:
+    """
+    Art arda hata sayan basit circuit breaker.
+
+    closed -> (threshold hata) -> open -> (reset süresi) -> half_open
+    half_open'da tek probe çağrısına izin verilir; başarılıysa closed,
+    başarısızsa tekrar open olur.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = STT_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = STT_BREAKER_RESET_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def available(self) -> bool:
+        """Çağrı yapılabilir mi (state değiştirmeden)"""
+        state = self.state
+        if state == STATE_OPEN:
+            return False
+        if state == STATE_HALF_OPEN:
+            return not self._probe_in_flight
+        return True
+
+    def acquire(self) -> bool:
+        """Çağrı izni al; half_open'da probe slot'unu işaretler"""
+        if not self.available():
+            return False
+        if self._state == STATE_HALF_OPEN:
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != STATE_OPEN:
+                logger.warning("[STT Router] Circuit opened after %d failure(s)", self._failures)
+            self._state = STATE_OPEN
+            self._opened_at = self._clock()
+
+    def release(self) -> None:
+        """Sonucu sayılmayan çağrı (iptal / client hatası) probe slot'unu bıraksın"""
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+@dataclass
+class STTProvider:
+    """Router'a kayıtlı tek bir STT provider'ı"""
+
+    name: str
+    transcribe: TranscribeFn
+    model: str = ""
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    bucket: TokenBucket = field(default_factory=TokenBucket)
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    calls: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    hedged_wins: int = 0
+
+    def p95(self) -> Optional[float]:
+        """Son başarılı çağrıların p95 süresi (yeterli örnek yoksa None)"""
+        if len(self.latencies) < STT_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def snapshot(self) -> Dict[str, object]:
+        p95 = self.p95()
+        return {
+            "name": self.name,
+            **self.breaker.snapshot(),
+            "calls": self.calls,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "hedged_wins": self.hedged_wins,
+            "rate_limit": self.bucket.snapshot(),
+            "latency_samples": len(self.latencies),
+            "p95_seconds": round(p95, 4) if p95 is not None else None,
+        }
+
+
+class STTRouter:
+    """
+    Provider'ları sırayla dener.
+
+    Her deneme ``asyncio.wait_for`` ile sınırlanır, geçici hatalar full-jitter
+    backoff ile retry edilir ve breaker'a yazılır. Hedging açıksa primary kendi
+    p95'ini aştığında secondary paralel başlatılır; ilk başarılı sonuç kazanır,
+    diğeri iptal edilir.
+    """
+
+    def __init__(
+        self,
+        providers: List[STTProvider],
+        timeout_seconds: float = STT_PROVIDER_TIMEOUT_SECONDS,
+        retry_attempts: int = STT_RETRY_ATTEMPTS,
+        retry_base_delay: float = STT_RETRY_BASE_DELAY,
+        hedging_enabled: bool = STT_HEDGING_ENABLED,
+        hedge_default_delay: float = STT_HEDGE_DEFAULT_DELAY,
+    ):
+        self.providers = providers
+        self.timeout_seconds = timeout_seconds
+        self.retry_attempts = max(0, retry_attempts)
+        self.retry_base_delay = retry_base_delay
+        self.hedging_enabled = hedging_enabled
+        self.hedge_default_delay = hedge_default_delay
+
+    async def _call_once(self, provider: STTProvider, audio_bytes: bytes, language: str) -> str:
+        """Tek deneme: rate limit, breaker, timeout ve latency kaydı"""
+        if reserved_provider.get() is provider:
+            # Token scheduler'da alındı; rezervasyon tek kullanımlık
+            reserved_provider.set(None)
+        else:
+            await provider.bucket.acquire()
+        if not provider.breaker.acquire():
+            raise ProviderError(f"{provider.name} circuit open")
+        provider.calls += 1
+        started = time.perf_counter()
+        try:
+            text = await asyncio.wait_for(
+                provider.transcribe(audio_bytes, language=language, raise_on_error=True),
+                timeout=self.timeout_seconds,
+            )
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        except Exception as e:
+            if _status_code(e) == 429:
+                # Kota aşıldı: provider sağlıklı, sadece yavaşla
+                provider.rate_limited += 1
+                provider.breaker.release()
+                provider.bucket.penalize(_retry_after(e))
+                raise ProviderError(f"{provider.name} rate limited") from e
+            if _is_client_error(e):
+                provider.breaker.release()
+                raise
+            provider.failures += 1
+            provider.breaker.record_failure()
+            if isinstance(e, asyncio.TimeoutError):
+                raise ProviderError(f"{provider.name} timed out after {self.timeout_seconds}s") from e
+            raise ProviderError(f"{provider.name}: {e}") from e
+        provider.breaker.record_success()
+        provider.latencies.append(time.perf_counter() - started)
+        return text
+
+    async def _call_with_retries(self, provider: STTProvider, audio_bytes: bytes, language: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                return await self._call_once(provider, audio_bytes, language)
+            except ProviderError:
+                # Breaker açıldıysa veya kota dolduysa beklemek yerine sıradaki provider'a geç
+                if (
+                    attempt >= self.retry_attempts
+                    or not provider.breaker.available()
+                    or provider.bucket.time_until_available() > 0
+                ):
+                    raise
+            # Full jitter: eşzamanlı session'lar aynı anda tekrar vurmasın
+            delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+            attempt += 1
+            logger.info("[STT Router] Retrying %s in %.2fs (attempt %d)", provider.name, delay, attempt + 1)
+            await asyncio.sleep(delay)
+
+    def _hedge_delay(self, provider: STTProvider) -> float:
+        p95 = provider.p95()
+        return p95 if p95 is not None else self.hedge_default_delay
+
+    async def _hedged(
+        self,
+        primary: STTProvider,
+        secondary: STTProvider,
+        audio_bytes: bytes,
+        language: str,
+    ) -> str:
+        """Primary p95'i aşarsa secondary'yi de başlat, ilk başarılı sonucu döndür"""
+        tasks: Dict[asyncio.Task, STTProvider] = {
+            asyncio.ensure_future(self._call_with_retries(primary, audio_bytes, language)): primary,
+        }
+        done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+        if not done and secondary.breaker.available():
+            logger.info(
+                "[STT Router] %s slower than %.2fs, hedging with %s",
+                primary.name,
+                self._hedge_delay(primary),
+                secondary.name,
+            )
+            tasks[asyncio.ensure_future(self._call_with_retries(secondary, audio_bytes, language))] = secondary
+
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        if winner is not primary:
+                            winner.hedged_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Hedge başlamadan primary hata verdiyse secondary'ye düz failover
+        if len(tasks) == 1 and secondary.breaker.available():
+            return await self._call_with_retries(secondary, audio_bytes, language)
+        raise last_error if last_error else ProviderError("no provider answered")
+
+    async def transcribe(self, audio_bytes: bytes, language: str = "tr") -> str:
+        """
+        Audio'yu uygun provider'larla transcribe et.
+
+        Returns:
+            Transcribe edilmiş metin (tüm provider'lar başarısızsa boş string)
+        """
+        # Token'ı ayrılmış provider başa, kotası dolmuş provider'lar sona: varsa secondary'ye taşsın
+        reserved = reserved_provider.get()
+        candidates = sorted(
+            (p for p in self.providers if p.breaker.available()),
+            key=lambda p: (p is not reserved, p.bucket.time_until_available() > 0),
+        )
+        if not candidates:
+            logger.error("[STT Router] All STT provider circuits are open, skipping chunk")
+            return ""
+
+        try:
+            if self.hedging_enabled and len(candidates) > 1:
+                return await self._hedged(candidates[0], candidates[1], audio_bytes, language)
+
+            last_error: Optional[BaseException] = None
+            for provider in candidates:
+                try:
+                    return await self._call_with_retries(provider, audio_bytes, language)
+                except ProviderError as e:
+                    last_error = e
+                    logger.warning("[STT Router] %s failed, trying next provider: %s", provider.name, e)
+            logger.error("[STT Router] All STT providers failed: %s", last_error)
+        except ProviderError as e:
+            logger.error("[STT Router] All STT providers failed: %s", e)
+        except Exception:
+            # Client hatası (ör. bozuk audio): başka provider'da da başarısız olur
+            logger.exception("[STT Router] STT request rejected by provider")
+        return ""
+
+    @property
+    def model_key(self) -> str:
+        """Provider/model zinciri (ör. cache key'i için)"""
+        return ",".join(f"{p.name}:{p.model}" for p in self.providers)
+
+    def reserve(self) -> Optional[STTProvider]:
+        """
+        ``transcribe``'ın seçeceği sırayla token'ı hemen alınabilen ilk
+        provider'dan bir token al (yoksa None)
+        """
+        for provider in self.providers:
+            if provider.breaker.available() and provider.bucket.try_acquire():
+                return provider
+        return None
+
+    def ready_in(self) -> float:
+        """Herhangi bir provider'ın istek kabul edebilmesi için kalan süre"""
+        waits = [p.bucket.time_until_available() for p in self.providers if p.breaker.available()]
+        return min(waits) if waits else 0.0
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "hedging_enabled": self.hedging_enabled,
+            "timeout_seconds": self.timeout_seconds,
+            "retry_attempts": self.retry_attempts,
+            "providers": [p.snapshot() for p in self.providers],
+        }
+
+
+def _whisper_provider() -> STTProvider:
+    from services.whisper_stt import DEFAULT_WHISPER_MODEL, transcribe_with_whisper_chunk
+    return STTProvider(
+        "whisper",
+        transcribe_with_whisper_chunk,
+        model=DEFAULT_WHISPER_MODEL,
+        bucket=TokenBucket(STT_PROVIDER_RPM["whisper"]),
+    )
+
+
+def _build_providers() -> List[STTProvider]:
+    """STT_PROVIDERS sırasına göre API key'i tanımlı provider'ları oluştur"""
+    providers: List[STTProvider] = []
+    for name in (n.strip().lower() for n in STT_PROVIDERS.split(",")):
+        if name == "whisper" and os.getenv("OPENAI_API_KEY"):
+            providers.append(_whisper_provider())
+        elif name == "gemini" and os.getenv("GEMINI_API_KEY"):
+            from services.gemini_stt import GEMINI_MODEL, transcribe_with_gemini_chunk
+            providers.append(
+                STTProvider(
+                    "gemini",
+                    transcribe_with_gemini_chunk,
+                    model=GEMINI_MODEL,
+                    bucket=TokenBucket(STT_PROVIDER_RPM["gemini"]),
+                )
+            )
+        elif name:
+            logger.info("[STT Router] Provider %s skipped (unknown or API key missing)", name)
+    if not providers:
+        # Key yoksa bile Whisper'ı kaydet; hata logu servisin kendisinden gelsin
+        providers.append(_whisper_provider())
+    return providers
+
+
+stt_router = STTRouter(_build_providers())
@@ -0,0 +1,254 @@
+"""
+Fair STT Scheduler
+Tüm session'ların STT çağrılarını tek kuyruktan, provider kotasına ve
+eşzamanlılık sınırına göre adil sırayla dağıtır
+"""
+
+import os
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from services.stt_router import reserved_provider, stt_router
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Aynı anda provider'a gidebilecek STT çağrısı (0 = sınırsız)
+STT_SCHEDULER_MAX_CONCURRENCY = int(os.getenv("STT_SCHEDULER_MAX_CONCURRENCY", "8"))
+
+# Kuyrukta bu süreden uzun bekleyen iş atlanır (bir sonraki chunk zaten daha güncel)
+STT_SCHEDULER_MAX_WAIT_SECONDS = float(os.getenv("STT_SCHEDULER_MAX_WAIT_SECONDS", "20"))
+
+# Kapasite darken her interviewer işine karşılık kaç aday işi çalışır
+STT_SCHEDULER_CANDIDATE_WEIGHT = int(os.getenv("STT_SCHEDULER_CANDIDATE_WEIGHT", "3"))
+
+# Token ayrılamadığında tekrar denemeden önce en az bekleme (saniye)
+RESERVE_RETRY_SECONDS = 0.01
+
+CLASS_CANDIDATE = "candidate"
+CLASS_INTERVIEWER = "interviewer"
+
+
+class QueueTimeout(Exception):
+    """İş, kapasite açılmadan ``max_wait_seconds`` boyunca kuyrukta bekledi"""
+
+
+class _Job:
+    __slots__ = ("session_id", "fn", "started", "enqueued_at")
+
+    def __init__(self, session_id: str, fn: Callable[[], Awaitable], started: asyncio.Future):
+        self.session_id = session_id
+        self.fn = fn
+        # Dispatcher işi başlattığında çalışan task ile resolve edilir
+        self.started = started
+        self.enqueued_at = time.perf_counter()
+
+
+class FairSTTScheduler:
+    """
+    Process genelinde STT çağrı zamanlayıcısı.
+
+    - İşler öncelik sınıfına (aday / görüşmeci) göre iki kuyrukta tutulur;
+      iki sınıfta da bekleyen iş varsa ``candidate_weight`` adet aday işine
+      karşılık bir görüşmeci işi çalışır, böylece görüşmeci aç kalmaz.
+    - Sınıf içinde session'lar round-robin sırayla servis edilir; çok
+      chunk gönderen bir session diğerlerinin önüne geçemez.
+    - Bir iş ancak eşzamanlılık sınırı ve provider token bucket'ı
+      (``ready_in``) izin verdiğinde başlatılır. ``reserve`` verilmişse token
+      iş kuyruktan alınmadan önce dispatcher'da alınır ve
+      ``reserved_provider`` ile işe geçirilir; böylece kota darken işler
+      token için yarışmaz ve seçilen sıra korunur.
+    """
+
+    def __init__(
+        self,
+        ready_in: Callable[[], float] = lambda: 0.0,
+        reserve: Optional[Callable[[], Any]] = None,
+        max_concurrency: int = STT_SCHEDULER_MAX_CONCURRENCY,
+        max_wait_seconds: float = STT_SCHEDULER_MAX_WAIT_SECONDS,
+        candidate_weight: int = STT_SCHEDULER_CANDIDATE_WEIGHT,
+    ):
+        self._ready_in = ready_in
+        self._reserve = reserve
+        self.max_concurrency = max_concurrency
+        self.max_wait_seconds = max_wait_seconds
+        self.candidate_weight = max(1, candidate_weight)
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Job]]"] = {
+            CLASS_CANDIDATE: OrderedDict(),
+            CLASS_INTERVIEWER: OrderedDict(),
+        }
+        self._candidate_credit = self.candidate_weight
+        self._running = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.dispatched = 0
+        self.timed_out = 0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        return sum(len(jobs) for queue in self._queues.values() for jobs in queue.values())
+
+    def _ensure_dispatcher(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch())
+
+    def _next_class(self) -> Optional[str]:
+        has_candidate = bool(self._queues[CLASS_CANDIDATE])
+        has_interviewer = bool(self._queues[CLASS_INTERVIEWER])
+        if has_candidate and has_interviewer:
+            if self._candidate_credit > 0:
+                self._candidate_credit -= 1
+                return CLASS_CANDIDATE
+            self._candidate_credit = self.candidate_weight
+            return CLASS_INTERVIEWER
+        if has_candidate:
+            return CLASS_CANDIDATE
+        if has_interviewer:
+            return CLASS_INTERVIEWER
+        return None
+
+    def _pop_next(self) -> Optional[_Job]:
+        """Sıradaki işi seç: önce sınıf, sonra sınıf içinde round-robin session"""
+        klass = self._next_class()
+        if klass is None:
+            return None
+        queue = self._queues[klass]
+        session_id, jobs = next(iter(queue.items()))
+        job = jobs.popleft()
+        # Session'ı sona taşı (kalan işi yoksa kuyruktan çıkar)
+        del queue[session_id]
+        if jobs:
+            queue[session_id] = jobs
+        return job
+
+    def _remove(self, klass: str, job: _Job) -> None:
+        jobs = self._queues[klass].get(job.session_id)
+        if jobs and job in jobs:
+            jobs.remove(job)
+            if not jobs:
+                del self._queues[klass][job.session_id]
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self.queued or (self.max_concurrency and self._running >= self.max_concurrency):
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Provider kotası dolduysa token açılana kadar bekle (yeni işler
+            # bu sırada kuyruğa girer ve seçimde öncelikleri hesaba katılır)
+            wait = self._ready_in()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            reservation = None
+            if self._reserve is not None:
+                reservation = self._reserve()
+                if reservation is None:
+                    await asyncio.sleep(max(self._ready_in(), RESERVE_RETRY_SECONDS))
+                    continue
+
+            job = self._pop_next()
+            if job is None:
+                continue
+            self._running += 1
+            self.dispatched += 1
+            # Task oluşturulurken context kopyalanır: rezervasyon sadece bu işe geçer
+            token = reserved_provider.set(reservation)
+            try:
+                task = asyncio.ensure_future(job.fn())
+            finally:
+                reserved_provider.reset(token)
+            task.add_done_callback(self._on_done)
+            job.started.set_result(task)
+
+    def _on_done(self, _task: asyncio.Task) -> None:
+        self._running -= 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(
+        self,
+        session_id: str,
+        role: str,
+        fn: Callable[[], Awaitable[T]],
+        max_wait_seconds: Optional[float] = None,
+    ) -> T:
+        """
+        ``fn``'i sırası geldiğinde çalıştır ve sonucunu döndür.
+
+        Args:
+            session_id: Adil paylaşımın yapıldığı session
+            role: "candidate" ise aday öncelik sınıfı, aksi halde görüşmeci
+            fn: Provider çağrısını başlatan coroutine factory
+            max_wait_seconds: Bu iş için kuyruk bekleme sınırı
+                (None = scheduler varsayılanı, 0 = sınırsız)
+
+        Raises:
+            QueueTimeout: İş ``max_wait_seconds`` içinde başlatılamadı
+        """
+        klass = CLASS_CANDIDATE if role == "candidate" else CLASS_INTERVIEWER
+        if max_wait_seconds is None:
+            max_wait_seconds = self.max_wait_seconds
+        job = _Job(session_id, fn, asyncio.get_running_loop().create_future())
+        self._queues[klass].setdefault(session_id, deque()).append(job)
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+        try:
+            task = await asyncio.wait_for(
+                asyncio.shield(job.started),
+                timeout=max_wait_seconds or None,
+            )
+        except asyncio.TimeoutError:
+            self._remove(klass, job)
+            self.timed_out += 1
+            raise QueueTimeout(f"STT job for session {session_id} waited {max_wait_seconds}s") from None
+        except asyncio.CancelledError:
+            self._remove(klass, job)
+            if job.started.done():
+                job.started.result().cancel()
+            raise
+
+        return await task
+
+    async def close(self) -> None:
+        """Dispatcher task'ını durdur (lifespan shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, object]:
+        now = time.perf_counter()
+        oldest = [
+            now - jobs[0].enqueued_at
+            for queue in self._queues.values()
+            for jobs in queue.values()
+            if jobs
+        ]
+        return {
+            "running": self._running,
+            "queued": self.queued,
+            "queued_sessions": {klass: len(queue) for klass, queue in self._queues.items()},
+            "oldest_wait_seconds": round(max(oldest), 3) if oldest else 0.0,
+            "dispatched": self.dispatched,
+            "timed_out": self.timed_out,
+            "max_concurrency": self.max_concurrency,
+        }
+
+
+stt_scheduler = FairSTTScheduler(ready_in=stt_router.ready_in, reserve=stt_router.reserve)
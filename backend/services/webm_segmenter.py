@@ -0,0 +1,349 @@
+"""
+WebM Segmenter
+MediaRecorder WebM/Opus kayıtlarını decode etmeden duraklama noktalarından
+bağımsız çözülebilen WebM parçalarına böler
+
+ffmpeg gerektirmemek için sadece EBML container'ı parse edilir:
+- Duraklama tespiti Opus VBR paket boyutuna dayanır; sessiz frame'ler
+  konuşma frame'lerinden çok daha küçük kodlanır.
+- Her parça orijinal header (EBML + Info + Tracks) ile yeni Cluster'lar
+  yazılarak oluşturulur; timecode'lar parça başına 0'dan başlar.
+"""
+
+import logging
+import statistics
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# EBML element ID'leri
+ID_EBML = 0x1A45DFA3
+ID_SEGMENT = 0x18538067
+ID_INFO = 0x1549A966
+ID_TIMECODE_SCALE = 0x2AD7B1
+ID_DURATION = 0x4489
+ID_TRACKS = 0x1654AE6B
+ID_CLUSTER = 0x1F43B675
+ID_TIMECODE = 0xE7
+ID_SIMPLEBLOCK = 0xA3
+ID_BLOCKGROUP = 0xA0
+ID_BLOCK = 0xA1
+
+# Segment'in doğrudan çocukları (unknown-size Cluster'ın bittiğini anlamak için)
+_LEVEL1_IDS = {
+    0x114D9B74,  # SeekHead
+    ID_INFO,
+    ID_TRACKS,
+    ID_CLUSTER,
+    0x1C53BB6B,  # Cues
+    0x1043A770,  # Chapters
+    0x1254C367,  # Tags
+    0x1941A469,  # Attachments
+}
+
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+DEFAULT_TIMECODE_SCALE = 1_000_000  # ns (1 ms)
+
+# Block timecode'u int16; cluster'lar bu aralığı aşmadan bölünür
+MAX_CLUSTER_SPAN = 32767
+
+# Opus frame süresi bilinmediğinde sessiz run süresine eklenen varsayım (ms)
+DEFAULT_FRAME_MS = 20.0
+
+
+class WebMParseError(ValueError):
+    """Kayıt beklenen MediaRecorder WebM yapısında değil"""
+
+
+@dataclass
+class WebMFrame:
+    """Tek bir audio block'u (timecode segment ölçeğinde tick)"""
+
+    timecode: int
+    track: bytes  # ham track number vint'i
+    flags: int
+    payload: bytes
+
+    @property
+    def size(self) -> int:
+        return len(self.payload)
+
+
+@dataclass
+class WebMRecording:
+    header: bytes  # EBML header + unknown-size Segment + Info + Tracks
+    frames: List[WebMFrame]
+    timecode_scale: int = DEFAULT_TIMECODE_SCALE
+
+    def timestamp_ms(self, index: int) -> float:
+        """Frame'in kaydın başından itibaren zamanı (ms)"""
+        first = self.frames[0].timecode if self.frames else 0
+        return (self.frames[index].timecode - first) * self.timecode_scale / 1_000_000
+
+
+@dataclass
+class AudioSegment:
+    """Bağımsız transcribe edilebilen parça"""
+
+    start_ms: float
+    end_ms: float
+    audio: bytes
+    silent: bool = False
+
+
+def _read_vint(buf: bytes, pos: int, keep_marker: bool) -> Tuple[int, int, bool]:
+    """(değer, uzunluk, unknown_size) döndür"""
+    if pos >= len(buf):
+        raise WebMParseError("unexpected end of data")
+    first = buf[pos]
+    if first == 0:
+        raise WebMParseError(f"invalid vint at offset {pos}")
+    length = 9 - first.bit_length()
+    if pos + length > len(buf):
+        raise WebMParseError("truncated vint")
+    value = first if keep_marker else first & ((1 << (8 - length)) - 1)
+    for i in range(1, length):
+        value = (value << 8) | buf[pos + i]
+    unknown = not keep_marker and value == (1 << (7 * length)) - 1
+    return value, length, unknown
+
+
+def _read_element(buf: bytes, pos: int) -> Tuple[int, int, Optional[int]]:
+    """(element_id, data_start, data_size) — unknown size için data_size None"""
+    element_id, id_len, _ = _read_vint(buf, pos, keep_marker=True)
+    size, size_len, unknown = _read_vint(buf, pos + id_len, keep_marker=False)
+    return element_id, pos + id_len + size_len, None if unknown else size
+
+
+def _read_uint(buf: bytes, start: int, size: int) -> int:
+    return int.from_bytes(buf[start:start + size], "big") if size else 0
+
+
+def _encode_size(size: int) -> bytes:
+    length = 1
+    while size >= (1 << (7 * length)) - 1:
+        length += 1
+    return (size | (1 << (7 * length))).to_bytes(length, "big")
+
+
+def _encode_id(element_id: int) -> bytes:
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big")
+
+
+def _element(element_id: int, payload: bytes) -> bytes:
+    return _encode_id(element_id) + _encode_size(len(payload)) + payload
+
+
+def _parse_block(body: bytes, cluster_timecode: int, simple: bool) -> WebMFrame:
+    _, track_len, _ = _read_vint(body, 0, keep_marker=False)
+    relative = int.from_bytes(body[track_len:track_len + 2], "big", signed=True)
+    flags = body[track_len + 2]
+    if not simple:
+        # Block flag'lerinde keyframe biti yok; audio frame'leri her zaman keyframe
+        flags = (flags & 0x0E) | 0x80
+    return WebMFrame(
+        timecode=cluster_timecode + relative,
+        track=body[:track_len],
+        flags=flags,
+        payload=body[track_len + 3:],
+    )
+
+
+def _parse_cluster(buf: bytes, start: int, end: Optional[int], frames: List[WebMFrame]) -> int:
+    """Cluster içeriğini parse et, cluster'ın bittiği offset'i döndür"""
+    limit = len(buf) if end is None else end
+    pos = start
+    cluster_timecode = 0
+    while pos < limit:
+        try:
+            element_id, data_start, size = _read_element(buf, pos)
+        except WebMParseError:
+            # MediaRecorder yarıda kesildiyse son element eksik olabilir
+            return len(buf)
+        if end is None and element_id in _LEVEL1_IDS:
+            return pos
+        if size is None:
+            raise WebMParseError("unknown-size element inside cluster")
+        data_end = data_start + size
+        if data_end > len(buf):
+            return len(buf)
+        if element_id == ID_TIMECODE:
+            cluster_timecode = _read_uint(buf, data_start, size)
+        elif element_id == ID_SIMPLEBLOCK:
+            frames.append(_parse_block(buf[data_start:data_end], cluster_timecode, simple=True))
+        elif element_id == ID_BLOCKGROUP:
+            inner = data_start
+            while inner < data_end:
+                inner_id, inner_start, inner_size = _read_element(buf, inner)
+                if inner_size is None:
+                    raise WebMParseError("unknown-size element inside block group")
+                if inner_id == ID_BLOCK:
+                    frames.append(
+                        _parse_block(buf[inner_start:inner_start + inner_size], cluster_timecode, simple=False)
+                    )
+                inner = inner_start + inner_size
+        pos = data_end
+    return limit
+
+
+def parse_webm(buf: bytes) -> WebMRecording:
+    """MediaRecorder WebM kaydını header ve frame listesine ayır"""
+    element_id, data_start, size = _read_element(buf, 0)
+    if element_id != ID_EBML or size is None:
+        raise WebMParseError("missing EBML header")
+    ebml_header = buf[:data_start + size]
+
+    pos = data_start + size
+    element_id, segment_start, segment_size = _read_element(buf, pos)
+    if element_id != ID_SEGMENT:
+        raise WebMParseError("missing Segment element")
+    segment_end = len(buf) if segment_size is None else min(len(buf), segment_start + segment_size)
+
+    info = tracks = b""
+    timecode_scale = DEFAULT_TIMECODE_SCALE
+    frames: List[WebMFrame] = []
+    pos = segment_start
+    while pos < segment_end:
+        try:
+            element_id, data_start, size = _read_element(buf, pos)
+        except WebMParseError:
+            break
+        if element_id == ID_CLUSTER:
+            pos = _parse_cluster(buf, data_start, None if size is None else data_start + size, frames)
+            continue
+        if size is None:
+            raise WebMParseError(f"unknown-size element 0x{element_id:X} in segment")
+        data_end = data_start + size
+        if element_id == ID_INFO:
+            # Duration tüm kayda ait; parçalara taşınmaz
+            info_children = bytearray()
+            inner = data_start
+            while inner < data_end:
+                inner_id, inner_start, inner_size = _read_element(buf, inner)
+                if inner_size is None:
+                    raise WebMParseError("unknown-size element inside Info")
+                if inner_id == ID_TIMECODE_SCALE:
+                    timecode_scale = _read_uint(buf, inner_start, inner_size) or DEFAULT_TIMECODE_SCALE
+                if inner_id != ID_DURATION:
+                    info_children += buf[inner:inner_start + inner_size]
+                inner = inner_start + inner_size
+            info = _element(ID_INFO, bytes(info_children))
+        elif element_id == ID_TRACKS:
+            tracks = buf[pos:data_end]
+        pos = data_end
+
+    if not tracks:
+        raise WebMParseError("missing Tracks element")
+
+    # SeekHead/Cues offset içerdiği için taşınmaz; Segment boyutu unknown yazılır
+    header = ebml_header + _encode_id(ID_SEGMENT) + UNKNOWN_SIZE + info + tracks
+    return WebMRecording(header=header, frames=frames, timecode_scale=timecode_scale)
+
+
+def build_webm(recording: WebMRecording, start: int, end: int) -> bytes:
+    """frames[start:end] aralığını timecode'u 0'dan başlayan bağımsız bir WebM olarak yaz"""
+    out = bytearray(recording.header)
+    frames = recording.frames
+    base = frames[start].timecode if start < end else 0
+    i = start
+    while i < end:
+        cluster_timecode = frames[i].timecode - base
+        body = bytearray(_element(ID_TIMECODE, cluster_timecode.to_bytes(8, "big").lstrip(b"\0") or b"\0"))
+        while i < end and frames[i].timecode - base - cluster_timecode <= MAX_CLUSTER_SPAN:
+            frame = frames[i]
+            relative = frame.timecode - base - cluster_timecode
+            block = frame.track + relative.to_bytes(2, "big", signed=True) + bytes([frame.flags]) + frame.payload
+            body += _element(ID_SIMPLEBLOCK, block)
+            i += 1
+        out += _element(ID_CLUSTER, bytes(body))
+    return bytes(out)
+
+
+def _silence_threshold(frames: List[WebMFrame], silence_ratio: float) -> float:
+    """Sessizlik eşiği kayda göre: medyan frame boyutuna oranla küçük frame'ler sessiz sayılır"""
+    return max(1.0, statistics.median(f.size for f in frames) * silence_ratio)
+
+
+def _pause_cut_points(recording: WebMRecording, min_pause_ms: float, threshold: float) -> List[int]:
+    """Yeterince uzun sessiz run'ların ortasındaki frame index'leri"""
+    frames = recording.frames
+    cuts: List[int] = []
+    run_start: Optional[int] = None
+    for i in range(len(frames) + 1):
+        silent = i < len(frames) and frames[i].size <= threshold
+        if silent and run_start is None:
+            run_start = i
+        elif not silent and run_start is not None:
+            duration = recording.timestamp_ms(i - 1) - recording.timestamp_ms(run_start) + DEFAULT_FRAME_MS
+            if duration >= min_pause_ms:
+                cuts.append((run_start + i) // 2)
+            run_start = None
+    return cuts
+
+
+def split_at_pauses(
+    audio: bytes,
+    target_seconds: float = 30.0,
+    max_seconds: float = 60.0,
+    min_pause_ms: float = 400.0,
+    silence_ratio: float = 0.5,
+) -> List[AudioSegment]:
+    """
+    Kaydı duraklama noktalarından ~``target_seconds`` uzunluğunda parçalara böl.
+
+    Hedef süreden sonraki ilk duraklamada kesilir; ``max_seconds`` içinde
+    duraklama yoksa sert kesilir. Sadece sessiz frame'lerden oluşan
+    parçalar ``silent=True`` olarak işaretlenir.
+
+    Raises:
+        WebMParseError: Kayıt parse edilemedi
+    """
+    recording = parse_webm(audio)
+    frames = recording.frames
+    if not frames:
+        return []
+
+    threshold = _silence_threshold(frames, silence_ratio)
+    cuts = _pause_cut_points(recording, min_pause_ms, threshold)
+    target_ms = target_seconds * 1000
+    max_ms = max_seconds * 1000
+
+    segments: List[AudioSegment] = []
+    start = 0
+    cut_index = 0
+    while start < len(frames):
+        start_ms = recording.timestamp_ms(start)
+        while cut_index < len(cuts) and cuts[cut_index] <= start:
+            cut_index += 1
+
+        end = None
+        for c in cuts[cut_index:]:
+            elapsed = recording.timestamp_ms(c) - start_ms
+            if elapsed > max_ms:
+                break
+            if elapsed >= target_ms:
+                end = c
+                break
+        if end is None:
+            # Hedef ile max arasında duraklama yok: max süreye kadar olan son duraklamayı
+            # (yoksa sert kesimi) kullan
+            within = [c for c in cuts[cut_index:] if recording.timestamp_ms(c) - start_ms <= max_ms]
+            if within and recording.timestamp_ms(within[-1]) - start_ms >= target_ms / 2:
+                end = within[-1]
+            else:
+                end = start + 1
+                while end < len(frames) and recording.timestamp_ms(end) - start_ms < max_ms:
+                    end += 1
+
+        end_ms = recording.timestamp_ms(end - 1) + DEFAULT_FRAME_MS
+        segments.append(
+            AudioSegment(
+                start_ms=start_ms,
+                end_ms=end_ms,
+                audio=build_webm(recording, start, end),
+                silent=all(f.size <= threshold for f in frames[start:end]),
+            )
+        )
+        start = end
+    return segments
@@ -4,9 +4,18 @@ Audio chunk'larını OpenAI Whisper API ile Türkçe metne çevirir
 """
 
 import os
+import asyncio
 import logging
 from io import BytesIO
-from openai import OpenAI, BadRequestError
+from typing import TYPE_CHECKING
+
+from services.instrumentation import instrument_call, ESTIMATED_AUDIO_BYTES_PER_SECOND
+from services.provider_clients import provider_clients
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# openai SDK'sı provider_clients tarafından ilk kullanımda import edilir
 
 logger = logging.getLogger(__name__)
 
@@ -16,32 +25,19 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Whisper model - varsayılan whisper-1
 DEFAULT_WHISPER_MODEL = os.getenv("WHISPER_MODEL_NAME", "whisper-1")
 
-# OpenAI client - global olarak bir kez oluştur
-_client: OpenAI | None = None
-
 # BadRequestError loglama kontrolü (noisy log önleme)
 _bad_request_logged = False
 
 
-def get_openai_client() -> OpenAI:
-    """OpenAI client'ı singleton olarak döndür"""
-    global _client
-    
-    if _client is None:
-        if not OPENAI_API_KEY:
-            raise ValueError(
-                "OPENAI_API_KEY environment variable bulunamadı. "
-                "Lütfen .env dosyasına veya Render environment variables'a ekleyin."
-            )
-        _client = OpenAI(api_key=OPENAI_API_KEY)
-        logger.info("[Whisper STT] OpenAI client oluşturuldu")
-    
-    return _client
+def get_openai_client() -> "OpenAI":
+    """Paylaşılan (havuzlu) OpenAI client'ı döndür"""
+    return provider_clients.openai()
 
 
 async def transcribe_with_whisper_chunk(
     audio_bytes: bytes,
     language: str = "tr",
+    raise_on_error: bool = False,
 ) -> str:
     """
     Transcribe a single buffered audio chunk with OpenAI Whisper.
@@ -52,6 +48,7 @@ async def transcribe_with_whisper_chunk(
     Args:
         audio_bytes: Audio chunk bytes (MediaRecorder'dan gelen webm format)
         language: Dil kodu (varsayılan: "tr" - Türkçe)
+        raise_on_error: True ise API hataları yutulmaz (provider router için)
     
     Returns:
         Transcribe edilmiş metin (boş string hata durumunda)
@@ -65,7 +62,12 @@ async def transcribe_with_whisper_chunk(
         return ""
     
     # Reuse existing helper to get the OpenAI client
-    client = get_openai_client()
+    try:
+        client = get_openai_client()
+        from openai import BadRequestError
+    except ImportError as e:
+        logger.error(f"[Whisper STT] openai paketi import edilemedi: {e}")
+        return ""
     
     logger.info(
         "[Whisper STT] Transkript isteniyor (model=%s, language=%s, audio_size=%d bytes)...",
@@ -74,39 +76,54 @@ async def transcribe_with_whisper_chunk(
         len(audio_bytes),
     )
     
-    try:
-        # Wrap bytes in an in-memory file-like object
-        audio_file = BytesIO(audio_bytes)
-        # Important: give it a proper name with a supported extension
-        audio_file.name = "chunk.webm"
-        # Make sure the file pointer is at the beginning
-        audio_file.seek(0)
-        
-        result = client.audio.transcriptions.create(
-            model=DEFAULT_WHISPER_MODEL,
-            file=audio_file,
-            language=language,
-        )
-        
-        # New OpenAI Python SDK returns .text on the result
-        transcript_text = (getattr(result, "text", "") or "").strip()
-        logger.info("[Whisper STT] Transcript: %s", transcript_text)
+    with instrument_call("openai", DEFAULT_WHISPER_MODEL, "transcribe", len(audio_bytes)) as call:
+        call.audio_seconds = len(audio_bytes) / ESTIMATED_AUDIO_BYTES_PER_SECOND
         
-        return transcript_text
-        
-    except BadRequestError as e:
-        # Extra logging to debug format issues - sadece bir kez logla (noisy log önleme)
-        global _bad_request_logged
-        if not _bad_request_logged:
-            sample_hex = audio_bytes[:32].hex()
-            logger.error(
-                "[Whisper STT] BadRequestError: %s | first_bytes_hex=%s",
-                str(e),
-                sample_hex,
+        try:
+            # Wrap bytes in an in-memory file-like object
+            audio_file = BytesIO(audio_bytes)
+            # Important: give it a proper name with a supported extension
+            audio_file.name = "chunk.webm"
+            # Make sure the file pointer is at the beginning
+            audio_file.seek(0)
+            
+            # SDK senkron; event loop'u bloklamamak için thread'de çalıştır
+            result = await asyncio.to_thread(
+                client.audio.transcriptions.create,
+                model=DEFAULT_WHISPER_MODEL,
+                file=audio_file,
+                language=language,
             )
-            logger.exception("[Whisper STT] BadRequestError details")
-            _bad_request_logged = True
-        return ""
-    except Exception:
-        logger.exception("[Whisper STT] Error while transcribing chunk")
-        return ""
+            
+            # New OpenAI Python SDK returns .text on the result
+            transcript_text = (getattr(result, "text", "") or "").strip()
+            logger.info("[Whisper STT] Transcript: %s", transcript_text)
+            
+            call.set_usage(result, response_text=transcript_text)
+            if not transcript_text:
+                call.outcome = "empty"
+            
+            return transcript_text
+        
+        except BadRequestError as e:
+            call.outcome = "error"
+            # Extra logging to debug format issues - sadece bir kez logla (noisy log önleme)
+            global _bad_request_logged
+            if not _bad_request_logged:
+                sample_hex = audio_bytes[:32].hex()
+                logger.error(
+                    "[Whisper STT] BadRequestError: %s | first_bytes_hex=%s",
+                    str(e),
+                    sample_hex,
+                )
+                logger.exception("[Whisper STT] BadRequestError details")
+                _bad_request_logged = True
+            if raise_on_error:
+                raise
+            return ""
+        except Exception:
+            call.outcome = "error"
+            logger.exception("[Whisper STT] Error while transcribing chunk")
+            if raise_on_error:
+                raise
+            return ""
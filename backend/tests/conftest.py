@@ -0,0 +1,30 @@
+"""
+Shared test fixtures
+Testler geçici bir SQLite veritabanı ile tek bir uygulama örneği kullanır
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Backend root dizinini path'e ekle
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
+
+# Ayarlar import sırasında okunur: app import edilmeden önce ayarlanmalı
+_tmp_dir = tempfile.mkdtemp(prefix="ik-mulakat-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+os.environ.setdefault("AUDIO_STORAGE_PATH", f"{_tmp_dir}/audio")
+os.environ.setdefault("TEMP_STORAGE_PATH", f"{_tmp_dir}/temp")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,63 @@
+"""
+Tests for AI endpoints
+"""
+import asyncio
+import threading
+
+from app.api.v1 import ai
+from app.core.repositories import segments_repo
+from services import gemini_questions
+
+
+def test_questions_fall_back_to_stored_transcript(client, monkeypatch):
+    seen = []
+
+    async def fake_questions(transcript, language="tr"):
+        seen.append(transcript)
+        return ["Bir örnek verir misiniz?"]
+
+    monkeypatch.setattr(ai, "generate_question_suggestions", fake_questions)
+    # Sadece veritabanında olan session (restart sonrası bellekteki log yok)
+    interview = client.post("/api/v1/interviews/", json={"session_id": "questions-from-db"}).json()
+    segments = [
+        {"interview_id": interview["id"], "seq": 1, "role": "interviewer", "start": 0.0, "end": 1.0,
+         "text": "Kendinizi tanıtır mısınız?", "committed": False},
+        {"interview_id": interview["id"], "seq": 2, "role": "candidate", "start": 1.0, "end": 2.0,
+         "text": "Beş yıldır backend geliştiriyorum", "committed": False},
+    ]
+    client.portal.call(segments_repo.insert_many, segments)
+
+    response = client.post("/api/v1/ai/questions", json={"session_id": "questions-from-db", "language": "tr"})
+    assert response.status_code == 200
+    assert response.json()["questions"] == ["Bir örnek verir misiniz?"]
+    assert seen == ["Beş yıldır backend geliştiriyorum"]
+
+
+def test_questions_unknown_session_returns_404(client):
+    response = client.post("/api/v1/ai/questions", json={"session_id": "never-recorded"})
+    assert response.status_code == 404
+
+
+def test_question_generation_runs_off_the_event_loop(monkeypatch):
+    class FakeResponse:
+        text = '["Kubernetes cluster\'ını nasıl ölçeklediniz?"]'
+        usage_metadata = None
+
+    class FakeModel:
+        def __init__(self):
+            self.thread_ids = []
+
+        def generate_content(self, prompt, request_options=None):
+            self.thread_ids.append(threading.get_ident())
+            return FakeResponse()
+
+    model = FakeModel()
+    monkeypatch.setattr(gemini_questions, "configure_gemini_client", lambda: model)
+    transcript = "Kubernetes ile mikroservis dağıtımı yaptım ve izleme altyapısını kurdum."
+
+    async def generate():
+        return threading.get_ident(), await gemini_questions.generate_question_suggestions(transcript)
+
+    loop_thread, questions = asyncio.run(generate())
+    assert questions == ["Kubernetes cluster'ını nasıl ölçeklediniz?"]
+    assert model.thread_ids and model.thread_ids[0] != loop_thread
@@ -0,0 +1,117 @@
+"""
+Tests for the disk-backed session audio log and the live STT window
+"""
+import asyncio
+
+import pytest
+
+from app.api.v1 import stt
+from app.api.v1.stt import _strip_overlap
+from app.core.admission import CapacityExceeded
+from app.core.audio_store import SessionAudioLog
+from app.core.config import settings
+
+CLUSTER_ID = b"\x1f\x43\xb6\x75"
+UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+HEADER = b"\x1a\x45\xdf\xa3" + b"\x84webm" + b"\x18\x53\x80\x67" + UNKNOWN_SIZE + b"tracks"
+
+
+def _cluster(timecode: int, payload: bytes) -> bytes:
+    return CLUSTER_ID + UNKNOWN_SIZE + b"\xe7\x81" + bytes([timecode]) + payload
+
+
+def _append_in_chunks(log: SessionAudioLog, data: bytes, chunk_size: int) -> None:
+    # Cluster ID'leri ve Timecode'lar chunk sınırlarına denk gelsin
+    for i in range(0, len(data), chunk_size):
+        log.append(data[i:i + chunk_size])
+
+
+def test_read_all_returns_spilled_and_resident_bytes(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_AUDIO_FLUSH_BYTES", 64)
+    data = bytes(range(256)) * 4
+
+    async def scenario():
+        log = SessionAudioLog("audio-store-read-all", "candidate")
+        _append_in_chunks(log, data[:512], 50)
+        await log.flush()
+        _append_in_chunks(log, data[512:], 50)
+        assert log.resident_bytes < len(log) == len(data)
+        result = await log.read_all()
+        await log.close()
+        return log, result
+
+    log, result = asyncio.run(scenario())
+    assert result == data
+    assert log.path.read_bytes() == data
+
+
+def test_read_window_sends_header_and_recent_clusters(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_AUDIO_FLUSH_BYTES", 1 << 20)
+    clusters = [_cluster(i, bytes([i]) * 300) for i in range(6)]
+    data = HEADER + b"".join(clusters)
+    offsets = [len(HEADER) + sum(len(c) for c in clusters[:i]) for i in range(len(clusters))]
+
+    async def scenario():
+        log = SessionAudioLog("audio-store-window", "candidate")
+        _append_in_chunks(log, data[:offsets[4]], 7)
+        # Pencerenin bir kısmı diskte, kalanı RAM kuyruğunda
+        await log.flush()
+        _append_in_chunks(log, data[offsets[4]:], 7)
+        inside_third = await log.read_window(offsets[3] + 10)
+        at_start = await log.read_window(0)
+        await log.close()
+        return inside_third, at_start
+
+    inside_third, at_start = asyncio.run(scenario())
+    assert bytes(inside_third) == HEADER + b"".join(clusters[3:])
+    # İlk Cluster'dan önce: kaydın tamamı
+    assert at_start == data
+
+
+def test_read_window_without_clusters_returns_everything():
+    data = b"not a webm recording " * 20
+
+    async def scenario():
+        log = SessionAudioLog("audio-store-no-clusters", "candidate")
+        log.append(data)
+        result = await log.read_window(len(data) - 1)
+        await log.close()
+        return result
+
+    assert asyncio.run(scenario()) == data
+
+
+def test_strip_overlap_drops_repeated_words():
+    assert _strip_overlap("bugün Python ile veri hattı", "veri hattı kurduk") == "kurduk"
+    assert _strip_overlap("merhaba", "yeni cümle") == "yeni cümle"
+
+
+def test_buffer_cap_applies_to_resident_audio_only(client, monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_AUDIO_FLUSH_BYTES", 1 << 20)
+    monkeypatch.setattr(settings, "MAX_SESSION_BUFFER_BYTES", 6000)
+    monkeypatch.setattr(settings, "MAX_SESSION_AUDIO_DISK_BYTES", 15000)
+    monkeypatch.setattr(settings, "STT_MIN_FIRST_BYTES", 1 << 30)
+    session_id = "audio-store-cap"
+    chunk = b"\x00" * 2500
+
+    async def send(count: int, flush: bool):
+        for i in range(count):
+            await stt.process_audio_chunk(session_id, "candidate", chunk, i)
+            if flush:
+                await stt.SESSION_BUFFERS[session_id].flush()
+
+    try:
+        # Diske yazılan audio RAM limitine sayılmaz
+        client.portal.call(send, 4, True)
+        assert len(stt.SESSION_BUFFERS[session_id]) == 10000
+        # Diske yazılmadan biriken kuyruk RAM limitine takılır
+        client.portal.call(send, 2, False)
+        with pytest.raises(CapacityExceeded):
+            client.portal.call(send, 1, False)
+        client.portal.call(stt.SESSION_BUFFERS[session_id].flush)
+        # Toplam (disk + RAM) limit
+        with pytest.raises(CapacityExceeded):
+            client.portal.call(send, 1, True)
+        assert len(stt.SESSION_BUFFERS[session_id]) == 15000
+    finally:
+        client.portal.call(stt.cleanup_stt_session, session_id)
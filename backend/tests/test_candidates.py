@@ -0,0 +1,49 @@
+"""
+Tests for candidate endpoints
+"""
+import json
+
+
+def test_bulk_import_reports_duplicates_and_invalid_rows(client):
+    client.post("/api/v1/candidates/", json={"full_name": "Var Olan", "email": "existing@example.com"})
+    rows = [
+        {"full_name": "Ayşe Yılmaz", "email": "ayse@example.com", "position": "Backend"},
+        {"full_name": "Kayıtlı", "email": "existing@example.com"},
+        {"full_name": "Ayşe Tekrar", "email": "ayse@example.com"},
+        {"email": "isimsiz@example.com"},
+        {"full_name": "E-postasız"},
+    ]
+    lines = [json.dumps(row, ensure_ascii=False) for row in rows]
+    lines.insert(3, "{bozuk json")
+    body = "\n".join(lines).encode()
+
+    response = client.post(
+        "/api/v1/candidates/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    summary = response.json()
+    assert summary["received"] == 6
+    assert summary["inserted"] == 2
+    assert summary["duplicates"] == 2
+    assert summary["invalid"] == 2
+    assert summary["errors_truncated"] is False
+    errors = {error["line"]: error["error"] for error in summary["errors"]}
+    assert errors[2] == "Duplicate email: existing@example.com"
+    assert errors[3] == "Duplicate email: ayse@example.com"
+    assert errors[4].startswith("Invalid JSON")
+    assert errors[5].startswith("full_name")
+
+
+def test_bulk_import_csv(client):
+    body = 'full_name,email,notes\r\nCsv Aday,csv@example.com,"çok\nsatırlı not"\r\n,eksik@example.com,\r\n'
+    response = client.post(
+        "/api/v1/candidates/bulk", content=body.encode(), headers={"Content-Type": "text/csv"}
+    )
+    summary = response.json()
+    assert (summary["inserted"], summary["invalid"]) == (1, 1)
+    assert summary["errors"][0]["line"] == 4
+
+
+def test_bulk_import_rejects_unknown_content_type(client):
+    response = client.post("/api/v1/candidates/bulk", content=b"{}", headers={"Content-Type": "application/json"})
+    assert response.status_code == 415
@@ -0,0 +1,62 @@
+"""
+Tests for provider call instrumentation and usage summaries
+"""
+import pytest
+
+from services.instrumentation import (
+    CallRecord,
+    UsageTracker,
+    current_session_id,
+    instrument_call,
+    usage_tracker,
+)
+
+
+class FakeUsage:
+    prompt_token_count = 1000
+    candidates_token_count = 200
+
+
+class FakeResponse:
+    usage_metadata = FakeUsage()
+
+
+def test_instrumented_calls_are_summarized_per_session(client):
+    session_id = "instrumentation-session"
+    token = current_session_id.set(session_id)
+    try:
+        with instrument_call("gemini", "gemini-2.5-flash", "questions") as call:
+            call.set_usage(FakeResponse())
+        with pytest.raises(RuntimeError):
+            with instrument_call("openai", "whisper-1", "transcribe", bytes_uploaded=4000) as call:
+                call.audio_seconds = 60.0
+                raise RuntimeError("provider down")
+        with instrument_call("gemini", "gemini-2.5-flash", "questions") as call:
+            # Usage metadata yok: metinden tahmin
+            call.set_usage(object(), prompt_text="x" * 40, response_text="")
+            call.outcome = "empty"
+    finally:
+        current_session_id.reset(token)
+
+    summary = client.get(f"/usage/sessions/{session_id}").json()
+    assert summary["calls"] == 3
+    assert summary["errors"] == 1
+    assert summary["empty"] == 1
+    assert summary["bytes_uploaded"] == 4000
+    assert summary["prompt_tokens"] == 1010
+    assert summary["response_tokens"] == 200
+    # 1000 * 0.30/1M + 200 * 2.50/1M + 1 dk * 0.006 + 10 * 0.30/1M
+    assert summary["cost_usd"] == pytest.approx(0.006803, abs=1e-7)
+    assert summary["by_operation"] == {"questions": 2, "transcribe": 1}
+    assert session_id in usage_tracker.snapshot()["sessions"]
+
+
+def test_usage_tracker_evicts_oldest_session():
+    tracker = UsageTracker(max_sessions=2)
+    for session_id in ("a", "b", "a", "c"):
+        tracker.record(CallRecord("gemini", "gemini-2.5-flash", "report", session_id=session_id))
+
+    # "a" yeniden kullanıldığı için en eski session "b" düşer
+    assert list(tracker.snapshot()["sessions"]) == ["a", "c"]
+    assert tracker.session_summary("b") is None
+    assert tracker.snapshot()["models"]["gemini-2.5-flash"]["calls"] == 4
@@ -0,0 +1,81 @@
+"""
+Tests for interview endpoints
+"""
+import asyncio
+
+
+def test_end_interview_uses_database_id(client):
+    created = client.post("/api/v1/interviews/", json={"session_id": "end-by-id"}).json()
+    assert client.post(f"/api/v1/interviews/{created['id']}/start").status_code == 200
+
+    response = client.post(f"/api/v1/interviews/{created['id']}/end")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] == created["id"]
+    assert body["session_id"] == "end-by-id"
+
+    interview = client.get(f"/api/v1/interviews/{created['id']}").json()
+    assert interview["status"] == "ended"
+    assert interview["ended_at"] is not None
+    # Path parametresi session_id olarak yorumlanıp yeni kayıt açılmamalı
+    ended = client.get("/api/v1/interviews/", params={"status": "ended", "limit": 100}).json()["items"]
+    assert all(item["session_id"] != str(created["id"]) for item in ended)
+
+
+def test_end_unknown_interview_returns_404(client):
+    assert client.post("/api/v1/interviews/987654/end").status_code == 404
+
+
+def test_end_interview_by_session_creates_record(client):
+    response = client.post("/api/v1/interviews/sessions/live-session-1/end")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["session_id"] == "live-session-1"
+    assert client.get(f"/api/v1/interviews/{body['id']}").json()["status"] == "ended"
+
+
+def test_export_slot_is_reserved_before_streaming(client, monkeypatch):
+    from app.api.v1 import interviews
+
+    slots = asyncio.Semaphore(1)
+    monkeypatch.setattr(interviews, "_export_slots", slots)
+
+    async def start_export():
+        # Handler döndü ama gövde henüz okunmadı (istemci akışı başlatmadı)
+        return await interviews.export_interviews(fmt="ndjson", candidate_id=None, status=None, position=None)
+
+    pending = client.portal.call(start_export)
+    assert client.get("/api/v1/interviews/export").status_code == 429
+
+    # İstemci akış başlamadan ayrılırsa yer background task ile bırakılır
+    client.portal.call(pending.background)
+    response = client.get("/api/v1/interviews/export", params={"format": "csv"})
+    assert response.status_code == 200
+    assert response.text.startswith("interview_id,session_id,status")
+    assert not slots.locked()
+
+
+def test_repeated_end_skips_final_pass(client, monkeypatch):
+    from app.api.v1 import interviews
+    from app.core.audio_store import session_audio_dir
+
+    session_id = "final-pass-once"
+    directory = session_audio_dir(session_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "candidate-1000.webm").write_bytes(b"\x00" * 16)
+    calls = []
+
+    async def fake_transcribe_recordings(recordings, transcribe, **kwargs):
+        calls.append([rec.path.name for rec in recordings])
+        return {"segments": [{"role": "candidate", "start": 0.0, "end": 1.0, "text": "final metin"}], "text": ""}
+
+    monkeypatch.setattr(interviews, "transcribe_recordings", fake_transcribe_recordings)
+    created = client.post("/api/v1/interviews/", json={"session_id": session_id}).json()
+
+    first = client.post(f"/api/v1/interviews/{created['id']}/end").json()
+    assert first["final_transcript"]["segments"][0]["text"] == "final metin"
+    # Bellekteki transkript düşse de saklanan committed parçalar final-pass'i atlatır
+    interviews.transcript_store._sessions.pop(session_id, None)
+    second = client.post(f"/api/v1/interviews/{created['id']}/end").json()
+    assert second["final_transcript"] is None
+    assert calls == [["candidate-1000.webm"]]
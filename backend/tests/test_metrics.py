@@ -0,0 +1,45 @@
+"""
+Tests for the Prometheus-style metrics registry and /metrics endpoint
+"""
+from app.core.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Test latency", labels=("stage",), buckets=(0.1, 1.0))
+    child = latency.labels("stt")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP test_latency_seconds Test latency", "# TYPE test_latency_seconds histogram"]
+    assert 'test_latency_seconds_bucket{stage="stt",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{stage="stt",le="1"} 3' in lines
+    assert 'test_latency_seconds_bucket{stage="stt",le="+Inf"} 4' in lines
+    assert 'test_latency_seconds_sum{stage="stt"} 4.05' in lines
+    assert 'test_latency_seconds_count{stage="stt"} 4' in lines
+
+
+def test_counters_gauges_and_callbacks_render():
+    registry = MetricsRegistry()
+    calls = registry.counter("test_calls_total", "Test calls")
+    calls.inc()
+    calls.inc(2)
+    sockets = registry.gauge("test_open_sockets", "Open sockets", labels=("endpoint",))
+    sockets.labels("stt").inc()
+    registry.gauge("test_sessions", "Sessions", callback=lambda: 7)
+    # Aynı isim tekrar tanımlanırsa mevcut metrik döner
+    assert registry.counter("test_calls_total", "Test calls") is calls
+
+    lines = registry.render().splitlines()
+    assert "test_calls_total 3" in lines
+    assert 'test_open_sockets{endpoint="stt"} 1' in lines
+    assert "test_sessions 7" in lines
+
+
+def test_metrics_endpoint_exposes_pipeline_metrics(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE ws_open_connections gauge" in response.text
+    assert "# TYPE stt_whisper_call_seconds histogram" in response.text
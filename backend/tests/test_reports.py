@@ -0,0 +1,139 @@
+"""
+Tests for materialized interview reports
+"""
+import asyncio
+import threading
+
+from app.core.analysis import analysis_service
+from app.core.repositories import segments_repo
+
+
+def _add_candidate_text(client, interview_id: int, text: str) -> None:
+    segment = {
+        "interview_id": interview_id,
+        "seq": 1,
+        "role": "candidate",
+        "start": 0.0,
+        "end": 1.0,
+        "text": text,
+        "committed": True,
+    }
+    client.portal.call(segments_repo.insert_many, [segment])
+
+
+def test_reports_are_stored_per_language(client, monkeypatch):
+    source_text = "Kubernetes ile dağıtım yaptım"
+    calls = []
+
+    async def fake_report(text, language):
+        calls.append((text, language))
+        if text != source_text:
+            # Diğer testlerin arka planda üretilen raporları (boş rapor saklanmaz)
+            return {}
+        return {"overall_score": 80 if language == "tr" else 60, "key_topics": [f"konu-{language}"]}
+
+    monkeypatch.setattr(analysis_service, "_report", fake_report)
+    interview = client.post("/api/v1/interviews/", json={"session_id": "report-languages"}).json()
+    _add_candidate_text(client, interview["id"], source_text)
+
+    for _ in range(2):
+        tr = client.get(f"/api/v1/interviews/{interview['id']}/analysis", params={"language": "tr"})
+        en = client.get(f"/api/v1/interviews/{interview['id']}/analysis", params={"language": "en"})
+        assert tr.status_code == 200 and en.status_code == 200
+        assert tr.json()["overall_score"] == 80
+        assert en.json()["overall_score"] == 60
+
+    # Her dil bir kez üretilir; ikinci turda ikisi de saklanan rapordan gelir
+    assert [language for text, language in calls if text == source_text] == ["tr", "en"]
+    # İki dilin konuları da arama index'inde kalır
+    for topic in ("konu-tr", "konu-en"):
+        items = client.get("/api/v1/interviews/search", params={"q": topic}).json()["items"]
+        assert [item["interview"]["id"] for item in items] == [interview["id"]]
+
+
+def test_ai_report_runs_through_analysis_service(client, monkeypatch):
+    from app.core import analysis
+
+    calls = []
+
+    def fake_generate(transcript, language="tr", **kwargs):
+        calls.append(threading.get_ident())
+        return {
+            "overall_score": 70,
+            "overall_comment": "Dengeli",
+            "sentiment": {"positive": 60, "neutral": 30, "negative": 10},
+            "key_topics": ["Python"],
+            "strengths": [],
+            "improvements": [],
+        }
+
+    async def loop_thread_id():
+        return threading.get_ident()
+
+    monkeypatch.setattr(analysis, "generate_interview_report", fake_generate)
+    before = analysis_service.generated
+    payload = {"transcript": "Python ile veri hattı kurdum ve izledim", "language": "tr"}
+    for _ in range(2):
+        response = client.post("/api/v1/ai/report", json=payload)
+        assert response.status_code == 200
+        assert response.json()["overall_score"] == 70
+
+    # Tek üretim, event loop thread'i dışında; ikinci istek önbellekten döner
+    assert len(calls) == 1
+    assert calls[0] != client.portal.call(loop_thread_id)
+    assert analysis_service.generated == before + 1
+
+
+def test_ai_report_short_transcript_returns_empty_report(client):
+    response = client.post("/api/v1/ai/report", json={"transcript": "kısa", "language": "tr"})
+    assert response.status_code == 200
+    assert response.json()["overall_score"] == 0
+
+
+def test_changed_transcript_does_not_join_inflight_report(client, monkeypatch):
+    first_text = "Go ile yüksek trafikli bir API geliştirdim"
+    calls = []
+
+    interview = client.post("/api/v1/interviews/", json={"session_id": "report-single-flight"}).json()
+    _add_candidate_text(client, interview["id"], first_text)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fake_report(text, language):
+            if first_text not in text:
+                return {}
+            calls.append(text)
+            await release.wait()
+            return {"overall_score": len(calls), "key_topics": ["Go"]}
+
+        monkeypatch.setattr(analysis_service, "_report", fake_report)
+        first = asyncio.create_task(analysis_service.ensure(interview["id"], "tr"))
+        await asyncio.sleep(0)
+        # Üretim sürerken transkript uzadı: yeni metin için ayrı üretim başlamalı
+        await segments_repo.insert_many([
+            {
+                "interview_id": interview["id"],
+                "seq": 2,
+                "role": "candidate",
+                "start": 1.0,
+                "end": 2.0,
+                "text": "ve gözlemlenebilirlik ekledim",
+                "committed": True,
+            }
+        ])
+        second = asyncio.create_task(analysis_service.ensure(interview["id"], "tr"))
+
+        async def both_started():
+            while len(calls) < 2:
+                await asyncio.sleep(0.01)
+
+        try:
+            await asyncio.wait_for(both_started(), timeout=5)
+        finally:
+            release.set()
+        return await first, await second
+
+    (_, first_generated), (_, second_generated) = client.portal.call(scenario)
+    assert first_generated and second_generated
+    assert calls == [first_text, first_text + "\nve gözlemlenebilirlik ekledim"]
@@ -0,0 +1,74 @@
+"""
+Tests for interview full-text search
+"""
+from app.core.repositories import reports_repo, segments_repo
+
+
+def _create_interview(client, session_id: str, lines) -> int:
+    interview_id = client.post("/api/v1/interviews/", json={"session_id": session_id}).json()["id"]
+    segments = [
+        {
+            "interview_id": interview_id,
+            "seq": seq,
+            "role": role,
+            "start": float(seq),
+            "end": float(seq) + 1,
+            "text": text,
+            "committed": False,
+        }
+        for seq, (role, text) in enumerate(lines, start=1)
+    ]
+    client.portal.call(segments_repo.insert_many, segments)
+    return interview_id
+
+
+def _search_all(client, limit: int, **params):
+    pages, cursor = [], None
+    while True:
+        query = {**params, "limit": limit}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/v1/interviews/search", params=query)
+        assert response.status_code == 200
+        body = response.json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_search_cursor_walks_every_match_once_in_score_order(client):
+    hits = [1, 3, 2, 1, 2]
+    ids = [
+        _create_interview(client, f"search-{i}", [("candidate", f"Zeplin{'ler' if n % 2 else ''} projesi")] * n)
+        for i, n in enumerate(hits)
+    ]
+    # Rapor konusu eşleşmesi TOPIC_WEIGHT kat sayılır
+    topic_only = _create_interview(client, "search-topic", [("candidate", "alakasız")])
+    client.portal.call(reports_repo.save, topic_only, "tr", {"overall_score": 50, "key_topics": ["Zeplin"]})
+
+    pages = _search_all(client, limit=2, q="ZEPLİN")
+    assert [len(page) for page in pages] == [2, 2, 2]
+    items = [item for page in pages for item in page]
+    found = [(item["interview"]["id"], item["score"]) for item in items]
+
+    expected = sorted(zip(ids + [topic_only], hits + [5]), key=lambda pair: (-pair[1], pair[0]))
+    assert found == expected
+    assert items[0]["match"] == {"text": "Zeplin", "kind": "topic", "role": None}
+
+
+def test_search_role_filter_and_turkish_folding(client):
+    candidate_id = _create_interview(client, "search-role-c", [("candidate", "Işıklı Gösterge Panelı")])
+    interviewer_id = _create_interview(client, "search-role-i", [("interviewer", "ışıklı gösterge paneli")])
+
+    everyone = {item["interview"]["id"] for page in _search_all(client, 10, q="isikli gosterge") for item in page}
+    assert {candidate_id, interviewer_id} <= everyone
+
+    candidates_only = [item for page in _search_all(client, 10, q="IŞIKLI", role="candidate") for item in page]
+    assert [item["interview"]["id"] for item in candidates_only] == [candidate_id]
+    assert candidates_only[0]["match"]["role"] == "candidate"
+
+
+def test_search_rejects_malformed_cursor(client):
+    response = client.get("/api/v1/interviews/search", params={"q": "zeplin", "cursor": "abc"})
+    assert response.status_code == 400
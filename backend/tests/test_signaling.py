@@ -0,0 +1,44 @@
+"""
+Tests for WebRTC signaling relay
+"""
+import asyncio
+import json
+
+from app.api.v1 import signaling
+
+
+class SlowSocket:
+    """Her gönderimde event loop'a dönen (yavaş ağ gibi) sahte WebSocket"""
+
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(0.01)
+        self.received.append(json.loads(text)["type"])
+
+
+def test_pending_ice_candidates_are_sent_before_answer(monkeypatch):
+    monkeypatch.setattr(signaling.settings, "SIGNALING_ICE_BATCH_WINDOW_MS", 5)
+    sender, first, second = SlowSocket(), SlowSocket(), SlowSocket()
+
+    async def scenario():
+        signaling.active_connections["ice-order"] = {first, second}
+        batcher = await signaling.join_room("ice-order", sender)
+        for index in range(3):
+            await signaling.handle_signaling_message(
+                "ice-order", sender, {"type": "ice-candidate", "data": {"candidate": index}}, batcher
+            )
+        # Zamanlayıcı flush'ı başlasın ve ilk peer'a gönderirken answer gelsin
+        await asyncio.sleep(0.012)
+        await signaling.handle_signaling_message("ice-order", sender, {"type": "answer", "data": {}}, batcher)
+        await signaling.leave_room("ice-order", sender, batcher)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        signaling.active_connections.pop("ice-order", None)
+
+    for peer in (first, second):
+        relayed = [kind for kind in peer.received if kind.startswith("ice") or kind == "answer"]
+        assert relayed == ["ice-candidate"] * 3 + ["answer"]
@@ -0,0 +1,59 @@
+"""
+Tests for the fair STT scheduler under a tight provider quota
+"""
+import asyncio
+
+from services.stt_router import STTProvider, STTRouter, TokenBucket
+from services.stt_scheduler import FairSTTScheduler
+
+
+class CountingBucket(TokenBucket):
+    """Saniyede 10 token, burst 1; router'ın bekleyerek aldığı token'ları sayar"""
+
+    def __init__(self):
+        super().__init__(rate_per_minute=600)
+        self.capacity = 1.0
+        self._tokens = 1.0
+        self.waited_acquires = 0
+
+    async def acquire(self) -> None:
+        self.waited_acquires += 1
+        await super().acquire()
+
+
+def test_priority_and_round_robin_hold_under_tight_quota():
+    started = []
+
+    async def fake_transcribe(audio_bytes, language="tr", raise_on_error=False):
+        started.append(audio_bytes.decode())
+        return audio_bytes.decode()
+
+    bucket = CountingBucket()
+    router = STTRouter([STTProvider("fake", fake_transcribe, bucket=bucket)], retry_attempts=0)
+    scheduler = FairSTTScheduler(
+        ready_in=router.ready_in,
+        reserve=router.reserve,
+        max_concurrency=8,
+        max_wait_seconds=30,
+        candidate_weight=3,
+    )
+
+    async def main():
+        jobs = []
+        for i in range(6):
+            label = f"int-{i}"
+            jobs.append(scheduler.run(f"s{i % 2}", "interviewer", lambda label=label: router.transcribe(label.encode())))
+        for i in range(3):
+            label = f"cand-{i}"
+            jobs.append(scheduler.run(f"s{i}", "candidate", lambda label=label: router.transcribe(label.encode())))
+        try:
+            return await asyncio.gather(*jobs)
+        finally:
+            await scheduler.close()
+
+    results = asyncio.run(main())
+
+    assert sorted(results) == sorted(started)
+    assert started == ["cand-0", "cand-1", "cand-2", "int-0", "int-1", "int-2", "int-3", "int-4", "int-5"]
+    # Token dispatcher'da alındı; router ikinci kez beklemedi
+    assert bucket.waited_acquires == 0
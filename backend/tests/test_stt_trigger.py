@@ -0,0 +1,39 @@
+"""
+Tests for the adaptive STT trigger's latency tracking
+"""
+from app.api.v1 import stt
+from app.core.config import settings
+from app.core.stt_trigger import stt_trigger
+from services.stt_cache import audio_cache_key, stt_result_cache
+
+
+def test_trigger_latency_ignores_cache_hits(client, monkeypatch):
+    monkeypatch.setattr(settings, "STT_MIN_FIRST_BYTES", 2000)
+    monkeypatch.setattr(settings, "STT_MIN_DELTA_BYTES", 1)
+    monkeypatch.setattr(settings, "STT_MAX_DELTA_BYTES", 2500)
+    session_id = "trigger-cache-hit"
+    first_chunk = b"\x01" * 2500
+    provider_calls = []
+
+    async def fake_transcribe(audio_bytes, language="tr"):
+        provider_calls.append(len(audio_bytes))
+        return "ikinci parça"
+
+    monkeypatch.setattr(stt, "transcribe_audio_chunk", fake_transcribe)
+    stt_result_cache.put(audio_cache_key(first_chunk, stt.stt_router.model_key, "tr"), "ilk parça")
+    trigger = stt_trigger.get(session_id)
+    initial_latency = trigger.latency_seconds
+
+    try:
+        # İlk pencere cache'ten gelir: provider çağrısı yok, gecikme EWMA'sı değişmez
+        client.portal.call(stt.process_audio_chunk, session_id, "candidate", first_chunk, 1)
+        assert provider_calls == []
+        assert trigger.latency_seconds == initial_latency
+
+        client.portal.call(stt.process_audio_chunk, session_id, "candidate", b"\x02" * 2500, 2)
+        assert provider_calls == [5000]
+        assert trigger.latency_seconds is not None
+        assert trigger.latency_seconds != initial_latency
+        assert stt.SESSION_LAST_TEXT[session_id] == "ikinci parça"
+    finally:
+        client.portal.call(stt.cleanup_stt_session, session_id)
@@ -0,0 +1,52 @@
+"""
+Tests for the per-chunk STT trace ring buffer
+"""
+from app.core.config import settings
+from app.core.tracing import (
+    NULL_TRACE,
+    STAGE_RECEIVED,
+    STAGE_STT_REQUEST_SENT,
+    STAGE_THRESHOLD_REACHED,
+    TraceStore,
+    trace_store,
+)
+
+
+def test_ring_buffer_keeps_last_traces(monkeypatch):
+    monkeypatch.setattr(settings, "STT_TRACE_BUFFER_SIZE", 3)
+    store = TraceStore()
+    for chunk in range(1, 6):
+        store.start("ring", chunk, "candidate", 1000 + chunk, received_at=float(chunk))
+
+    assert [t.chunk for t in store.get("ring")] == [3, 4, 5]
+    assert store.get("unknown") is None
+
+
+def test_tracing_disabled_returns_null_trace(monkeypatch):
+    monkeypatch.setattr(settings, "STT_TRACE_BUFFER_SIZE", 0)
+    store = TraceStore()
+    assert store.start("off", 1, "candidate", 1000, received_at=0.0) is NULL_TRACE
+    assert store.get("off") is None
+
+
+def test_traces_endpoint_returns_stages_and_chrome_events(client):
+    session_id = "trace-endpoint"
+    trace = trace_store.start(session_id, 1, "candidate", 4000, received_at=0.0)
+    trace.marks.append((STAGE_THRESHOLD_REACHED, 0.010))
+    trace.marks.append((STAGE_STT_REQUEST_SENT, 0.025))
+    trace_store.start(session_id, 2, "candidate", 3000, received_at=0.030)
+
+    body = client.get(f"/api/v1/stt/sessions/{session_id}/traces").json()
+    first, second = body["traces"]
+    assert first["stages_ms"] == {STAGE_RECEIVED: 0.0, STAGE_THRESHOLD_REACHED: 10.0, STAGE_STT_REQUEST_SENT: 25.0}
+    assert first["total_ms"] == 25.0
+    assert second["stages_ms"] == {STAGE_RECEIVED: 0.0}
+
+    events = client.get(f"/api/v1/stt/sessions/{session_id}/traces", params={"format": "chrome"}).json()["traceEvents"]
+    assert [(e["name"], e["ph"]) for e in events] == [
+        (f"{STAGE_RECEIVED} -> {STAGE_THRESHOLD_REACHED}", "X"),
+        (f"{STAGE_THRESHOLD_REACHED} -> {STAGE_STT_REQUEST_SENT}", "X"),
+        (STAGE_RECEIVED, "i"),
+    ]
+    assert events[1]["dur"] == 15000.0
+    assert client.get("/api/v1/stt/sessions/no-such-session/traces").status_code == 404
@@ -0,0 +1,54 @@
+"""
+Tests for transcript replay (``?since=``)
+"""
+from app.api.v1 import stt
+from app.core.transcript_store import transcript_store
+
+
+def _say(client, session_id: str, text: str) -> int:
+    """Canlı STT akışındaki gibi parçayı ekle ve yayınla; seq'i döndür"""
+    async def append_and_broadcast():
+        transcript = transcript_store.get_or_create(session_id)
+        segment = transcript.append("candidate", text, start=0.0, end=1.0)
+        await stt.broadcast_transcript(session_id, "Aday", text, seq=segment.seq)
+        return segment.seq
+
+    return client.portal.call(append_and_broadcast)
+
+
+def test_transcript_ws_replays_missed_frames_then_streams_live(client):
+    session_id = "replay-since"
+    for text in ("bir", "iki", "üç"):
+        _say(client, session_id, text)
+
+    with client.websocket_connect(f"/api/v1/stt/ws/transcript?session_id={session_id}&since=1") as ws:
+        replay = ws.receive_json()
+        assert replay["type"] == "replay"
+        assert replay["reset"] is False
+        assert [(f["seq"], f["text"]) for f in replay["frames"]] == [(2, "iki"), (3, "üç")]
+        assert replay["next_seq"] == 4
+
+        # Replay'den sonra canlı yayın aynı bağlantıdan, kayıp veya tekrar olmadan gelir
+        seq = _say(client, session_id, "dört")
+        assert ws.receive_json() == {"role": "Aday", "text": "dört", "seq": seq}
+
+
+def test_transcript_ws_resets_when_client_is_ahead(client):
+    session_id = "replay-reset"
+    _say(client, session_id, "tek")
+
+    with client.websocket_connect(f"/api/v1/stt/ws/transcript?session_id={session_id}&since=42") as ws:
+        replay = ws.receive_json()
+        assert replay["reset"] is True
+        assert [f["text"] for f in replay["frames"]] == ["tek"]
+
+
+def test_transcript_rest_since(client):
+    session_id = "rest-since"
+    for text in ("a", "b", "c"):
+        _say(client, session_id, text)
+
+    body = client.get(f"/api/v1/stt/sessions/{session_id}/transcript", params={"since": 2}).json()
+    assert body["next_seq"] == 4
+    assert [(s["seq"], s["text"], s["status"]) for s in body["segments"]] == [(3, "c", "tentative")]
+    assert client.get("/api/v1/stt/sessions/unknown-session/transcript").status_code == 404
@@ -59,8 +59,9 @@ export function AiQuestionSuggestionsCard({
         headers: {
           "Content-Type": "application/json",
         },
+        // Transkript backend'de session bazlı tutuluyor; sadece session_id gönder
         body: JSON.stringify({
-          transcript: transcriptText,
+          session_id: sessionId,
           language: "tr",
         }),
       });
@@ -19,8 +19,18 @@ export interface TranscriptItem {
   role: "Aday" | "Görüşmeci";
   text: string;
   timestamp: Date;
+  seq?: number;
 }
 
+interface TranscriptFrame {
+  role: string;
+  text: string;
+  seq?: number;
+}
+
+// Bağlantı koparsa yeniden bağlanma gecikmesi (ms)
+const RECONNECT_DELAY_MS = 2000;
+
 interface LiveTranscriptPanelProps {
   sessionId: string;
   onTranscriptChange?: (items: TranscriptItem[]) => void; // Callback for transcript changes
@@ -32,79 +42,123 @@ export function LiveTranscriptPanel({ sessionId, onTranscriptChange }: LiveTrans
   const [connectionError, setConnectionError] = useState<string | null>(null);
   const scrollRef = useRef<HTMLDivElement>(null);
   const wsRef = useRef<WebSocket | null>(null);
+  // Son alınan mesajın seq'i; yeniden bağlanınca sadece aradaki mesajlar istenir
+  const lastSeqRef = useRef(0);
 
   // WebSocket bağlantısı
   useEffect(() => {
     if (!sessionId) return;
 
-    const backendUrl = getBackendUrl();
-    const wsUrl = `${backendUrl}/api/v1/stt/ws/transcript?session_id=${sessionId}`;
-
-    console.log('[Transcript] WebSocket bağlantısı kuruluyor:', wsUrl);
+    lastSeqRef.current = 0;
+    setItems([]);
+    let closedByUs = false;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
 
-    const ws = new WebSocket(wsUrl);
-    wsRef.current = ws;
+    const toItem = (frame: TranscriptFrame): TranscriptItem => ({
+      id: frame.seq !== undefined
+        ? `${sessionId}-${frame.seq}`
+        : `${Date.now()}-${Math.random().toString(36).substr(2, 9)}`,
+      role: frame.role === "Aday" ? "Aday" : "Görüşmeci",
+      text: frame.text,
+      timestamp: new Date(),
+      seq: frame.seq,
+    });
 
-    ws.onopen = () => {
-      console.log('[Transcript] ✅ WebSocket connected');
-      setIsConnected(true);
-      setConnectionError(null);
+    // Daha önce alınmış seq'leri atla (replay ile canlı mesaj çakışabilir)
+    const appendFrames = (frames: TranscriptFrame[], reset = false) => {
+      if (reset) {
+        lastSeqRef.current = 0;
+      }
+      const fresh = frames.filter((f) => {
+        if (!f.role || !f.text) return false;
+        if (f.seq === undefined) return true;
+        if (f.seq <= lastSeqRef.current) return false;
+        lastSeqRef.current = f.seq;
+        return true;
+      });
+      if (fresh.length === 0 && !reset) return;
+      setItems((prev) => (reset ? fresh.map(toItem) : [...prev, ...fresh.map(toItem)]));
     };
 
-    ws.onclose = (event) => {
-      console.log('[Transcript] WebSocket closed:', event.code, event.reason);
-      setIsConnected(false);
-    };
+    const connect = () => {
+      const backendUrl = getBackendUrl();
+      const since = lastSeqRef.current > 0 ? `&since=${lastSeqRef.current}` : '';
+      const wsUrl = `${backendUrl}/api/v1/stt/ws/transcript?session_id=${sessionId}${since}`;
 
-    ws.onerror = (error) => {
-      console.error('[Transcript] ❌ WebSocket error:', error);
-      setConnectionError('Transkript bağlantısı kurulamadı');
-    };
+      console.log('[Transcript] WebSocket bağlantısı kuruluyor:', wsUrl);
 
-    ws.onmessage = (event) => {
-      try {
-        // Ping/pong mesajları
-        if (event.data === 'ping') {
-          ws.send('pong');
-          return;
-        }
-        if (event.data === 'pong') {
-          return;
-        }
+      const ws = new WebSocket(wsUrl);
+      wsRef.current = ws;
 
-        const data = JSON.parse(event.data) as { role: string; text: string };
-        
-        console.log('[LiveTranscript] New transcript message:', data);
+      ws.onopen = () => {
+        console.log('[Transcript] ✅ WebSocket connected');
+        setIsConnected(true);
+        setConnectionError(null);
+      };
 
-        // Transcript mesajı kontrolü
-        if (!data.role || !data.text) {
-          console.warn('[LiveTranscript] Geçersiz mesaj formatı:', data);
-          return;
+      ws.onclose = (event) => {
+        console.log('[Transcript] WebSocket closed:', event.code, event.reason);
+        setIsConnected(false);
+        if (!closedByUs) {
+          reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
         }
+      };
 
-        const newItem: TranscriptItem = {
-          id: `${Date.now()}-${Math.random().toString(36).substr(2, 9)}`,
-          role: data.role === "Aday" ? "Aday" : "Görüşmeci",
-          text: data.text,
-          timestamp: new Date(),
-        };
-
-        console.log('[LiveTranscript] Yeni transcript item eklendi:', newItem);
-        setItems((prev) => {
-          const newItems = [...prev, newItem];
-          // Callback'i çağır
-          onTranscriptChange?.(newItems);
-          return newItems;
-        });
-      } catch (error) {
-        console.error('[Transcript] Mesaj parse hatası:', error, event.data);
-      }
+      ws.onerror = (error) => {
+        console.error('[Transcript] ❌ WebSocket error:', error);
+        setConnectionError('Transkript bağlantısı kurulamadı');
+      };
+
+      ws.onmessage = (event) => {
+        try {
+          // Ping/pong mesajları
+          if (event.data === 'ping') {
+            ws.send('pong');
+            return;
+          }
+          if (event.data === 'pong') {
+            return;
+          }
+
+          const data = JSON.parse(event.data) as TranscriptFrame & {
+            type?: string;
+            frames?: TranscriptFrame[];
+            reset?: boolean;
+          };
+
+          // Yeniden bağlanma: kaçırılan mesajlar tek mesajda gelir
+          if (data.type === 'replay') {
+            console.log('[LiveTranscript] Replay alındı:', data.frames?.length ?? 0, 'mesaj');
+            appendFrames(data.frames ?? [], data.reset);
+            return;
+          }
+          
+          console.log('[LiveTranscript] New transcript message:', data);
+
+          // Transcript mesajı kontrolü
+          if (!data.role || !data.text) {
+            console.warn('[LiveTranscript] Geçersiz mesaj formatı:', data);
+            return;
+          }
+
+          appendFrames([data]);
+        } catch (error) {
+          console.error('[Transcript] Mesaj parse hatası:', error, event.data);
+        }
+      };
     };
 
+    connect();
+
     // Cleanup
     return () => {
       console.log('[Transcript] Cleanup - WebSocket kapatılıyor');
-      if (ws.readyState === WebSocket.OPEN) {
+      closedByUs = true;
+      if (reconnectTimer) {
+        clearTimeout(reconnectTimer);
+      }
+      const ws = wsRef.current;
+      if (ws && ws.readyState === WebSocket.OPEN) {
         ws.close(1000, 'Component unmount');
       }
       wsRef.current = null;
@@ -0,0 +1,52 @@
+/**
+ * Mux Signaling Client
+ * Signaling mesajlarını backend'in multiplexed WebSocket'i (/api/v1/mux/ws)
+ * üzerinden taşır. Mesajlar {"channel": "signaling", "data": {...}} zarfına
+ * sarılır; API SignalingClient ile aynıdır.
+ *
+ * Opsiyoneldir: NEXT_PUBLIC_USE_MUX_WS=true ise useWebRTC bunu kullanır.
+ * Şimdilik sadece signaling kanalı açılır; STT ve transcript kendi
+ * soketlerinde kalır.
+ */
+
+import { SignalingClient, SignalingMessage, WS_URL } from "./signalingClient";
+
+const CHANNEL_SIGNALING = "signaling";
+
+type MuxEnvelope = {
+  channel?: string;
+  data?: any;
+};
+
+export const isMuxEnabled = (): boolean => process.env.NEXT_PUBLIC_USE_MUX_WS === "true";
+
+export class MuxSignalingClient extends SignalingClient {
+  protected buildUrl(roomId: string): string {
+    const params = new URLSearchParams({
+      room_id: roomId,
+      channels: CHANNEL_SIGNALING,
+      ice_batch: "1",
+    });
+    return `${WS_URL}/api/v1/mux/ws?${params.toString()}`;
+  }
+
+  protected encode(message: SignalingMessage): string {
+    return JSON.stringify({ channel: CHANNEL_SIGNALING, data: message });
+  }
+
+  protected decode(raw: string): SignalingMessage | null {
+    const envelope: MuxEnvelope = JSON.parse(raw);
+    // "mux" kontrol kanalı (bağlantı keep-alive ping'i) signaling'e iletilmez
+    if (envelope.channel !== CHANNEL_SIGNALING || !envelope.data) {
+      return null;
+    }
+    return envelope.data as SignalingMessage;
+  }
+}
+
+/**
+ * Ayara göre signaling client'ı oluştur (varsayılan: ayrı signaling soketi)
+ */
+export function createSignalingClient(roomId: string): SignalingClient {
+  return isMuxEnabled() ? new MuxSignalingClient(roomId) : new SignalingClient(roomId);
+}
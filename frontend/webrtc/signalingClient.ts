@@ -5,7 +5,7 @@
 
 // Production ve development için WebSocket URL'ini oluştur
 // Render URL'si HTTPS ile başladığı için, onu güvenli WebSocket protokolüne (wss) çevir
-const getWebSocketUrl = (): string => {
+export const getWebSocketUrl = (): string => {
   const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
   
   // URL'i normalize et - başında/sonunda boşlukları temizle
@@ -48,10 +48,10 @@ const getWebSocketUrl = (): string => {
   }
 };
 
-const WS_URL = getWebSocketUrl();
+export const WS_URL = getWebSocketUrl();
 
 export type SignalingMessage = {
-  type: "offer" | "answer" | "ice-candidate" | "user-joined" | "user-left" | "room-info" | "ping" | "pong";
+  type: "offer" | "answer" | "ice-candidate" | "ice-candidates" | "user-joined" | "user-left" | "room-info" | "ping" | "pong";
   data?: any;
   from?: string;
 };
@@ -68,11 +68,26 @@ export class SignalingClient {
     this.roomId = roomId;
   }
 
+  // Alt sınıflar (ör. MuxSignalingClient) URL'i ve mesaj zarfını değiştirir
+  protected buildUrl(roomId: string): string {
+    // ice_batch=1: backend ICE candidate'ları tek "ice-candidates" frame'inde gönderebilir
+    return `${WS_URL}/api/v1/signaling/ws/${roomId}?ice_batch=1`;
+  }
+
+  protected encode(message: SignalingMessage): string {
+    return JSON.stringify(message);
+  }
+
+  // Signaling mesajı değilse null döner (yok sayılır)
+  protected decode(raw: string): SignalingMessage | null {
+    return JSON.parse(raw);
+  }
+
   connect(): Promise<void> {
     return new Promise((resolve, reject) => {
       try {
         // WebSocket URL'ini oluştur
-        const wsUrl = `${WS_URL}/api/v1/signaling/ws/${this.roomId}`;
+        const wsUrl = this.buildUrl(this.roomId);
         console.log("🔌 WebSocket bağlantısı kuruluyor:", wsUrl);
         console.log("🔌 Environment:", {
           API_URL: process.env.NEXT_PUBLIC_API_URL,
@@ -90,8 +105,8 @@ export class SignalingClient {
 
         this.ws.onmessage = (event) => {
           try {
-            const message: SignalingMessage = JSON.parse(event.data);
-            if (this.onMessageCallback) {
+            const message = this.decode(event.data);
+            if (message && this.onMessageCallback) {
               this.onMessageCallback(message);
             }
           } catch (error) {
@@ -133,7 +148,7 @@ export class SignalingClient {
 
   send(message: SignalingMessage): void {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
-      this.ws.send(JSON.stringify(message));
+      this.ws.send(this.encode(message));
     } else {
       console.error("WebSocket bağlantısı açık değil");
     }
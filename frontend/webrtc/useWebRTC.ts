@@ -5,6 +5,7 @@
 
 import { useState, useEffect, useRef, useCallback } from "react";
 import { SignalingClient, SignalingMessage } from "./signalingClient";
+import { createSignalingClient } from "./muxSignalingClient";
 import { createInterviewPeerConnection, parseIceCandidateType, isTurnConfigured } from "@/lib/webrtc";
 import { SttClient, startCandidateStt } from "@/lib/stt";
 
@@ -339,6 +340,15 @@ export function useWebRTC({ localStream, onRemoteStream, sessionId, enableStt =
             .catch((err) => console.error("❌ ICE candidate ekleme hatası:", err));
           break;
 
+        case "ice-candidates":
+          // Backend tarafından birleştirilmiş trickle ICE candidate'ları
+          console.log(`🧊 ${message.data?.length ?? 0} ICE candidate alındı (batch)`);
+          for (const candidate of message.data || []) {
+            addIceCandidate(candidate)
+              .catch((err) => console.error("❌ ICE candidate ekleme hatası:", err));
+          }
+          break;
+
         default:
           console.log("⚠️ Bilinmeyen mesaj tipi:", message.type);
           break;
@@ -376,7 +386,8 @@ export function useWebRTC({ localStream, onRemoteStream, sessionId, enableStt =
         console.log("🔧 Peer connection oluşturuldu");
 
         // SONRA Signaling client oluştur ve bağlan
-        const signalingClient = new SignalingClient(ROOM_ID);
+        // NEXT_PUBLIC_USE_MUX_WS=true ise signaling mux soketi üzerinden gider
+        const signalingClient = createSignalingClient(ROOM_ID);
         signalingClientRef.current = signalingClient;
 
         signalingClient.onMessage(handleSignalingMessage);